@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: API key lookup latency vs number of cached keys.
+Usage:
+  python scripts/bench_api_key_lookup.py                    # 10 .. 100k keys
+  python scripts/bench_api_key_lookup.py --sizes 10 1000    # custom sizes
+  python scripts/bench_api_key_lookup.py --linear           # also time the old linear compare_digest walk
+"""
+
+import argparse
+import secrets
+import sys
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+import auth
+
+
+def _linear_lookup(keys: list[str], api_key: str) -> bool:
+    """Pre-index behaviour: compare_digest against every cached key."""
+    found = False
+    for cached in keys:
+        if secrets.compare_digest(api_key, cached):
+            found = True
+    return found
+
+
+def _time_per_op(fn, number: int) -> float:
+    """Best-of-5 seconds per call."""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API key lookup for x402-tron-facilitator")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--number", type=int, default=20_000, help="lookups per timing run")
+    parser.add_argument("--linear", action="store_true", help="also time the linear walk baseline")
+    args = parser.parse_args()
+
+    header = f"{'keys':>8} {'hit ns/op':>10} {'miss ns/op':>11}"
+    if args.linear:
+        header += f" {'linear hit ns/op':>17}"
+    print(header)
+
+    for size in args.sizes:
+        keys = [secrets.token_hex(32) for _ in range(size)]
+        rows = [SimpleNamespace(key=k, seller_id=f"seller-{i}", id=i, created_at=None) for i, k in enumerate(keys)]
+        auth.API_KEY_INDEX = auth.build_api_key_index(rows)
+        hit = keys[size // 2]
+        miss = secrets.token_hex(32)
+
+        hit_s = _time_per_op(lambda: auth._lookup_api_key(hit), args.number)
+        miss_s = _time_per_op(lambda: auth._lookup_api_key(miss), args.number)
+        line = f"{size:>8} {hit_s * 1e9:>10.0f} {miss_s * 1e9:>11.0f}"
+        if args.linear:
+            # Linear cost grows with size; scale iterations down to keep runs short
+            number = max(1, args.number // max(1, size // 10))
+            linear_s = _time_per_op(lambda: _linear_lookup(keys, hit), number)
+            line += f" {linear_s * 1e9:>17.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: EIP-712 signature recovery per secp256k1 backend, and throughput / event loop lag per
+crypto executor mode.
+Usage:
+  python scripts/bench_crypto.py                              # backends, then inline/thread/process at 1/4/8 workers
+  python scripts/bench_crypto.py --backends coincurve python --modes  # backends only
+  python scripts/bench_crypto.py --workers 4 --requests 2000  # custom pool size / burst size
+  python scripts/bench_crypto.py --modes inline process
+
+Worker counts above the machine's core count measure queueing, not parallelism.
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+
+import crypto
+from crypto import CryptoExecutor, recover_typed_data_signer, recover_typed_data_signers
+
+DOMAIN = {"name": "PaymentPermit", "chainId": 728126428, "verifyingContract": "0x" + "11" * 20}
+TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "Permit": [
+        {"name": "buyer", "type": "address"},
+        {"name": "amount", "type": "uint256"},
+        {"name": "nonce", "type": "uint256"},
+    ],
+}
+
+
+def _signed_messages(count: int) -> list[tuple[dict, str]]:
+    account = Account.create()
+    messages = []
+    for _ in range(count):
+        message = {"buyer": account.address, "amount": 1_000_000, "nonce": secrets.randbits(64)}
+        signable = encode_typed_data(
+            full_message={"types": TYPES, "primaryType": "Permit", "domain": DOMAIN, "message": message}
+        )
+        messages.append((message, account.sign_message(signable).signature.hex()))
+    return messages
+
+
+def _bench_backend(backend: str, messages: list[tuple[dict, str]]) -> tuple[float, float]:
+    """(recoveries per second on one core, same with one batched call) for a backend."""
+    crypto.set_backend(backend)
+    items = [(DOMAIN, TYPES, message, "Permit", signature) for message, signature in messages]
+    recover_typed_data_signer(*items[0])  # fill the domain / type hash caches
+
+    started = time.perf_counter()
+    for item in items:
+        recover_typed_data_signer(*item)
+    single = len(items) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    recover_typed_data_signers(items)
+    batched = len(items) / (time.perf_counter() - started)
+    return single, batched
+
+
+async def _run(
+    mode: str, workers: int, messages: list[tuple[dict, str]], concurrency: int, batch_window_ms: float
+) -> tuple[float, float]:
+    """(recoveries per second, max event loop lag in ms) for one burst."""
+    executor = CryptoExecutor()
+    executor.start(mode=mode, workers=workers, batch_window_ms=batch_window_ms)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    max_lag = 0.0
+
+    async def probe():
+        nonlocal max_lag
+        while True:
+            started = loop.time()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, loop.time() - started - 0.005)
+
+    async def recover(message, signature):
+        async with semaphore:
+            return await executor.recover_typed_data(DOMAIN, TYPES, message, "Permit", signature)
+
+    try:
+        # Warm the pool (process start-up is not part of the measurement)
+        await asyncio.gather(*(recover(*m) for m in messages[:workers]))
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(0.02)
+        max_lag = 0.0
+        started = time.perf_counter()
+        await asyncio.gather(*(recover(*m) for m in messages))
+        elapsed = time.perf_counter() - started
+        prober.cancel()
+    finally:
+        executor.stop()
+    return len(messages) / elapsed, max_lag * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crypto executor modes for x402-tron-facilitator")
+    parser.add_argument("--backends", nargs="*", default=["coincurve", "python"])
+    parser.add_argument("--modes", nargs="*", default=["inline", "thread", "process"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=1000, help="recoveries per burst")
+    parser.add_argument("--concurrency", type=int, default=64, help="recoveries in flight")
+    parser.add_argument("--batch-window-ms", type=float, default=0, help="executor batch window (0 = off)")
+    args = parser.parse_args()
+
+    messages = _signed_messages(args.requests)
+    print(f"cpus={os.cpu_count()} requests={args.requests} concurrency={args.concurrency}")
+
+    if args.backends:
+        print(f"{'backend':>10} {'recover/s/core':>15} {'batched':>10}")
+        for backend in args.backends:
+            single, batched = _bench_backend(backend, messages)
+            print(f"{backend:>10} {single:>15.0f} {batched:>10.0f}")
+        crypto.set_backend("auto")
+
+    if args.modes:
+        print(f"{'mode':>8} {'workers':>8} {'recover/s':>10} {'max lag ms':>11}")
+    for mode in args.modes:
+        for workers in [1] if mode == "inline" else args.workers:
+            throughput, lag_ms = asyncio.run(_run(mode, workers, messages, args.concurrency, args.batch_window_ms))
+            print(f"{mode:>8} {workers if mode != 'inline' else '-':>8} {throughput:>10.0f} {lag_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
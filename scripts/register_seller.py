@@ -20,7 +20,7 @@ sys.path.insert(0, str(project_root / "src"))
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from config import config
-from database import APIKey, Seller, _ssl_for_asyncpg
+from database import APIKey, Seller, _ssl_for_asyncpg, notify_api_keys_changed
 
 
 async def register_seller(api_key: str) -> None:
@@ -48,6 +48,9 @@ async def register_seller(api_key: str) -> None:
         session.add(seller)
         session.add(api_key_record)
         try:
+            await session.flush()
+            # Running facilitators pick the new key up on commit instead of the next refresh
+            await notify_api_keys_changed(session, api_key_record.id)
             await session.commit()
             print(f"Seller registered successfully: seller_id={seller_id}")
             print(f"API key added successfully: {api_key}")
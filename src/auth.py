@@ -1,14 +1,18 @@
 import logging
 import asyncio
+import hmac
 import secrets
-from typing import Optional, Set
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
 from fastapi import Request
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from config import config
-from database import get_all_api_keys
+from database import API_KEYS_CHANNEL, get_api_keys_changed_since, listen
 
 logger = logging.getLogger(__name__)
 
@@ -17,36 +21,160 @@ from contextvars import ContextVar
 # Context variable to store the current request for the rate limit provider
 _current_request: ContextVar[Optional[Request]] = ContextVar("current_request", default=None)
 
-# Global API Key Cache
-API_KEY_CACHE: Set[str] = set()
+
+@dataclass(frozen=True)
+class APIKeyInfo:
+    """Identity resolved from an API key (loaded by the cache refresher)."""
+    seller_id: str
+    key_id: int
+    created_at: Optional[datetime] = None
+
+
+# Per-process secret for the API key index. Digests are only used as dict keys in memory,
+# so an attacker cannot precompute which keys share timing-relevant prefixes.
+_API_KEY_INDEX_SECRET = secrets.token_bytes(32)
+
+# Global API Key Index: HMAC-SHA256(api_key) -> (api_key, APIKeyInfo)
+API_KEY_INDEX: Dict[bytes, Tuple[str, APIKeyInfo]] = {}
+
+
+def _api_key_digest(api_key: str) -> bytes:
+    """Keyed digest used as the index key for an API key."""
+    return hmac.digest(_API_KEY_INDEX_SECRET, api_key.encode("utf-8"), "sha256")
+
+
+def _apply_api_key_rows(index: Dict[bytes, Tuple[str, APIKeyInfo]], rows) -> None:
+    """Upsert active rows into the index and drop revoked ones (tombstones)."""
+    for row in rows:
+        digest = _api_key_digest(row.key)
+        if getattr(row, "revoked_at", None) is not None:
+            index.pop(digest, None)
+        else:
+            index[digest] = (
+                row.key,
+                APIKeyInfo(seller_id=row.seller_id, key_id=row.id, created_at=row.created_at),
+            )
+
+
+def build_api_key_index(rows) -> Dict[bytes, Tuple[str, APIKeyInfo]]:
+    """Build the API key index from APIKey rows (key, seller_id, id, created_at, revoked_at)."""
+    index: Dict[bytes, Tuple[str, APIKeyInfo]] = {}
+    _apply_api_key_rows(index, rows)
+    return index
+
+
+def _lookup_api_key(api_key: str) -> Optional[APIKeyInfo]:
+    """
+    Find API key in the index: O(1) dict lookup on its keyed digest, then a constant-time
+    comparison against the single candidate to mitigate timing attacks.
+    """
+    entry = API_KEY_INDEX.get(_api_key_digest(api_key))
+    if entry is None:
+        return None
+    stored_key, info = entry
+    if not secrets.compare_digest(stored_key.encode("utf-8"), api_key.encode("utf-8")):
+        return None
+    return info
 
 
 def _constant_time_key_check(api_key: str) -> bool:
     """Check API key against cache using constant-time comparison to mitigate timing attacks."""
-    for cached in API_KEY_CACHE:
-        if secrets.compare_digest(api_key, cached):
-            return True
-    return False
+    return _lookup_api_key(api_key) is not None
 
 
 # Initialize Limiter
 limiter = Limiter(key_func=get_remote_address)
 
-async def refresh_api_keys_cache():
-    """Refresh API keys cache from database"""
-    global API_KEY_CACHE
+@dataclass
+class _RefreshState:
+    """High-water marks for incremental API key refresh."""
+    loaded: bool = False
+    last_id: int = 0
+    last_revoked_at: Optional[datetime] = None
+    last_full_refresh: float = 0.0
+
+
+_refresh_state = _RefreshState()
+
+# Set by NOTIFY api_keys_changed to wake the refresher early
+_refresh_requested = asyncio.Event()
+_notified_key_ids: Set[int] = set()
+
+
+def _advance_high_water(rows) -> None:
+    for row in rows:
+        _refresh_state.last_id = max(_refresh_state.last_id, row.id)
+        revoked_at = getattr(row, "revoked_at", None)
+        if revoked_at is not None and (
+            _refresh_state.last_revoked_at is None or revoked_at > _refresh_state.last_revoked_at
+        ):
+            _refresh_state.last_revoked_at = revoked_at
+
+
+async def refresh_api_keys_cache(full: bool = False):
+    """
+    Refresh API keys cache from database.
+    Incremental by default: only rows with id above the high-water mark, rows revoked since the
+    last refresh, and ids announced via NOTIFY are read. A full reload (which also picks up hard
+    deletes) runs on first load or when full=True.
+    """
+    global API_KEY_INDEX
     try:
-        keys = await get_all_api_keys()
-        API_KEY_CACHE = set(keys)
-        logger.info(f"API key cache refreshed: {len(API_KEY_CACHE)} keys loaded")
+        if full or not _refresh_state.loaded:
+            rows = await get_api_keys_changed_since(0, None)
+            API_KEY_INDEX = build_api_key_index(rows)
+            _refresh_state.last_id = 0
+            _refresh_state.last_revoked_at = None
+            _advance_high_water(rows)
+            _refresh_state.loaded = True
+            _refresh_state.last_full_refresh = time.monotonic()
+            _notified_key_ids.clear()
+            logger.info(f"API key cache refreshed: {len(API_KEY_INDEX)} keys loaded")
+            return
+
+        ids = list(_notified_key_ids)
+        _notified_key_ids.clear()
+        rows = await get_api_keys_changed_since(_refresh_state.last_id, _refresh_state.last_revoked_at, ids)
+        if rows:
+            _apply_api_key_rows(API_KEY_INDEX, rows)
+            _advance_high_water(rows)
+            logger.info(f"API key cache updated: {len(rows)} changed rows, {len(API_KEY_INDEX)} keys loaded")
     except Exception as e:
         logger.error(f"Failed to refresh API key cache: {e}")
 
+def _on_api_keys_changed(payload: str) -> None:
+    """NOTIFY callback: remember the announced key id and wake the refresher."""
+    if payload.isdigit():
+        _notified_key_ids.add(int(payload))
+    _refresh_requested.set()
+
 async def api_key_refresher():
-    """Background task to refresh API keys cache periodically"""
+    """Background task to refresh API keys cache: incrementally every interval or on NOTIFY, fully every full interval"""
     while True:
-        await refresh_api_keys_cache()
-        await asyncio.sleep(config.api_key_refresh_interval)
+        full = time.monotonic() - _refresh_state.last_full_refresh >= config.api_key_full_refresh_interval
+        await refresh_api_keys_cache(full=full)
+        try:
+            await asyncio.wait_for(_refresh_requested.wait(), timeout=config.api_key_refresh_interval)
+        except asyncio.TimeoutError:
+            pass
+        _refresh_requested.clear()
+
+async def api_key_change_listener():
+    """Background task: LISTEN for api_keys changes so new/revoked keys apply within milliseconds"""
+    while True:
+        closed = asyncio.Event()
+        try:
+            async with listen(API_KEYS_CHANNEL, _on_api_keys_changed, on_close=closed.set):
+                logger.info(f"Listening for API key changes on channel {API_KEYS_CHANNEL}")
+                # Catch up on anything committed while we were not listening
+                _refresh_requested.set()
+                await closed.wait()
+            logger.warning("API key change listener connection closed, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"API key change listener failed: {e}")
+        await asyncio.sleep(5)
 
 def get_dynamic_rate_limit() -> str:
     """
@@ -58,6 +186,20 @@ def get_dynamic_rate_limit() -> str:
         return config.rate_limit_authenticated
     return config.rate_limit_anonymous
 
+def get_verify_batch_rate_limit() -> str:
+    """Limit for /verify/batch, counted separately from the per-request endpoints."""
+    request = _current_request.get()
+    if request and getattr(request.state, "is_authenticated", False):
+        return config.rate_limit_verify_batch_authenticated
+    return config.rate_limit_verify_batch_anonymous
+
+def get_settle_batch_rate_limit() -> str:
+    """Limit for /settle/batch, counted separately from the per-request endpoints."""
+    request = _current_request.get()
+    if request and getattr(request.state, "is_authenticated", False):
+        return config.rate_limit_settle_batch_authenticated
+    return config.rate_limit_settle_batch_anonymous
+
 def get_dynamic_key_func(request: Request) -> str:
     """
     Returns a unique key for the current request context.
@@ -72,16 +214,19 @@ def get_dynamic_key_func(request: Request) -> str:
 
 async def rate_limit_middleware(request: Request, call_next):
     """
-    Middleware to check API Key against memory cache and set state for rate limiter.
+    Middleware to check API Key against memory cache and set state for rate limiter and seller scoping.
     Also sets the current request in ContextVar for the dynamic limit provider.
     """
     request.state.is_authenticated = False
     request.state.api_key = None
+    request.state.seller_id = None
     
     api_key = request.headers.get("X-API-KEY")
-    if api_key and _constant_time_key_check(api_key):
+    key_info = _lookup_api_key(api_key) if api_key else None
+    if key_info is not None:
         request.state.is_authenticated = True
         request.state.api_key = api_key
+        request.state.seller_id = key_info.seller_id
             
     # Set context variable for the duration of this request
     token = _current_request.set(request)
@@ -18,9 +18,11 @@ class Config:
     def __init__(self):
         self._config: dict = {}
         self._private_key_cache: dict[str, str] = {}  # network_id -> key (from 1Password or direct)
+        self._private_keys_cache: dict[str, list[str]] = {}  # network_id -> signer pool keys
         self._trongrid_api_key: Optional[str] = None
         self._database_password: Optional[str] = None
         self._loaded: bool = False
+        self.generation: int = 0  # incremented on every (re)load; caches derived from config compare it
         
     def load_from_yaml(self, config_path: Optional[str] = None) -> None:
         """
@@ -63,6 +65,7 @@ class Config:
 
         self._validate_required()
         self._loaded = True
+        self.generation += 1
     
     def _validate_required(self) -> None:
         """
@@ -90,9 +93,9 @@ class Config:
                 op_key = self._op_private_key_key(nid)
                 ref = op_cfg.get(op_key) if isinstance(op_cfg.get(op_key), str) else ""
                 has_op = bool(token_ok and ref.strip() and self._parse_op_ref(ref.strip()))
-                if not nc.get("private_key") and not has_op:
+                if not nc.get("private_key") and not nc.get("private_keys") and not has_op:
                     errors.append(
-                        f"facilitator.networks.{nid}.private_key is required, "
+                        f"facilitator.networks.{nid}.private_key (or private_keys) is required, "
                         f"or configure onepassword.{op_key} as 'vault/item/field'"
                     )
         if errors:
@@ -125,6 +128,21 @@ class Config:
         """Seconds before recycling a connection (pool_recycle). Default 600."""
         return int(self._config.get("database", {}).get("max_life_time", 600))
 
+    @property
+    def database_record_queue_size(self) -> int:
+        """Max payment records buffered by the write-behind recorder; beyond this records are written directly. Default 10000."""
+        return int(self._config.get("database", {}).get("record_queue_size", 10000))
+
+    @property
+    def database_record_batch_size(self) -> int:
+        """Max rows per batched payment record INSERT. Default 500."""
+        return int(self._config.get("database", {}).get("record_batch_size", 500))
+
+    @property
+    def database_record_flush_interval_ms(self) -> int:
+        """Max milliseconds a payment record waits in the write-behind queue. Default 50."""
+        return int(self._config.get("database", {}).get("record_flush_interval_ms", 50))
+
     @staticmethod
     def _parse_op_ref(ref: str) -> Optional[tuple[str, str, str]]:
         """Parse 'vault/item/field' into (vault, item, field). Returns None if invalid."""
@@ -178,6 +196,24 @@ class Config:
             return {"USDT": int(val)}
         return {}
 
+    def get_rpc_endpoints(self, network_id: str) -> list[str]:
+        """
+        RPC endpoint URLs for a network, routed by latency with failover.
+        YAML: networks.<id>.rpc_endpoints: [url, ...]. Empty: the endpoint the library would use.
+        """
+        val = self._network_config(network_id).get("rpc_endpoints") or []
+        if isinstance(val, str):
+            val = [val]
+        return [str(u).strip() for u in val if str(u).strip()]
+
+    def get_confirmation_depth(self, network_id: str) -> int:
+        """
+        Blocks a settled transaction must be buried under before it is `confirmed`.
+        YAML: networks.<id>.confirmations. Default 19 on TRON (solidified), 12 on EVM.
+        """
+        default = 19 if network_id.startswith("tron") else 12
+        return int(self._network_config(network_id).get("confirmations", default))
+
     @property
     def networks(self) -> list[str]:
         """Get list of network ids (all keys in facilitator.networks; listed = enabled)."""
@@ -201,6 +237,11 @@ class Config:
         """Get uvicorn workers (default 1). Use 2+ for higher settle QPS headroom."""
         return int(self._config.get("server", {}).get("workers", 1))
 
+    @property
+    def supported_cache_max_age(self) -> int:
+        """Cache-Control max-age (seconds) of the /supported response. Default 60."""
+        return int(self._config.get("server", {}).get("supported_max_age", 60))
+
     @property
     def logging_config(self) -> dict:
         """Get logging configuration"""
@@ -208,9 +249,14 @@ class Config:
 
     @property
     def api_key_refresh_interval(self) -> int:
-        """Get API key refresh interval in seconds"""
+        """Get API key refresh interval in seconds (incremental; NOTIFY api_keys_changed triggers one immediately)"""
         return self._config.get("rate_limit", {}).get("api_key_refresh_interval", 60)
 
+    @property
+    def api_key_full_refresh_interval(self) -> int:
+        """Seconds between full API key reloads (incremental refreshes run in between). Default 3600."""
+        return int(self._config.get("rate_limit", {}).get("api_key_full_refresh_interval", 3600))
+
     @property
     def rate_limit_authenticated(self) -> str:
         """Get rate limit for authenticated users"""
@@ -221,6 +267,186 @@ class Config:
         """Get rate limit for anonymous users"""
         return self._config.get("rate_limit", {}).get("anonymous", "1/minute")
 
+    @property
+    def rate_limit_verify_batch_authenticated(self) -> str:
+        """Rate limit of /verify/batch requests for authenticated users. Default 100/minute."""
+        return self._config.get("rate_limit", {}).get("verify_batch_authenticated", "100/minute")
+
+    @property
+    def rate_limit_verify_batch_anonymous(self) -> str:
+        """Rate limit of /verify/batch requests for anonymous users. Default 1/minute."""
+        return self._config.get("rate_limit", {}).get("verify_batch_anonymous", "1/minute")
+
+    @property
+    def rate_limit_settle_batch_authenticated(self) -> str:
+        """Rate limit of /settle/batch requests for authenticated users. Default 100/minute."""
+        return self._config.get("rate_limit", {}).get("settle_batch_authenticated", "100/minute")
+
+    @property
+    def rate_limit_settle_batch_anonymous(self) -> str:
+        """Rate limit of /settle/batch requests for anonymous users. Default 1/minute."""
+        return self._config.get("rate_limit", {}).get("settle_batch_anonymous", "1/minute")
+
+    @property
+    def settle_batch_max_items(self) -> int:
+        """Max items in one /settle/batch request. Default 100."""
+        return int(self._config.get("settle_batch", {}).get("max_items", 100))
+
+    @property
+    def settle_batch_network_concurrency(self) -> int:
+        """Items of one /settle/batch request settled concurrently per network/scheme group. Default 8."""
+        return int(self._config.get("settle_batch", {}).get("network_concurrency", 8))
+
+    @property
+    def verify_batch_max_items(self) -> int:
+        """Max items in one /verify/batch request. Default 100."""
+        return int(self._config.get("verify_batch", {}).get("max_items", 100))
+
+    @property
+    def verify_batch_concurrency(self) -> int:
+        """Items of one /verify/batch request verified concurrently. Default 16."""
+        return int(self._config.get("verify_batch", {}).get("concurrency", 16))
+
+    @property
+    def settlement_async_workers(self) -> int:
+        """Number of in-process workers draining async settle requests. Default 32."""
+        return int(self._config.get("settlement", {}).get("async_workers", 32))
+
+    @property
+    def settlement_async_queue_size(self) -> int:
+        """Max async settle requests waiting for a worker; beyond this /settle returns 503. Default 1000."""
+        return int(self._config.get("settlement", {}).get("async_queue_size", 1000))
+
+    @property
+    def settlement_ticket_ttl(self) -> int:
+        """Seconds a finished settlement ticket stays pollable. Default 3600."""
+        return int(self._config.get("settlement", {}).get("ticket_ttl", 3600))
+
+    @property
+    def settlement_shutdown_timeout(self) -> int:
+        """Seconds to wait for queued async settlements on shutdown. Default 30."""
+        return int(self._config.get("settlement", {}).get("shutdown_timeout", 30))
+
+    @property
+    def idempotency_ttl(self) -> int:
+        """Seconds a successful settle result is replayed for duplicate requests from memory. Default 600."""
+        return int(self._config.get("idempotency", {}).get("ttl", 600))
+
+    @property
+    def idempotency_max_entries(self) -> int:
+        """Max settle results kept in the in-memory replay cache. Default 10000."""
+        return int(self._config.get("idempotency", {}).get("max_entries", 10000))
+
+    @property
+    def idempotency_pending_timeout(self) -> int:
+        """Seconds after which a pending settle claim (e.g. from a crashed replica) can be taken over. Default 300."""
+        return int(self._config.get("idempotency", {}).get("pending_timeout", 300))
+
+    @property
+    def idempotency_retention(self) -> int:
+        """Seconds a completed settle is kept in the settle_idempotency table for replay (0 = forever). Default 604800."""
+        return int(self._config.get("idempotency", {}).get("retention", 604800))
+
+    @property
+    def idempotency_prune_interval(self) -> float:
+        """Seconds between deletions of settle_idempotency rows past retention. Default 3600."""
+        return float(self._config.get("idempotency", {}).get("prune_interval", 3600))
+
+    @property
+    def replay_filter_enabled(self) -> bool:
+        """Reject settles of paymentIds already settled on the network (Bloom filter + DB check). Default True."""
+        return bool(self._config.get("replay_filter", {}).get("enabled", True))
+
+    @property
+    def replay_filter_capacity(self) -> int:
+        """Expected settled paymentIds per network; sizes each filter. Default 1000000."""
+        return int(self._config.get("replay_filter", {}).get("capacity", 1_000_000))
+
+    @property
+    def replay_filter_error_rate(self) -> float:
+        """Target false-positive rate of the replay filter (hits are confirmed in the DB). Default 0.001."""
+        return float(self._config.get("replay_filter", {}).get("error_rate", 0.001))
+
+    @property
+    def rpc_timeout(self) -> float:
+        """Per-request timeout in seconds for chain RPC calls. Default 10."""
+        return float(self._config.get("rpc", {}).get("timeout", 10))
+
+    @property
+    def rpc_connect_timeout(self) -> float:
+        """Connect timeout in seconds for chain RPC calls. Default 5."""
+        return float(self._config.get("rpc", {}).get("connect_timeout", 5))
+
+    @property
+    def rpc_http2(self) -> bool:
+        """Use HTTP/2 for chain RPC when h2 is installed. Default True."""
+        return bool(self._config.get("rpc", {}).get("http2", True))
+
+    @property
+    def rpc_max_connections(self) -> int:
+        """Max connections in the shared chain RPC pool. Default 100."""
+        return int(self._config.get("rpc", {}).get("max_connections", 100))
+
+    @property
+    def rpc_max_keepalive_connections(self) -> int:
+        """Max idle keepalive connections in the shared chain RPC pool. Default 20."""
+        return int(self._config.get("rpc", {}).get("max_keepalive_connections", 20))
+
+    @property
+    def rpc_keepalive_expiry(self) -> float:
+        """Seconds an idle pooled connection is kept open. Default 30."""
+        return float(self._config.get("rpc", {}).get("keepalive_expiry", 30))
+
+    @property
+    def rpc_max_connections_per_host(self) -> int:
+        """Max concurrent requests per RPC host through the shared pool. Default 50."""
+        return int(self._config.get("rpc", {}).get("max_connections_per_host", 50))
+
+    @property
+    def rpc_ewma_alpha(self) -> float:
+        """Weight of the newest sample in endpoint latency/error EWMAs. Default 0.3."""
+        return float(self._config.get("rpc", {}).get("ewma_alpha", 0.3))
+
+    @property
+    def rpc_failure_threshold(self) -> int:
+        """Consecutive failures before an endpoint is ejected. Default 3."""
+        return int(self._config.get("rpc", {}).get("failure_threshold", 3))
+
+    @property
+    def rpc_ref_block_refresh_interval(self) -> float:
+        """TRON: seconds between background refreshes of the cached reference block. Default 3."""
+        return float(self._config.get("rpc", {}).get("ref_block_refresh_interval", 3))
+
+    @property
+    def rpc_ref_block_max_age(self) -> float:
+        """TRON: seconds after which a cached reference block is fetched live instead. Default 30."""
+        return float(self._config.get("rpc", {}).get("ref_block_max_age", 30))
+
+    @property
+    def rpc_cooldown(self) -> float:
+        """Seconds an ejected endpoint stays out of rotation before a trial call. Default 30."""
+        return float(self._config.get("rpc", {}).get("cooldown", 30))
+
+    @property
+    def confirmations_enabled(self) -> bool:
+        """Track settled transactions until confirmed/reverted. Default True."""
+        return bool(self._config.get("confirmations", {}).get("enabled", True))
+
+    @property
+    def confirmations_poll_interval(self) -> float:
+        """Seconds between confirmation poll cycles per network. Default 3."""
+        return float(self._config.get("confirmations", {}).get("poll_interval", 3))
+
+    @property
+    def confirmations_concurrency(self) -> int:
+        """Max concurrent receipt requests per network within one poll cycle. Default 16."""
+        return int(self._config.get("confirmations", {}).get("concurrency", 16))
+
+    @property
+    def confirmations_max_pending_age(self) -> int:
+        """Seconds after which an unresolved settlement is no longer tracked. Default 3600."""
+        return int(self._config.get("confirmations", {}).get("max_pending_age", 3600))
+
     @property
     def monitoring_port(self) -> int:
         """Get monitoring port, defaults to server port if not specified"""
@@ -267,6 +493,138 @@ class Config:
         self._private_key_cache[network_id] = key
         return key
 
+    async def get_private_keys(self, network_id: str) -> list[str]:
+        """
+        Get all signer private keys for a network.
+        YAML: facilitator.networks.<id>.private_keys: [hex key or 1Password 'vault/item/field', ...].
+        Without private_keys, the single key from get_private_key().
+
+        Returns:
+            Private key strings (at least one)
+        """
+        entries = self._network_config(network_id).get("private_keys") or []
+        if not entries:
+            return [await self.get_private_key(network_id)]
+
+        if network_id in self._private_keys_cache:
+            return list(self._private_keys_cache[network_id])
+
+        keys = []
+        for index, entry in enumerate(entries):
+            entry = str(entry or "").strip()
+            parsed = self._parse_op_ref(entry)
+            if parsed is None:
+                if not entry:
+                    raise ValueError(f"facilitator.networks.{network_id}.private_keys[{index}] is empty")
+                keys.append(entry)
+                continue
+            token = self.onepassword_token
+            if not token or token in ("your-op-token", "your-service-account-token"):
+                raise ValueError(
+                    f"facilitator.networks.{network_id}.private_keys[{index}] is a 1Password reference "
+                    "but no 1Password token is configured"
+                )
+            from onepassword_client import get_secret_from_1password
+            vault, item, field = parsed
+            keys.append(await get_secret_from_1password(vault=vault, item=item, field=field, token=token))
+        self._private_keys_cache[network_id] = keys
+        return list(keys)
+
+    @property
+    def signer_failure_threshold(self) -> int:
+        """Consecutive signer-side settle failures before a pooled signer leaves rotation. Default 3."""
+        return int(self._config.get("signers", {}).get("failure_threshold", 3))
+
+    @property
+    def signer_cooldown(self) -> float:
+        """Seconds a failing pooled signer stays out of rotation. Default 60."""
+        return float(self._config.get("signers", {}).get("cooldown", 60))
+
+    @property
+    def signer_resource_interval(self) -> float:
+        """Seconds between signer balance/energy/bandwidth metric refreshes (0 disables). Default 60."""
+        return float(self._config.get("signers", {}).get("resource_interval", 60))
+
+    @property
+    def signer_nonce_resync_interval(self) -> float:
+        """Seconds between EVM signer nonce resyncs from the chain (also resynced after send errors). Default 60."""
+        return float(self._config.get("signers", {}).get("nonce_resync_interval", 60))
+
+    @property
+    def gas_refresh_interval(self) -> float:
+        """EVM: seconds between gas price oracle refreshes. Default 3."""
+        return float(self._config.get("gas", {}).get("refresh_interval", 3))
+
+    @property
+    def gas_max_age(self) -> float:
+        """EVM: seconds after which a fee estimate is stale and web3 fetches fees itself. Default 30."""
+        return float(self._config.get("gas", {}).get("max_age", 30))
+
+    @property
+    def gas_priority_percentile(self) -> int:
+        """EVM: priority fee percentile (10, 50 or 90) of recent blocks used for new transactions. Default 50."""
+        return int(self._config.get("gas", {}).get("priority_percentile", 50))
+
+    @property
+    def gas_history_blocks(self) -> int:
+        """EVM: blocks of eth_feeHistory per refresh. Default 10."""
+        return int(self._config.get("gas", {}).get("history_blocks", 10))
+
+    @property
+    def fee_quote_cache_ttl(self) -> float:
+        """Seconds a fee quote is served from cache (0 disables caching). Default 10."""
+        return float(self._config.get("fee_quote", {}).get("cache_ttl", 10))
+
+    @property
+    def fee_quote_cache_max_entries(self) -> int:
+        """Max cached fee quotes (one per requirement and signer). Default 10000."""
+        return int(self._config.get("fee_quote", {}).get("cache_max_entries", 10000))
+
+    @property
+    def verification_ticket_ttl(self) -> int:
+        """Seconds a /verify ticket lets /settle skip the signature check (0 disables). Default 60."""
+        return int(self._config.get("verification_ticket", {}).get("ttl", 60))
+
+    @property
+    def verification_ticket_secret(self) -> Optional[str]:
+        """
+        HMAC secret for verification tickets, shared by all workers/replicas.
+        Priority: env VERIFICATION_TICKET_SECRET, then verification_ticket.secret in YAML.
+        None: a random per-process secret (tickets only work on the issuing process).
+        """
+        return os.getenv("VERIFICATION_TICKET_SECRET") or self._config.get("verification_ticket", {}).get("secret")
+
+    @property
+    def crypto_executor(self) -> str:
+        """Where signature recovery and local signing run: inline, thread or process. Default inline."""
+        return str(self._config.get("crypto", {}).get("executor", "inline"))
+
+    @property
+    def crypto_workers(self) -> Optional[int]:
+        """Thread/process pool size of the crypto executor. Default None (CPU count)."""
+        workers = self._config.get("crypto", {}).get("workers")
+        return int(workers) if workers else None
+
+    @property
+    def crypto_backend(self) -> str:
+        """secp256k1 backend for signature recovery: auto (coincurve if installed), coincurve or python. Default auto."""
+        return str(self._config.get("crypto", {}).get("backend", "auto"))
+
+    @property
+    def crypto_batch_window_ms(self) -> float:
+        """Milliseconds to collect concurrent recoveries into one executor call (0 disables). Default 0."""
+        return float(self._config.get("crypto", {}).get("batch_window_ms", 0))
+
+    @property
+    def crypto_batch_max_size(self) -> int:
+        """Recoveries per batched executor call. Default 64."""
+        return int(self._config.get("crypto", {}).get("batch_max_size", 64))
+
+    @property
+    def event_loop_lag_interval(self) -> float:
+        """Seconds between event loop lag probes (0 disables). Default 0.5."""
+        return float(self._config.get("monitoring", {}).get("loop_lag_interval", 0.5))
+
     async def get_trongrid_api_key(self) -> Optional[str]:
         """
         Get TronGrid API Key.
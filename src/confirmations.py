@@ -0,0 +1,248 @@
+"""
+Confirmation tracking - follows settled transactions until they are buried under enough blocks.
+
+One tracker per network keeps the pending tx hashes and, once per poll cycle, fetches the chain head
+and every pending receipt, then moves payment_records from `success` to `confirmed` / `reverted`.
+Pending state lives in payment_records itself (status `success`), so a restart resumes from the DB.
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from database import get_unconfirmed_tx_hashes, update_payment_status_by_tx_hash
+from monitoring import CONFIRMATION_PENDING, CONFIRMATION_POLL_SECONDS, CONFIRMATIONS_RESOLVED
+
+logger = logging.getLogger(__name__)
+
+# payment_records.status values
+STATUS_SETTLED = "success"  # written by /settle; tx included, not yet deep enough
+STATUS_CONFIRMED = "confirmed"
+STATUS_REVERTED = "reverted"
+
+
+@dataclass(frozen=True)
+class TxReceipt:
+    """Block inclusion and execution result of one transaction."""
+
+    block_number: int
+    success: bool
+
+
+class ReceiptSource(ABC):
+    """Chain access used by a tracker: head block number and receipts for many transactions."""
+
+    def __init__(self, concurrency: int = 16) -> None:
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @abstractmethod
+    async def head_block(self) -> int:
+        """Latest block number."""
+
+    @abstractmethod
+    async def _fetch_receipt(self, tx_hash: str) -> Optional[TxReceipt]:
+        """Receipt of one transaction; None if it is not (yet) in a block."""
+
+    async def fetch_receipts(self, tx_hashes: list[str]) -> dict[str, TxReceipt]:
+        """Receipts for all tx_hashes (at most concurrency requests in flight); missing ones are omitted."""
+
+        async def fetch(tx_hash: str) -> Optional[TxReceipt]:
+            async with self._semaphore:
+                try:
+                    return await self._fetch_receipt(tx_hash)
+                except Exception as e:
+                    logger.debug(f"Receipt fetch failed for {tx_hash}: {e}")
+                    return None
+
+        receipts = await asyncio.gather(*(fetch(h) for h in tx_hashes))
+        return {h: r for h, r in zip(tx_hashes, receipts) if r is not None}
+
+
+class TronReceiptSource(ReceiptSource):
+    """TRON receipts via the facilitator signer's AsyncTron client (gettransactioninfobyid)."""
+
+    def __init__(self, signer: Any, network: str, concurrency: int = 16) -> None:
+        super().__init__(concurrency)
+        self._signer = signer
+        self._network = network
+
+    def _client(self) -> Any:
+        client = self._signer._ensure_async_tron_client(self._network)
+        if client is None:
+            raise RuntimeError("AsyncTron client required")
+        return client
+
+    async def head_block(self) -> int:
+        return await self._client().get_latest_block_number()
+
+    async def _fetch_receipt(self, tx_hash: str) -> Optional[TxReceipt]:
+        info = await self._client().get_transaction_info(tx_hash)
+        if not info or not info.get("blockNumber"):
+            return None
+        return TxReceipt(
+            block_number=int(info["blockNumber"]),
+            success=info.get("receipt", {}).get("result") == "SUCCESS",
+        )
+
+
+class EvmReceiptSource(ReceiptSource):
+    """EVM receipts via the facilitator signer's AsyncWeb3 client (eth_getTransactionReceipt)."""
+
+    def __init__(self, signer: Any, network: str, concurrency: int = 16) -> None:
+        super().__init__(concurrency)
+        self._signer = signer
+        self._network = network
+
+    def _client(self) -> Any:
+        w3 = self._signer._ensure_async_web3_client(self._network)
+        if w3 is None:
+            raise RuntimeError("Web3 provider not configured")
+        return w3
+
+    async def head_block(self) -> int:
+        return await self._client().eth.block_number
+
+    async def _fetch_receipt(self, tx_hash: str) -> Optional[TxReceipt]:
+        from web3.exceptions import TransactionNotFound
+
+        try:
+            receipt = await self._client().eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+        if receipt is None or receipt.get("blockNumber") is None:
+            return None
+        return TxReceipt(block_number=int(receipt["blockNumber"]), success=receipt["status"] == 1)
+
+
+class ConfirmationTracker:
+    """
+    Pending settlements of one network, resolved in one batched poll per cycle.
+
+    A transaction counts as final once head - block_number + 1 >= depth. Entries older than
+    max_pending_age seconds are dropped (e.g. dropped or never-recorded transactions).
+    """
+
+    def __init__(self, network: str, source: ReceiptSource, *, depth: int, max_pending_age: int) -> None:
+        self.network = network
+        self._source = source
+        self._depth = max(1, depth)
+        self._max_pending_age = max_pending_age
+        self._pending: "OrderedDict[str, float]" = OrderedDict()  # tx_hash -> first tracked (monotonic)
+
+    @property
+    def pending(self) -> list[str]:
+        return list(self._pending)
+
+    def track(self, tx_hash: str) -> None:
+        """Start following tx_hash (no-op if already tracked)."""
+        if tx_hash and tx_hash not in self._pending:
+            self._pending[tx_hash] = time.monotonic()
+            CONFIRMATION_PENDING.labels(network=self.network).set(len(self._pending))
+
+    async def load_pending(self) -> None:
+        """Resume tracking of recent settlements that are still `success` in payment_records."""
+        since = datetime.now(timezone.utc) - timedelta(seconds=self._max_pending_age)
+        for tx_hash in await get_unconfirmed_tx_hashes(self.network, since):
+            self.track(tx_hash)
+        if self._pending:
+            logger.info(f"Resumed confirmation tracking for {len(self._pending)} txs on {self.network}")
+
+    async def poll_once(self) -> None:
+        """One cycle: head block + all pending receipts, then one UPDATE per resolved status."""
+        self._expire()
+        if not self._pending:
+            return
+        started = time.perf_counter()
+        tx_hashes = list(self._pending)
+        head = await self._source.head_block()
+        receipts = await self._source.fetch_receipts(tx_hashes)
+
+        resolved: dict[str, list[str]] = {STATUS_CONFIRMED: [], STATUS_REVERTED: []}
+        for tx_hash, receipt in receipts.items():
+            if head - receipt.block_number + 1 >= self._depth:
+                resolved[STATUS_CONFIRMED if receipt.success else STATUS_REVERTED].append(tx_hash)
+
+        for status, hashes in resolved.items():
+            if not hashes:
+                continue
+            # Rows not returned are not flushed by the recorder yet; they stay pending for the next cycle
+            updated = await update_payment_status_by_tx_hash(
+                self.network, hashes, status, from_status=STATUS_SETTLED
+            )
+            for tx_hash in updated:
+                self._pending.pop(tx_hash, None)
+            CONFIRMATIONS_RESOLVED.labels(network=self.network, status=status).inc(len(updated))
+            if status == STATUS_REVERTED and updated:
+                logger.warning(f"Settled transactions reverted on {self.network}: {', '.join(updated)}")
+
+        CONFIRMATION_PENDING.labels(network=self.network).set(len(self._pending))
+        CONFIRMATION_POLL_SECONDS.labels(network=self.network).observe(time.perf_counter() - started)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self._max_pending_age
+        while self._pending:
+            tx_hash, tracked_at = next(iter(self._pending.items()))
+            if tracked_at >= cutoff:
+                break
+            self._pending.popitem(last=False)
+            logger.warning(f"Gave up confirming {tx_hash} on {self.network} after {self._max_pending_age}s")
+
+
+class ConfirmationTrackers:
+    """Registry of per-network trackers, each polled by its own background task."""
+
+    def __init__(self) -> None:
+        self._trackers: dict[str, ConfirmationTracker] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._poll_interval: float = 3.0
+
+    def add(self, tracker: ConfirmationTracker) -> None:
+        self._trackers[tracker.network] = tracker
+
+    def get(self, network: str) -> Optional[ConfirmationTracker]:
+        return self._trackers.get(network)
+
+    def track(self, network: str | None, tx_hash: str) -> None:
+        """Follow a settled transaction; ignored for networks without a tracker."""
+        tracker = self._trackers.get(network or "")
+        if tracker is not None:
+            tracker.track(tx_hash)
+
+    async def start(self, *, poll_interval: float) -> None:
+        """Load pending state from the DB and start one poll loop per network."""
+        self._poll_interval = poll_interval
+        for tracker in self._trackers.values():
+            try:
+                await tracker.load_pending()
+            except Exception:
+                logger.exception(f"Failed to load pending confirmations for {tracker.network}")
+            self._tasks.append(
+                asyncio.create_task(self._run(tracker), name=f"confirmations-{tracker.network}")
+            )
+        if self._trackers:
+            logger.info(f"Confirmation tracking started for: {', '.join(self._trackers)}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, tracker: ConfirmationTracker) -> None:
+        while True:
+            try:
+                await tracker.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Confirmation poll failed on {tracker.network}")
+            await asyncio.sleep(self._poll_interval)
+
+
+# Global confirmation trackers (one per configured network)
+confirmation_trackers = ConfirmationTrackers()
@@ -0,0 +1,346 @@
+"""
+Crypto offload - runs CPU-bound signature recovery and transaction signing off the event loop.
+
+EIP-712 hashing plus ECDSA recovery (every /verify and /settle) and local transaction signing
+take long enough to stall every other request on the worker's loop during bursts. The executor
+is `inline` (on the loop, the default), `thread` or `process`; the functions it runs are
+module-level so a process pool can pickle them.
+
+Recovery uses a pluggable secp256k1 backend (native libsecp256k1 via coincurve when installed,
+else pure Python), domain separators and type hashes are cached, and bursts of recoveries can be
+collected into one executor call (crypto.batch_window_ms).
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from eth_abi import encode as abi_encode
+from eth_account._utils.encode_typed_data.encoding_and_hashing import (
+    encode_field,
+    get_primary_type,
+    hash_domain,
+    hash_type,
+    is_array_type,
+    parse_core_array_type,
+    parse_parent_array_type,
+)
+from eth_utils import keccak, to_checksum_address
+
+from monitoring import CRYPTO_BATCH_SIZE, CRYPTO_OP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+BACKENDS = ("auto", "coincurve", "python")
+
+# keccak(encode((), ())): hash of an empty array field
+_EMPTY_ARRAY_HASH = keccak(b"")
+
+
+# --- secp256k1 backends ---
+
+
+class CoincurveBackend:
+    """Public key recovery with libsecp256k1 (coincurve)."""
+
+    name = "coincurve"
+
+    def __init__(self) -> None:
+        from coincurve import PublicKey
+
+        self._public_key = PublicKey
+
+    def recover(self, msg_hash: bytes, r: int, s: int, v: int) -> str:
+        signature = r.to_bytes(32, "big") + s.to_bytes(32, "big") + bytes([v])
+        public_key = self._public_key.from_signature_and_message(signature, msg_hash, hasher=None)
+        return to_checksum_address(keccak(public_key.format(compressed=False)[1:])[-20:])
+
+
+class PythonBackend:
+    """Public key recovery in pure Python (eth_keys native backend)."""
+
+    name = "python"
+
+    def __init__(self) -> None:
+        from eth_keys import KeyAPI
+        from eth_keys.backends import NativeECCBackend
+
+        self._keys = KeyAPI(NativeECCBackend)
+
+    def recover(self, msg_hash: bytes, r: int, s: int, v: int) -> str:
+        signature = self._keys.Signature(vrs=(v, r, s))
+        return self._keys.ecdsa_recover(msg_hash, signature).to_checksum_address()
+
+
+_backend: Any = None
+
+
+def set_backend(name: str = "auto") -> str:
+    """Select the recovery backend of this process; auto prefers coincurve. Returns the backend used."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"crypto.backend must be one of {', '.join(BACKENDS)}")
+    if name in ("auto", "coincurve"):
+        try:
+            _backend = CoincurveBackend()
+            return _backend.name
+        except ImportError:
+            if name == "coincurve":
+                raise
+            logger.warning("coincurve not installed; using the pure-Python secp256k1 backend")
+    _backend = PythonBackend()
+    return _backend.name
+
+
+def _get_backend() -> Any:
+    if _backend is None:
+        set_backend()
+    return _backend
+
+
+# --- EIP-712 hashing ---
+
+
+@functools.lru_cache(maxsize=1024)
+def _domain_separator(domain_json: str) -> bytes:
+    return hash_domain(json.loads(domain_json))
+
+
+@functools.lru_cache(maxsize=256)
+def _type_info(types_json: str) -> tuple[dict, str, dict[str, bytes]]:
+    """(types without EIP712Domain, derived primary type, type hash per struct) of a types object."""
+    types = json.loads(types_json)
+    types.pop("EIP712Domain", None)
+    return types, get_primary_type(types), {name: hash_type(name, types) for name in types}
+
+
+def _struct_hash(type_: str, types: dict, type_hashes: dict[str, bytes], data: dict[str, Any]) -> bytes:
+    encoded_types = ["bytes32"]
+    encoded_values: list[Any] = [type_hashes[type_]]
+    for field in types[type_]:
+        field_type, value = _encode_field(types, type_hashes, field["name"], field["type"], data.get(field["name"]))
+        encoded_types.append(field_type)
+        encoded_values.append(value)
+    return keccak(abi_encode(encoded_types, encoded_values))
+
+
+def _encode_field(types: dict, type_hashes: dict[str, bytes], name: str, type_: str, value: Any) -> tuple[str, Any]:
+    # Structs (and arrays of them) use the cached type hashes; atomic fields encode like eth_account
+    if type_ in types:
+        if value is None:
+            return "bytes32", b"\x00" * 32
+        return "bytes32", _struct_hash(type_, types, type_hashes, value)
+    if is_array_type(type_) and parse_core_array_type(type_) in types:
+        if not isinstance(value, list):
+            raise ValueError(f"Invalid value for field `{name}` of type `{type_}`: expected array")
+        item_type = parse_parent_array_type(type_)
+        if not value:
+            return "bytes32", _EMPTY_ARRAY_HASH
+        pairs = [_encode_field(types, type_hashes, name, item_type, item) for item in value]
+        item_types, item_values = zip(*pairs)
+        return "bytes32", keccak(abi_encode(list(item_types), list(item_values)))
+    return encode_field(types, name, type_, value)
+
+
+def _bytes_to_hex(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    raise TypeError(f"Unsupported domain value: {value!r}")
+
+
+def typed_data_hash(domain: dict[str, Any], types: dict[str, Any], message: dict[str, Any], primary_type: str) -> bytes:
+    """EIP-712 signing hash, with cached domain separator and type hashes (same checks as encode_typed_data)."""
+    domain_fields = types.get("EIP712Domain")
+    if domain_fields is not None and set(domain) != {field["name"] for field in domain_fields}:
+        raise ValueError("The fields provided in `domain` do not match the fields provided in `types.EIP712Domain`")
+    message_types, derived_primary, type_hashes = _type_info(json.dumps(types, sort_keys=True))
+    if primary_type != derived_primary:
+        raise ValueError(f"primaryType {primary_type} does not match the derived primaryType {derived_primary}")
+    separator = _domain_separator(json.dumps(domain, sort_keys=True, default=_bytes_to_hex))
+    return keccak(b"\x19\x01" + separator + _struct_hash(primary_type, message_types, type_hashes, message))
+
+
+def _split_signature(signature: str) -> tuple[int, int, int]:
+    sig_bytes = bytes.fromhex(signature[2:] if signature.startswith("0x") else signature)
+    if len(sig_bytes) != 65:
+        raise ValueError("Signature must be 65 bytes")
+    # Same v handling as eth_account (to_standard_v): 0/1, 27/28 or EIP-155 (35+)
+    v = sig_bytes[64]
+    if v >= 35:
+        v = (v - 35) % 2
+    elif v >= 27:
+        v -= 27
+    if v not in (0, 1):
+        raise ValueError(f"v {sig_bytes[64]} is invalid, must be one of: 0, 1, 27, 28, 35+")
+    return int.from_bytes(sig_bytes[:32], "big"), int.from_bytes(sig_bytes[32:64], "big"), v
+
+
+# --- executor jobs (module-level so a process pool can pickle them) ---
+
+
+def recover_typed_data_signer(
+    domain: dict[str, Any],
+    types: dict[str, Any],
+    message: dict[str, Any],
+    primary_type: str,
+    signature: str,
+) -> str:
+    """Address (0x, checksummed) that produced an EIP-712 signature."""
+    r, s, v = _split_signature(signature)
+    return _get_backend().recover(typed_data_hash(domain, types, message, primary_type), r, s, v)
+
+
+def recover_typed_data_signers(items: list[tuple[Any, ...]]) -> list[Any]:
+    """recover_typed_data_signer for each item; a failed item yields its exception instead of an address."""
+    results: list[Any] = []
+    for item in items:
+        try:
+            results.append(recover_typed_data_signer(*item))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def sign_evm_transaction(tx: dict[str, Any], private_key: bytes) -> bytes:
+    """Raw signed EVM transaction."""
+    from eth_account import Account
+
+    return bytes(Account.sign_transaction(tx, private_key).raw_transaction)
+
+
+def _init_worker(backend: str) -> None:
+    set_backend(backend)
+
+
+class CryptoExecutor:
+    """Runs crypto functions inline, in a thread pool or in a process pool (configured at startup)."""
+
+    def __init__(self) -> None:
+        self._mode = "inline"
+        self._executor: Optional[Executor] = None
+        self._batch_window = 0.0
+        self._batch_max_size = 64
+        self._pending: list[tuple[tuple[Any, ...], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: set[asyncio.Task] = set()
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    def start(
+        self,
+        *,
+        mode: str,
+        workers: int | None = None,
+        backend: str = "auto",
+        batch_window_ms: float = 0,
+        batch_max_size: int = 64,
+    ) -> None:
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"crypto.executor must be one of {', '.join(EXECUTOR_MODES)}")
+        workers = workers or os.cpu_count() or 1
+        backend = set_backend(backend)
+        self._mode = mode
+        self._batch_window = batch_window_ms / 1000
+        self._batch_max_size = max(1, batch_max_size)
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crypto")
+        elif mode == "process":
+            # spawn: forking a process that already runs threads (asyncpg, httpx) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(backend,),
+            )
+            for _ in range(workers):
+                self._executor.submit(int)
+        logger.info(
+            f"Crypto executor: {mode}"
+            + (f" ({workers} workers)" if mode != "inline" else "")
+            + f", secp256k1 backend: {backend}"
+        )
+
+    def stop(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Crypto executor stopped"))
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._mode = "inline"
+        self._batch_window = 0.0
+
+    async def run(self, op: str, fn: Callable[..., T], *args: Any) -> T:
+        """fn(*args) on the configured executor; op labels the duration metric."""
+        started = time.perf_counter()
+        try:
+            if self._executor is None:
+                return fn(*args)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            CRYPTO_OP_SECONDS.labels(op=op, executor=self._mode).observe(time.perf_counter() - started)
+
+    async def recover_typed_data(
+        self,
+        domain: dict[str, Any],
+        types: dict[str, Any],
+        message: dict[str, Any],
+        primary_type: str,
+        signature: str,
+    ) -> str:
+        """EIP-712 signer address; with a batch window, recoveries arriving together share one executor call."""
+        item = (domain, types, message, primary_type, signature)
+        if self._batch_window <= 0:
+            return await self.run("recover", recover_typed_data_signer, *item)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._batch_max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._recover_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _recover_batch(self, batch: list[tuple[tuple[Any, ...], asyncio.Future]]) -> None:
+        CRYPTO_BATCH_SIZE.observe(len(batch))
+        try:
+            results = await self.run("recover_batch", recover_typed_data_signers, [item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Global crypto executor
+crypto_executor = CryptoExecutor()
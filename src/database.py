@@ -2,13 +2,16 @@
 Database module for payment record persistence
 """
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional
 
-from sqlalchemy import String, DateTime, BigInteger
+from sqlalchemy import String, DateTime, BigInteger, Text, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from migrations import run_migrations
+
 
 def _ssl_for_asyncpg(ssl_mode: str):
     """Return ssl argument for asyncpg: False when disable, True otherwise."""
@@ -49,6 +52,8 @@ class APIKey(Base):
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
+    # Tombstone: set to revoke the key (rows are kept so incremental refresh sees the revocation)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
 class Seller(Base):
@@ -64,6 +69,31 @@ class Seller(Base):
         nullable=False,
     )
 
+class SettleIdempotencyRecord(Base):
+    """Settle idempotency claim: one row per (network, payment_id, payload hash)"""
+
+    __tablename__ = "settle_idempotency"
+
+    idempotency_key: Mapped[str] = mapped_column(String(256), primary_key=True)
+    network: Mapped[str] = mapped_column(String(32), nullable=False)
+    payment_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)  # pending | done
+    response: Mapped[str | None] = mapped_column(Text, nullable=True)  # SettleResponse JSON when done
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+# NOTIFY channel for api_keys inserts/revocations (payload: api key row id, may be empty)
+API_KEYS_CHANNEL = "api_keys_changed"
+
 # Global engine and session maker
 _engine = None
 _async_session_maker = None
@@ -79,7 +109,7 @@ async def init_database(
     ssl_mode: str,
 ) -> None:
     """
-    Initialize the database connection and create tables.
+    Initialize the database connection and apply pending schema migrations.
     """
     global _engine, _async_session_maker
 
@@ -97,9 +127,9 @@ async def init_database(
 
     _async_session_maker = async_sessionmaker(_engine, expire_on_commit=False)
     
-    # Create tables
+    # Create / upgrade tables (see migrations.py; models below must match the migrated schema)
     async with _engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
 
 
 def get_session() -> AsyncSession:
@@ -117,17 +147,77 @@ def get_session() -> AsyncSession:
     return _async_session_maker()
 
 
-async def get_all_api_keys() -> list[str]:
+async def get_api_keys_changed_since(
+    after_id: int,
+    revoked_since: datetime | None,
+    ids: list[int] | None = None,
+) -> list[APIKey]:
     """
-    Get all active API keys from database.
-    
+    Get API key rows changed since a high-water mark, including revoked rows (tombstones).
+
+    Args:
+        after_id: Return rows with id > after_id (new keys)
+        revoked_since: Also return rows revoked after this time (None: any revoked row)
+        ids: Also return these rows (ids announced via NOTIFY, in case of out-of-order commits)
+
     Returns:
-        List of API key strings
+        APIKey rows ordered by id; callers drop rows with revoked_at set
     """
-    from sqlalchemy import select
+    from sqlalchemy import select, or_
+    conditions = [APIKey.id > after_id]
+    if revoked_since is None:
+        conditions.append(APIKey.revoked_at.is_not(None))
+    else:
+        conditions.append(APIKey.revoked_at > revoked_since)
+    if ids:
+        conditions.append(APIKey.id.in_(ids))
     async with get_session() as session:
-        result = await session.execute(select(APIKey.key))
-        return [row[0] for row in result.all()]
+        result = await session.execute(select(APIKey).where(or_(*conditions)).order_by(APIKey.id))
+        return list(result.scalars().all())
+
+
+async def notify_api_keys_changed(session: AsyncSession, api_key_id: int | None = None) -> None:
+    """Queue a NOTIFY on API_KEYS_CHANNEL; delivered to listeners when the session commits."""
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": API_KEYS_CHANNEL, "payload": "" if api_key_id is None else str(api_key_id)},
+    )
+
+
+@asynccontextmanager
+async def listen(
+    channel: str,
+    callback: Callable[[str], None],
+    on_close: Callable[[], None] | None = None,
+) -> AsyncIterator[None]:
+    """
+    LISTEN on a Postgres channel for the duration of the context, using one pooled connection.
+
+    Args:
+        channel: Channel name
+        callback: Called with the notification payload for each NOTIFY
+        on_close: Called if the connection is terminated while listening
+    """
+    if _engine is None:
+        raise RuntimeError("Database not initialized. Call init_database first.")
+    async with _engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+
+        def _on_notify(connection, pid, chan, payload):
+            callback(payload)
+
+        await driver.add_listener(channel, _on_notify)
+        if on_close is not None:
+            driver.add_termination_listener(lambda connection: on_close())
+        try:
+            yield
+        finally:
+            if not driver.is_closed():
+                try:
+                    await driver.remove_listener(channel, _on_notify)
+                except Exception:
+                    pass
 
 
 
@@ -165,6 +255,21 @@ async def save_payment_record(
         return record
 
 
+async def save_payment_records(records: list[dict]) -> None:
+    """
+    Save many payment records in one multi-row INSERT (no refresh round trip).
+
+    Args:
+        records: Dicts with payment_id, seller_id, network, tx_hash, status and optionally created_at
+    """
+    if not records:
+        return
+    from sqlalchemy import insert
+    async with get_session() as session:
+        await session.execute(insert(PaymentRecord.__table__).values(records))
+        await session.commit()
+
+
 async def get_payment_by_id(payment_id: str, seller_id: str | None = None) -> list[PaymentRecord]:
     """
     Get payment records by payment_id (payment_id is not unique).
@@ -196,14 +301,290 @@ async def get_payment_by_tx_hash(tx_hash: str, seller_id: str | None = None) ->
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
-async def get_api_key_by_key(api_key: str) -> APIKey | None:
-    """Get APIKey row by key.
-    Returns the APIKey instance, or None if not found.
+def _payment_filters(
+    seller_id: str,
+    network: str | None,
+    status: str | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> list:
+    """WHERE clauses shared by list_payment_records and stream_payment_records."""
+    table = PaymentRecord.__table__
+    conditions = [table.c.seller_id == seller_id]
+    if network is not None:
+        conditions.append(table.c.network == network)
+    if status is not None:
+        conditions.append(table.c.status == status)
+    if since is not None:
+        conditions.append(table.c.created_at >= since)
+    if until is not None:
+        conditions.append(table.c.created_at < until)
+    return conditions
+
+
+async def list_payment_records(
+    seller_id: str,
+    *,
+    network: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = 100,
+) -> list[PaymentRecord]:
+    """
+    Get one page of a seller's payment records, ordered by id ascending (keyset pagination).
+
+    Args:
+        seller_id: Seller whose records are listed
+        network, status: Exact-match filters
+        since, until: created_at window, since inclusive, until exclusive
+        after_id: Cursor - return records with id > after_id
+        limit: Page size
+
+    Returns:
+        Up to limit PaymentRecord rows; the last row's id is the next cursor
+    """
+    from sqlalchemy import select
+    conditions = _payment_filters(seller_id, network, status, since, until)
+    if after_id is not None:
+        conditions.append(PaymentRecord.id > after_id)
+    async with get_session() as session:
+        stmt = select(PaymentRecord).where(*conditions).order_by(PaymentRecord.id).limit(limit)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def stream_payment_records(
+    seller_id: str,
+    *,
+    network: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[list[dict]]:
+    """
+    Stream a seller's payment records through a server-side cursor, ordered by id.
+
+    Yields batches of plain row dicts (no ORM objects), so memory stays constant in the number of rows.
     """
     from sqlalchemy import select
+    table = PaymentRecord.__table__
+    stmt = (
+        select(table)
+        .where(*_payment_filters(seller_id, network, status, since, until))
+        .order_by(table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
     async with get_session() as session:
+        result = await session.stream(stmt)
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+
+SETTLED_STATUSES = ("success", "confirmed")
+
+
+async def is_payment_settled(network: str, payment_id: str) -> bool:
+    """Whether a settled (status `success` or `confirmed`) record exists for payment_id on network."""
+    from sqlalchemy import select
+    async with get_session() as session:
+        stmt = (
+            select(PaymentRecord.id)
+            .where(
+                PaymentRecord.payment_id == payment_id,
+                PaymentRecord.network == network,
+                PaymentRecord.status.in_(SETTLED_STATUSES),
+            )
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+
+async def stream_settled_payment_ids(batch_size: int = 10000) -> AsyncIterator[list[tuple[str | None, str]]]:
+    """
+    Stream (network, payment_id) of all settled records through a server-side cursor.
+    Used to rebuild the replay filter at startup.
+    """
+    from sqlalchemy import select
+    table = PaymentRecord.__table__
+    stmt = (
+        select(table.c.network, table.c.payment_id)
+        .where(table.c.payment_id.is_not(None), table.c.status.in_(SETTLED_STATUSES))
+        .execution_options(yield_per=batch_size)
+    )
+    async with get_session() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield [(row.network, row.payment_id) for row in partition]
+
+
+async def get_unconfirmed_tx_hashes(network: str, since: datetime) -> list[str]:
+    """
+    Get tx hashes of settled (status `success`) records on a network created since a time, oldest first.
+    Used to resume confirmation tracking after a restart.
+    """
+    from sqlalchemy import select, func
+    async with get_session() as session:
+        stmt = (
+            select(PaymentRecord.tx_hash)
+            .where(
+                PaymentRecord.network == network,
+                PaymentRecord.status == "success",
+                PaymentRecord.tx_hash != "",
+                PaymentRecord.created_at >= since,
+            )
+            .group_by(PaymentRecord.tx_hash)
+            .order_by(func.min(PaymentRecord.id))
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def update_payment_status_by_tx_hash(
+    network: str,
+    tx_hashes: list[str],
+    status: str,
+    *,
+    from_status: str,
+) -> list[str]:
+    """
+    Move records of the given transactions from from_status to status in one UPDATE.
+
+    Returns:
+        Distinct tx hashes that had at least one record updated
+    """
+    if not tx_hashes:
+        return []
+    from sqlalchemy import update
+    async with get_session() as session:
+        result = await session.execute(
+            update(PaymentRecord)
+            .where(
+                PaymentRecord.network == network,
+                PaymentRecord.tx_hash.in_(tx_hashes),
+                PaymentRecord.status == from_status,
+            )
+            .values(status=status)
+            .returning(PaymentRecord.tx_hash)
+        )
+        updated = list(dict.fromkeys(result.scalars().all()))
+        await session.commit()
+        return updated
+
+
+async def claim_settle_idempotency(
+    idempotency_key: str,
+    network: str,
+    payment_id: str,
+    payload_hash: str,
+    *,
+    stale_after: int,
+) -> tuple[bool, str | None]:
+    """
+    Claim a settle idempotency key (unique primary key, so safe across replicas).
+
+    Returns:
+        (True, None) if this caller now owns the settlement (new claim, or a pending
+        claim older than stale_after seconds was taken over).
+        (False, response_json) if the settlement already completed.
+        (False, None) if another caller is settling it right now.
+    """
+    from sqlalchemy import select, update
+    from sqlalchemy.dialects.postgresql import insert
+
+    now = datetime.now(timezone.utc)
+    async with get_session() as session:
+        result = await session.execute(
+            insert(SettleIdempotencyRecord)
+            .values(
+                idempotency_key=idempotency_key,
+                network=network,
+                payment_id=payment_id,
+                payload_hash=payload_hash,
+                status="pending",
+                created_at=now,
+                updated_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=[SettleIdempotencyRecord.idempotency_key])
+            .returning(SettleIdempotencyRecord.idempotency_key)
+        )
+        if result.scalar_one_or_none() is not None:
+            await session.commit()
+            return True, None
+
+        existing = (
+            await session.execute(
+                select(SettleIdempotencyRecord).where(
+                    SettleIdempotencyRecord.idempotency_key == idempotency_key
+                )
+            )
+        ).scalar_one_or_none()
+        if existing is not None and existing.status == "done":
+            return False, existing.response
+
+        # Take over a pending claim whose owner likely died mid-settle
+        cutoff = datetime.fromtimestamp(now.timestamp() - stale_after, tz=timezone.utc)
         result = await session.execute(
-            select(APIKey)
-            .where(APIKey.key == api_key)
+            update(SettleIdempotencyRecord)
+            .where(
+                SettleIdempotencyRecord.idempotency_key == idempotency_key,
+                SettleIdempotencyRecord.status == "pending",
+                SettleIdempotencyRecord.updated_at < cutoff,
+            )
+            .values(updated_at=now)
+            .returning(SettleIdempotencyRecord.idempotency_key)
+        )
+        taken_over = result.scalar_one_or_none() is not None
+        await session.commit()
+        return taken_over, None
+
+
+async def complete_settle_idempotency(idempotency_key: str, response_json: str) -> None:
+    """Mark a claimed settle idempotency key as done and store the SettleResponse JSON."""
+    from sqlalchemy import update
+    async with get_session() as session:
+        await session.execute(
+            update(SettleIdempotencyRecord)
+            .where(SettleIdempotencyRecord.idempotency_key == idempotency_key)
+            .values(status="done", response=response_json, updated_at=datetime.now(timezone.utc))
         )
-        return result.scalar_one_or_none()
\ No newline at end of file
+        await session.commit()
+
+
+async def prune_settle_idempotency(completed_before: datetime, batch_size: int = 1000) -> int:
+    """Delete done settle idempotency rows completed before the cutoff, batch_size rows per statement. Returns the count."""
+    from sqlalchemy import delete, select
+    deleted = 0
+    while True:
+        async with get_session() as session:
+            expired = (
+                select(SettleIdempotencyRecord.idempotency_key)
+                .where(
+                    SettleIdempotencyRecord.status == "done",
+                    SettleIdempotencyRecord.updated_at < completed_before,
+                )
+                .limit(batch_size)
+            )
+            result = await session.execute(
+                delete(SettleIdempotencyRecord).where(SettleIdempotencyRecord.idempotency_key.in_(expired))
+            )
+            await session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+async def release_settle_idempotency(idempotency_key: str) -> None:
+    """Delete a pending settle idempotency claim so the payment can be retried."""
+    from sqlalchemy import delete
+    async with get_session() as session:
+        await session.execute(
+            delete(SettleIdempotencyRecord).where(
+                SettleIdempotencyRecord.idempotency_key == idempotency_key,
+                SettleIdempotencyRecord.status == "pending",
+            )
+        )
+        await session.commit()
@@ -0,0 +1,149 @@
+"""
+EVM gas price oracle - one background fee poll per network instead of fee RPCs on every settlement.
+
+Each refresh reads eth_feeHistory (next base fee and priority-fee percentiles over recent blocks)
+and eth_gasPrice. Signers read the latest estimate synchronously when building a transaction;
+an estimate older than max_age is not used and web3 discovers fees itself as before.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from monitoring import GAS_ORACLE_LOOKUPS, GAS_ORACLE_WEI
+
+logger = logging.getLogger(__name__)
+
+REWARD_PERCENTILES = (10, 50, 90)
+
+
+@dataclass(frozen=True)
+class FeeEstimate:
+    """Fee data of one refresh (wei)."""
+
+    gas_price: int
+    base_fee: Optional[int] = None  # next block's base fee; None/0 on chains without EIP-1559 fees
+    priority_fees: dict[int, int] = field(default_factory=dict)  # reward percentile -> median tip
+    fetched_at: float = 0.0
+
+    def tx_params(self, percentile: int) -> dict[str, int]:
+        """Fee fields for build_transaction: EIP-1559 when the chain has a base fee, else legacy gasPrice."""
+        tip = self.priority_fees.get(percentile)
+        if not self.base_fee or tip is None:
+            return {"gasPrice": self.gas_price}
+        # Headroom for two full blocks of base fee increases (web3's default strategy)
+        return {"maxPriorityFeePerGas": tip, "maxFeePerGas": 2 * self.base_fee + tip}
+
+
+class GasOracle:
+    """Fee estimate of one EVM network, refreshed in the background."""
+
+    def __init__(
+        self,
+        network: str,
+        w3: Any,
+        *,
+        percentile: int = 50,
+        max_age: float = 30.0,
+        history_blocks: int = 10,
+    ) -> None:
+        if percentile not in REWARD_PERCENTILES:
+            raise ValueError(f"Gas priority percentile must be one of {REWARD_PERCENTILES}")
+        self.network = network
+        self._w3 = w3
+        self._percentile = percentile
+        self._max_age = max_age
+        self._history_blocks = history_blocks
+        self._estimate: Optional[FeeEstimate] = None
+
+    @property
+    def estimate(self) -> Optional[FeeEstimate]:
+        return self._estimate
+
+    def tx_params(self) -> dict[str, int]:
+        """Fee fields from the latest estimate; empty (web3 fetches fees) when missing or stale."""
+        estimate = self._estimate
+        if estimate is None or time.monotonic() - estimate.fetched_at > self._max_age:
+            GAS_ORACLE_LOOKUPS.labels(network=self.network, result="stale").inc()
+            return {}
+        GAS_ORACLE_LOOKUPS.labels(network=self.network, result="fresh").inc()
+        return estimate.tx_params(self._percentile)
+
+    async def refresh(self) -> FeeEstimate:
+        history, gas_price = await asyncio.gather(
+            self._w3.eth.fee_history(self._history_blocks, "latest", list(REWARD_PERCENTILES)),
+            self._w3.eth.gas_price,
+            return_exceptions=True,
+        )
+        if isinstance(gas_price, Exception):
+            raise gas_price
+
+        base_fee = None
+        priority_fees: dict[int, int] = {}
+        if isinstance(history, Exception):
+            logger.debug(f"eth_feeHistory unavailable on {self.network}: {history}")
+        else:
+            base_fees = history.get("baseFeePerGas") or []
+            base_fee = int(base_fees[-1]) if base_fees else None
+            rewards = [r for r in history.get("reward") or [] if r]
+            for index, percentile in enumerate(REWARD_PERCENTILES):
+                tips = [int(r[index]) for r in rewards if len(r) > index]
+                if tips:
+                    priority_fees[percentile] = int(statistics.median(tips))
+
+        estimate = FeeEstimate(
+            gas_price=int(gas_price),
+            base_fee=base_fee,
+            priority_fees=priority_fees,
+            fetched_at=time.monotonic(),
+        )
+        self._estimate = estimate
+        GAS_ORACLE_WEI.labels(network=self.network, kind="gas_price").set(estimate.gas_price)
+        if base_fee is not None:
+            GAS_ORACLE_WEI.labels(network=self.network, kind="base_fee").set(base_fee)
+        if self._percentile in priority_fees:
+            GAS_ORACLE_WEI.labels(network=self.network, kind="priority_fee").set(priority_fees[self._percentile])
+        return estimate
+
+
+class GasOracles:
+    """Registry of per-network oracles, each refreshed by its own background task."""
+
+    def __init__(self) -> None:
+        self._oracles: dict[str, GasOracle] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add(self, oracle: GasOracle) -> None:
+        self._oracles[oracle.network] = oracle
+
+    def get(self, network: str) -> Optional[GasOracle]:
+        return self._oracles.get(network)
+
+    def start(self, *, refresh_interval: float) -> None:
+        for oracle in self._oracles.values():
+            self._tasks.append(
+                asyncio.create_task(self._run(oracle, refresh_interval), name=f"gas-oracle-{oracle.network}")
+            )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, oracle: GasOracle, interval: float) -> None:
+        while True:
+            try:
+                await oracle.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Gas price refresh failed on {oracle.network}: {e}")
+            await asyncio.sleep(interval)
+
+
+# Global gas oracles (one per EVM network)
+gas_oracles = GasOracles()
@@ -0,0 +1,167 @@
+"""
+Shared pooled HTTP client for all chain RPC traffic (TRON HTTP API and EVM JSON-RPC).
+
+One httpx.AsyncClient is opened in lifespan and handed to every signer's chain client, so
+connections (and TLS sessions) are reused across networks, signers and requests. HTTP/2 is used
+when the optional `h2` package is installed (`pip install httpx[http2]`).
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from monitoring import (
+    HTTP_CLIENT_IN_FLIGHT,
+    HTTP_CLIENT_POOL_CONNECTIONS,
+    HTTP_CLIENT_REQUEST_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that releases the per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    AsyncHTTPTransport with a per-host concurrency limit and request/pool metrics.
+
+    httpx limits connections per pool only; the per-host semaphore keeps one busy or slow
+    RPC host from taking every connection in the shared pool.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, max_per_host: int) -> None:
+        self._transport = transport
+        self._max_per_host = max(1, max_per_host)
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self._max_per_host)
+
+        await limit.acquire()
+        HTTP_CLIENT_IN_FLIGHT.labels(host=host).inc()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                limit.release()
+                HTTP_CLIENT_IN_FLIGHT.labels(host=host).dec()
+                self._observe_pool()
+
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            HTTP_CLIENT_REQUEST_SECONDS.labels(host=host, outcome="error").observe(time.perf_counter() - started)
+            release()
+            raise
+        HTTP_CLIENT_REQUEST_SECONDS.labels(host=host, outcome=str(response.status_code)).observe(
+            time.perf_counter() - started
+        )
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    def _observe_pool(self) -> None:
+        # httpcore pool internals; metrics only, so tolerate their absence
+        pool = getattr(self._transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return
+        idle = sum(1 for c in connections if c.is_idle())
+        HTTP_CLIENT_POOL_CONNECTIONS.labels(state="idle").set(idle)
+        HTTP_CLIENT_POOL_CONNECTIONS.labels(state="active").set(len(connections) - idle)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class ChainHttpClient:
+    """Owner of the shared chain RPC httpx.AsyncClient (opened in lifespan, closed on shutdown)."""
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Chain HTTP client not started")
+        return self._client
+
+    def start(
+        self,
+        *,
+        http2: bool,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        max_connections_per_host: int,
+        timeout: float,
+        connect_timeout: float,
+    ) -> httpx.AsyncClient:
+        """Open the shared client; HTTP/2 falls back to HTTP/1.1 when h2 is not installed."""
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested for chain RPC but h2 is not installed; using HTTP/1.1")
+            http2 = False
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self._client = httpx.AsyncClient(
+            transport=PooledTransport(transport, max_connections_per_host),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+        logger.info(
+            f"Chain HTTP client started: http2={http2}, max_connections={max_connections}, "
+            f"max_keepalive={max_keepalive_connections}, per_host={max_connections_per_host}"
+        )
+        return self._client
+
+    async def stop(self) -> None:
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+        logger.info("Chain HTTP client closed")
+
+
+# Global shared chain RPC client
+chain_http = ChainHttpClient()
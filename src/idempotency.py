@@ -0,0 +1,217 @@
+"""
+Settle idempotency - coalesces duplicate settle requests keyed by (network, paymentId, payload hash).
+
+Layers, checked in order:
+1. Completed cache: successful results replayed for ttl seconds (bounded LRU).
+2. In-flight futures: concurrent duplicates in this process await the first request.
+3. Database claim (settle_idempotency table): catches duplicates across workers/replicas.
+   Completed rows are pruned after retention seconds (see run_pruner).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from bankofai.x402.types import SettleResponse
+
+from database import (
+    claim_settle_idempotency,
+    complete_settle_idempotency,
+    prune_settle_idempotency,
+    release_settle_idempotency,
+)
+from monitoring import SETTLE_IDEMPOTENCY_PRUNED
+
+logger = logging.getLogger(__name__)
+
+
+class SettleInProgressError(ValueError):
+    """Raised when the same payment is being settled by another worker or replica."""
+
+
+@dataclass(frozen=True)
+class SettleIdempotencyKey:
+    """Identity of one settle attempt."""
+
+    network: str
+    payment_id: str
+    payload_hash: str
+
+    def __str__(self) -> str:
+        return f"{self.network}:{self.payment_id}:{self.payload_hash}"
+
+    @classmethod
+    def build(cls, network: str | None, payment_id: str | None, payload: Any) -> Optional["SettleIdempotencyKey"]:
+        """Build key from request parts; returns None (no idempotency) when payment_id is missing."""
+        if not payment_id:
+            return None
+        return cls(network=network or "", payment_id=payment_id, payload_hash=payload_hash(payload))
+
+
+def payload_hash(payload: Any) -> str:
+    """SHA-256 of the canonical JSON form of a PaymentPayload (or plain dict)."""
+    data = payload.model_dump(mode="json", by_alias=True) if hasattr(payload, "model_dump") else payload
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SettleIdempotency:
+    """In-process coalescing + TTL replay cache, backed by a DB claim for cross-replica duplicates."""
+
+    def __init__(
+        self, ttl: int = 600, max_entries: int = 10000, pending_timeout: int = 300, retention: int = 0
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._pending_timeout = pending_timeout
+        self._retention = retention
+        self._completed: "OrderedDict[SettleIdempotencyKey, tuple[float, SettleResponse]]" = OrderedDict()
+        self._inflight: dict[SettleIdempotencyKey, asyncio.Future] = {}
+
+    def configure(self, *, ttl: int, max_entries: int, pending_timeout: int, retention: int = 0) -> None:
+        """Apply settings from config (called once in lifespan). retention 0 keeps completed DB rows forever."""
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._pending_timeout = pending_timeout
+        self._retention = retention
+
+    async def prune(self) -> int:
+        """Delete completed DB claims older than retention; returns the number of rows deleted."""
+        if self._retention <= 0:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self._retention)
+        deleted = await prune_settle_idempotency(cutoff)
+        SETTLE_IDEMPOTENCY_PRUNED.inc(deleted)
+        if deleted:
+            logger.info(f"Pruned {deleted} settle idempotency rows completed before {cutoff.isoformat()}")
+        return deleted
+
+    async def run_pruner(self, interval: float) -> None:
+        """Background task: prune() every interval seconds (no-op while retention is 0)."""
+        while True:
+            try:
+                await self.prune()
+            except Exception:
+                logger.exception("Failed to prune settle idempotency rows")
+            await asyncio.sleep(interval)
+
+    def clear(self) -> None:
+        """Drop cached results (in-flight settlements are unaffected)."""
+        self._completed.clear()
+
+    async def execute(
+        self,
+        key: Optional[SettleIdempotencyKey],
+        settle_fn: Callable[[], Awaitable[SettleResponse]],
+    ) -> SettleResponse:
+        """
+        Run settle_fn at most once per key.
+
+        Raises:
+            SettleInProgressError: If another replica holds the claim for this key.
+        """
+        if key is None:
+            return await settle_fn()
+
+        cached = self._get_completed(key)
+        if cached is not None:
+            logger.info(f"Settle replayed from cache: {key}")
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.info(f"Settle coalesced with in-flight request: {key}")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved when nobody else is waiting on the future
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await self._execute_once(key, settle_fn)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _execute_once(
+        self,
+        key: SettleIdempotencyKey,
+        settle_fn: Callable[[], Awaitable[SettleResponse]],
+    ) -> SettleResponse:
+        try:
+            claimed, stored = await claim_settle_idempotency(
+                str(key), key.network, key.payment_id, key.payload_hash,
+                stale_after=self._pending_timeout,
+            )
+            db_claim = True
+        except Exception as e:
+            # DB unavailable: fall back to in-process coalescing only
+            logger.warning(f"Settle idempotency claim failed, continuing without DB check: {key}: {e}")
+            claimed, stored, db_claim = True, None, False
+
+        if not claimed:
+            if stored is None:
+                raise SettleInProgressError(f"Settlement already in progress for payment {key.payment_id}")
+            result = SettleResponse.model_validate_json(stored)
+            logger.info(f"Settle replayed from database: {key}")
+            self._put_completed(key, result)
+            return result
+
+        try:
+            result = await settle_fn()
+        except BaseException:
+            if db_claim:
+                await self._release(key)
+            raise
+
+        if result.success:
+            self._put_completed(key, result)
+            if db_claim:
+                try:
+                    await complete_settle_idempotency(str(key), result.model_dump_json(by_alias=True))
+                except Exception:
+                    logger.exception(f"Failed to store settle idempotency result: {key}")
+        elif db_claim:
+            # Failed settlements may be retried by the client
+            await self._release(key)
+        return result
+
+    async def _release(self, key: SettleIdempotencyKey) -> None:
+        try:
+            await release_settle_idempotency(str(key))
+        except Exception:
+            logger.exception(f"Failed to release settle idempotency claim: {key}")
+
+    def _get_completed(self, key: SettleIdempotencyKey) -> Optional[SettleResponse]:
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self._ttl:
+            del self._completed[key]
+            return None
+        return result
+
+    def _put_completed(self, key: SettleIdempotencyKey, result: SettleResponse) -> None:
+        self._completed[key] = (time.monotonic(), result)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self._max_entries:
+            self._completed.popitem(last=False)
+
+
+# Global settle idempotency layer
+settle_idempotency = SettleIdempotency()
@@ -5,25 +5,35 @@ Starts a FastAPI server for facilitator operations with full payment flow suppor
 
 import logging
 import asyncio
+import csv
+import hashlib
+import io
+import json
 import os
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from helper import (
     to_internal_network,
     is_tron_network,
     is_bsc_network,
     is_eth_network,
 )
-from fastapi import FastAPI, HTTPException, Request
+from typing import Any, AsyncIterator, Literal
+from fastapi import Body, FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
 import uvicorn
 
 from bankofai.x402.mechanisms.tron.exact_permit.facilitator import ExactPermitTronFacilitatorMechanism
 from bankofai.x402.mechanisms.evm.exact_permit.facilitator import ExactPermitEvmFacilitatorMechanism
 from bankofai.x402.mechanisms.tron.exact.facilitator import ExactTronFacilitatorMechanism
 from bankofai.x402.mechanisms.evm.exact.facilitator import ExactEvmFacilitatorMechanism
-from bankofai.x402.signers.facilitator import TronFacilitatorSigner, EvmFacilitatorSigner
 from bankofai.x402.facilitator.x402_facilitator import X402Facilitator
+from bankofai.x402.address import TronAddressConverter, EvmAddressConverter
+from bankofai.x402.tokens import TokenRegistry
 from bankofai.x402.types import (
     VerifyResponse,
     SettleResponse,
@@ -33,13 +43,58 @@ from database import (
     init_database,
     get_payment_by_id,
     get_payment_by_tx_hash,
-    save_payment_record,
-    get_api_key_by_key,
+    list_payment_records,
+    stream_payment_records,
+    stream_settled_payment_ids,
 )
 from logging_setup import setup_logging
-from schemas import VerifyRequest, SettleRequest, FeeQuoteRequest, PaymentRecordResponse
-from auth import setup_auth, api_key_refresher, limiter, get_dynamic_rate_limit, get_dynamic_key_func
-from monitoring import attach_prometheus_middleware
+from schemas import (
+    VerifyRequest,
+    VerifyBatchItemResponse,
+    SettleBatchItemResponse,
+    SettleRequest,
+    VerifyAndSettleResponse,
+    FeeQuoteRequest,
+    PaymentRecordResponse,
+    PaymentRecordPage,
+    SettlementTicketResponse,
+)
+from recorder import payment_recorder
+from rpc import RpcRouter, create_tron_client, default_rpc_endpoints
+from ref_blocks import RefBlockCache, ref_block_caches
+from gas import GasOracle, gas_oracles
+from http_client import chain_http
+from signers import RoutedTronFacilitatorSigner, RoutedEvmFacilitatorSigner
+from signer_pool import SignerPool, PooledFacilitatorMechanism, signer_pools
+from quotes import quote_cache
+from replay import PaymentReplayError, replay_filter
+from prevalidation import prevalidator
+from verification import VERIFICATION_TICKET_HEADER, verification_tickets, verified_payload
+from crypto import crypto_executor
+from confirmations import (
+    confirmation_trackers,
+    ConfirmationTracker,
+    TronReceiptSource,
+    EvmReceiptSource,
+)
+from idempotency import settle_idempotency, SettleIdempotencyKey, SettleInProgressError
+from settlement import (
+    settlement_queue,
+    SettlementTicket,
+    SettlementQueueFull,
+    SettlementQueueUnavailable,
+)
+from auth import (
+    setup_auth,
+    api_key_refresher,
+    api_key_change_listener,
+    limiter,
+    get_dynamic_rate_limit,
+    get_verify_batch_rate_limit,
+    get_settle_batch_rate_limit,
+    get_dynamic_key_func,
+)
+from monitoring import attach_prometheus_middleware, monitor_event_loop_lag
 
 # Setup initial logging (console only)
 setup_logging()
@@ -48,6 +103,13 @@ logger = logging.getLogger(__name__)
 # Global facilitator instance
 x402_facilitator = X402Facilitator()
 
+async def _load_replay_filter() -> None:
+    """Rebuild the replay filter from settled payment records."""
+    try:
+        await replay_filter.load(stream_settled_payment_ids())
+    except Exception:
+        logger.exception("Failed to load the replay filter; replays are caught on-chain until it is rebuilt")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
@@ -78,10 +140,37 @@ async def lifespan(app: FastAPI):
         ssl_mode=config.database_ssl_mode,
     )
     logger.info("Database initialized")
+
+    # Settled paymentIds, so replays are rejected before going on-chain (loaded in the background)
+    replay_filter.configure(
+        enabled=config.replay_filter_enabled,
+        capacity=config.replay_filter_capacity,
+        error_rate=config.replay_filter_error_rate,
+    )
+
+    # Signature recovery / local signing off the event loop (before any signer is used)
+    crypto_executor.start(
+        mode=config.crypto_executor,
+        workers=config.crypto_workers,
+        backend=config.crypto_backend,
+        batch_window_ms=config.crypto_batch_window_ms,
+        batch_max_size=config.crypto_batch_max_size,
+    )
+    background_tasks = [asyncio.create_task(_load_replay_filter())]
+    if config.event_loop_lag_interval > 0:
+        background_tasks.append(asyncio.create_task(monitor_event_loop_lag(config.event_loop_lag_interval)))
+
+    # Start write-behind payment recorder (flushed on shutdown)
+    await payment_recorder.start(
+        max_queue=config.database_record_queue_size,
+        batch_size=config.database_record_batch_size,
+        flush_interval_ms=config.database_record_flush_interval_ms,
+    )
     
     # Start API key refresher task
     refresher_task = asyncio.create_task(api_key_refresher())
-    logger.info("API key refresher task started")
+    listener_task = asyncio.create_task(api_key_change_listener())
+    logger.info("API key refresher and change listener tasks started")
     
     # TronGrid API Key (shared across networks) — set in environment for the underlying library
     trongrid_api_key = await config.get_trongrid_api_key()
@@ -91,53 +180,212 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("TronGrid API Key not configured. Using default rate limits for blockchain requests.")
 
-    # Initialize facilitator per network (each has its own fee_to_address, base_fee, private_key)
+    # Shared pooled HTTP client for every signer's chain RPC traffic
+    rpc_http_client = chain_http.start(
+        http2=config.rpc_http2,
+        max_connections=config.rpc_max_connections,
+        max_keepalive_connections=config.rpc_max_keepalive_connections,
+        keepalive_expiry=config.rpc_keepalive_expiry,
+        max_connections_per_host=config.rpc_max_connections_per_host,
+        timeout=config.rpc_timeout,
+        connect_timeout=config.rpc_connect_timeout,
+    )
+
+    # Initialize facilitator per network (each has its own fee_to_address, base_fee, signer key pool)
+    prevalidation_networks = {}
     for network in config.networks:
-        private_key = await config.get_private_key(network)
+        private_keys = await config.get_private_keys(network)
         fee_to = config.get_fee_to_address(network)
         base_fee = config.get_base_fee(network)
+        rpc_router = _build_rpc_router(network, trongrid_api_key)
+        internal_network = to_internal_network[network]
         if is_tron_network(network):
-            facilitator_signer = TronFacilitatorSigner.from_private_key(private_key=private_key)
-            facilitator_mechanism = ExactPermitTronFacilitatorMechanism(
-                facilitator_signer,
-                fee_to=fee_to,
-                base_fee=base_fee,
+            pool = SignerPool(
+                internal_network,
+                TronAddressConverter().normalize,
+                failure_threshold=config.signer_failure_threshold,
+                cooldown=config.signer_cooldown,
+            )
+            ref_blocks = None
+            if rpc_router is not None:
+                ref_blocks = RefBlockCache(
+                    internal_network,
+                    create_tron_client(
+                        internal_network, rpc_router, rpc_http_client, api_key=trongrid_api_key
+                    ).get_latest_solid_block_id,
+                    max_age=config.rpc_ref_block_max_age,
+                )
+                ref_block_caches.add(ref_blocks)
+            for private_key in private_keys:
+                facilitator_signer = RoutedTronFacilitatorSigner.from_private_key(private_key=private_key)
+                if rpc_router is not None:
+                    facilitator_signer.use_rpc_router(
+                        rpc_router, rpc_http_client, api_key=trongrid_api_key, ref_blocks=ref_blocks
+                    )
+                pool.add(facilitator_signer)
+            facilitator_mechanism = PooledFacilitatorMechanism(
+                pool,
+                lambda signer: ExactPermitTronFacilitatorMechanism(signer, fee_to=fee_to, base_fee=base_fee),
             )
-            x402_facilitator.register([to_internal_network[network]], facilitator_mechanism)
-            facilitator_mechanism = ExactTronFacilitatorMechanism(
-                facilitator_signer,
+            x402_facilitator.register([internal_network], facilitator_mechanism)
+            facilitator_mechanism = PooledFacilitatorMechanism(pool, ExactTronFacilitatorMechanism)
+            x402_facilitator.register([internal_network], facilitator_mechanism)
+            receipt_source = TronReceiptSource(
+                pool.members[0].signer, internal_network, concurrency=config.confirmations_concurrency
             )
-            x402_facilitator.register([to_internal_network[network]], facilitator_mechanism)
-            logger.info(f"Facilitator registered for {network}")
         elif is_bsc_network(network) or is_eth_network(network):
-            facilitator_signer = EvmFacilitatorSigner.from_private_key(private_key=private_key)
-            facilitator_mechanism = ExactPermitEvmFacilitatorMechanism(
-                facilitator_signer,
-                fee_to=fee_to,
-                base_fee=base_fee,
+            pool = SignerPool(
+                internal_network,
+                EvmAddressConverter().normalize,
+                failure_threshold=config.signer_failure_threshold,
+                cooldown=config.signer_cooldown,
             )
-            x402_facilitator.register([to_internal_network[network]], facilitator_mechanism)
-
-            facilitator_mechanism = ExactEvmFacilitatorMechanism(
-                facilitator_signer,
+            gas_oracle = None
+            for private_key in private_keys:
+                facilitator_signer = RoutedEvmFacilitatorSigner.from_private_key(private_key=private_key)
+                facilitator_signer.configure_nonces(resync_interval=config.signer_nonce_resync_interval)
+                if rpc_router is not None:
+                    facilitator_signer.use_rpc_router(rpc_router, rpc_http_client)
+                if gas_oracle is None:
+                    gas_oracle = GasOracle(
+                        internal_network,
+                        facilitator_signer._ensure_async_web3_client(internal_network),
+                        percentile=config.gas_priority_percentile,
+                        max_age=config.gas_max_age,
+                        history_blocks=config.gas_history_blocks,
+                    )
+                    gas_oracles.add(gas_oracle)
+                facilitator_signer.use_gas_oracle(gas_oracle)
+                pool.add(facilitator_signer)
+            facilitator_mechanism = PooledFacilitatorMechanism(
+                pool,
+                lambda signer: ExactPermitEvmFacilitatorMechanism(signer, fee_to=fee_to, base_fee=base_fee),
+            )
+            x402_facilitator.register([internal_network], facilitator_mechanism)
+            facilitator_mechanism = PooledFacilitatorMechanism(pool, ExactEvmFacilitatorMechanism)
+            x402_facilitator.register([internal_network], facilitator_mechanism)
+            receipt_source = EvmReceiptSource(
+                pool.members[0].signer, internal_network, concurrency=config.confirmations_concurrency
             )
-            x402_facilitator.register([to_internal_network[network]], facilitator_mechanism)
-
-            logger.info(f"Facilitator registered for {network}")
         else:
             logger.warning(f"Unsupported network: {network}")
             continue
+
+        signer_pools.add(pool)
+        logger.info(f"Facilitator registered for {network} with {len(pool.members)} signer(s)")
+        prevalidation_networks[internal_network] = (
+            pool.normalize_address,
+            [token.address for token in TokenRegistry.get_network_tokens(internal_network).values()],
+        )
+
+        if config.confirmations_enabled:
+            confirmation_trackers.add(
+                ConfirmationTracker(
+                    internal_network,
+                    receipt_source,
+                    depth=config.get_confirmation_depth(network),
+                    max_pending_age=config.confirmations_max_pending_age,
+                )
+            )
+
+    # Networks are registered: serialize /supported once, reject requests for others up front
+    _build_supported_payload()
+    prevalidator.configure(prevalidation_networks)
+
+    quote_cache.configure(
+        ttl=config.fee_quote_cache_ttl,
+        max_entries=config.fee_quote_cache_max_entries,
+        generation=lambda: config.generation,
+    )
+    verification_tickets.configure(
+        ttl=config.verification_ticket_ttl, secret=config.verification_ticket_secret
+    )
+    settle_idempotency.configure(
+        ttl=config.idempotency_ttl,
+        max_entries=config.idempotency_max_entries,
+        pending_timeout=config.idempotency_pending_timeout,
+        retention=config.idempotency_retention,
+    )
+    if config.idempotency_retention > 0:
+        background_tasks.append(
+            asyncio.create_task(settle_idempotency.run_pruner(config.idempotency_prune_interval))
+        )
+
+    # Keep a recent TRON reference block in memory for transaction building
+    ref_block_caches.start(refresh_interval=config.rpc_ref_block_refresh_interval)
+
+    # Poll EVM fee data once per interval instead of per settlement
+    gas_oracles.start(refresh_interval=config.gas_refresh_interval)
+
+    # Export signer balances / TRON resources as metrics
+    signer_pools.start(resource_interval=config.signer_resource_interval)
+
+    # Follow settled transactions until confirmed/reverted (resumes pending ones from the DB)
+    await confirmation_trackers.start(poll_interval=config.confirmations_poll_interval)
+
+    # Start async settlement workers (opt-in per request via Prefer: respond-async)
+    await settlement_queue.start(
+        _settle_and_record,
+        workers=config.settlement_async_workers,
+        max_pending=config.settlement_async_queue_size,
+        ticket_ttl=config.settlement_ticket_ttl,
+    )
     
     yield
     
     # Shutdown
-    refresher_task.cancel()
-    try:
-        await refresher_task
-    except asyncio.CancelledError:
-        pass
+    await settlement_queue.stop(timeout=config.settlement_shutdown_timeout)
+    await confirmation_trackers.stop()
+    await signer_pools.stop()
+    await ref_block_caches.stop()
+    await gas_oracles.stop()
+    await payment_recorder.stop()
+    await chain_http.stop()
+    crypto_executor.stop()
+    for task in (refresher_task, listener_task, *background_tasks):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
     logger.info("Shutting down...")
 
+# /supported body and strong ETag, built once networks are registered
+_supported_payload: tuple[bytes, str] | None = None
+
+
+def _build_supported_payload() -> tuple[bytes, str]:
+    """Serialize the supported capabilities once; they only change when networks are registered."""
+    global _supported_payload
+    body = json.dumps(
+        jsonable_encoder(x402_facilitator.supported(pricing="flat")), separators=(",", ":")
+    ).encode("utf-8")
+    _supported_payload = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    return _supported_payload
+
+
+def _parse_if_none_match(value: str | None) -> set[str]:
+    """Entity tags of an If-None-Match header; weak tags compare by their opaque value (RFC 9110)."""
+    if not value:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in value.split(",")}
+
+
+def _build_rpc_router(network: str, trongrid_api_key: str | None) -> RpcRouter | None:
+    """Latency-aware router over the network's rpc_endpoints (default: the library's endpoint)."""
+    urls = config.get_rpc_endpoints(network) or default_rpc_endpoints(to_internal_network[network], trongrid_api_key)
+    if not urls:
+        logger.warning(f"No RPC endpoint known for {network}; using the library client")
+        return None
+    logger.info(f"RPC routing for {network} across {len(urls)} endpoint(s)")
+    return RpcRouter(
+        to_internal_network[network],
+        urls,
+        ewma_alpha=config.rpc_ewma_alpha,
+        failure_threshold=config.rpc_failure_threshold,
+        cooldown=config.rpc_cooldown,
+    )
+
 # Init app
 app = FastAPI(
     title="X402 Facilitator",
@@ -168,28 +416,78 @@ async def health():
 
 @app.get("/supported")
 async def supported(request: Request):
-    """Get supported capabilities"""
-    return x402_facilitator.supported(pricing="flat")
+    """Get supported capabilities (pre-serialized; If-None-Match -> 304)"""
+    body, etag = _supported_payload or _build_supported_payload()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={config.supported_cache_max_age}"}
+    if_none_match = _parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.post("/fee/quote")
 async def fee_quote(request: Request, request_data: FeeQuoteRequest):
-    """Get fee quote for payment requirements"""
-    return await x402_facilitator.fee_quote(
-        request_data.accepts,
-        request_data.paymentPermitContext
-    )
+    """Get fee quote for payment requirements (entries evaluated concurrently, quotes cached)"""
+    accepts = request_data.accepts
+    context = request_data.paymentPermitContext
+    if len(accepts) <= 1:
+        return await x402_facilitator.fee_quote(accepts, context)
+    results = await asyncio.gather(*(x402_facilitator.fee_quote([accept], context) for accept in accepts))
+    return [quote for quotes in results for quote in quotes]
 
 @app.post("/verify", response_model=VerifyResponse)
-async def verify(request: Request, verify_request: VerifyRequest):
-    """Verify payment payload"""
+async def verify(request: Request, response: Response, verify_request: VerifyRequest):
+    """Verify payment payload. A valid result carries an X-Verification-Ticket header for /settle."""
     try:
-        return await x402_facilitator.verify(verify_request.paymentPayload, verify_request.paymentRequirements)
+        prevalidator.validate(verify_request.paymentPayload, verify_request.paymentRequirements)
+        # verify() normalizes EVM addresses in place; bind the ticket to the body as /settle will receive it
+        payload = verify_request.paymentPayload.model_copy(deep=True)
+        requirements = verify_request.paymentRequirements.model_copy(deep=True)
+        result = await x402_facilitator.verify(verify_request.paymentPayload, verify_request.paymentRequirements)
+        if result.is_valid:
+            ticket = verification_tickets.issue(payload, requirements)
+            if ticket:
+                response.headers[VERIFICATION_TICKET_HEADER] = ticket
+        return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("Verify failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/verify/batch", response_model=list[VerifyBatchItemResponse], response_model_exclude_none=True)
+@limiter.limit(get_verify_batch_rate_limit, key_func=get_dynamic_key_func)
+async def verify_batch(request: Request, items: list[dict[str, Any]] = Body(...)):
+    """Verify many payloads concurrently; results are in request order, one error per failed item"""
+    if len(items) > config.verify_batch_max_items:
+        raise HTTPException(
+            status_code=400, detail=f"At most {config.verify_batch_max_items} items per batch"
+        )
+    semaphore = asyncio.Semaphore(config.verify_batch_concurrency)
+
+    async def verify_item(item: dict[str, Any]) -> VerifyBatchItemResponse:
+        try:
+            verify_request = VerifyRequest.model_validate(item)
+        except ValidationError as e:
+            details = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            return VerifyBatchItemResponse(error=f"Invalid request: {details}")
+        try:
+            prevalidator.validate(verify_request.paymentPayload, verify_request.paymentRequirements)
+        except ValueError as e:
+            return VerifyBatchItemResponse(error=str(e))
+        async with semaphore:
+            try:
+                result = await x402_facilitator.verify(
+                    verify_request.paymentPayload, verify_request.paymentRequirements
+                )
+            except ValueError as e:
+                return VerifyBatchItemResponse(error=str(e))
+            except Exception:
+                logger.exception("Verify failed")
+                return VerifyBatchItemResponse(error="Internal server error")
+        return VerifyBatchItemResponse(result=result)
+
+    return await asyncio.gather(*(verify_item(item) for item in items))
+
 def _get_payment_id_from_request(request_data: SettleRequest) -> str | None:
     """Safely extract payment_id from request; returns None if structure is invalid."""
     try:
@@ -204,54 +502,287 @@ def _get_network_from_request(request_data: SettleRequest) -> str | None:
     except AttributeError:
         return None
 
-async def _get_seller_id_from_api_key(api_key: str | None) -> str | None:
-    """Get seller id from api key.
-    if api_key is None, return None.
-    if api_key is not None, get the seller id from the database.
-    if the seller id is not found, return None.
-    return the seller id.
+def _get_seller_id(request: Request) -> str | None:
+    """Seller id resolved from the X-API-KEY by the auth middleware; None for anonymous requests."""
+    return getattr(request.state, "seller_id", None)
+
+async def _settle_and_record(request_data: SettleRequest, seller_id: str | None) -> SettleResponse:
+    """Settle payment on-chain, then write one payment record. Save failure does not affect the result.
+    Duplicates of the same (network, paymentId, payload) are coalesced/replayed and do not settle or record again.
     """
+    payment_id = _get_payment_id_from_request(request_data)
+    network = _get_network_from_request(request_data)
+    key = SettleIdempotencyKey.build(network, payment_id, request_data.paymentPayload)
+    return await settle_idempotency.execute(
+        key, lambda: _settle_once_and_record(request_data, seller_id, payment_id, network)
+    )
 
-    if api_key is None:
-        return None
+async def _settle_once(request_data: SettleRequest, network: str | None) -> SettleResponse:
+    """Call the facilitator settle; successful transactions are followed until confirmed.
+    Raises PaymentReplayError (nothing is submitted) if the paymentId was already settled on the network.
+    """
+    payment_id = _get_payment_id_from_request(request_data)
+    await replay_filter.check(network, payment_id)
+    result = await x402_facilitator.settle(
+        request_data.paymentPayload, request_data.paymentRequirements
+    )
+    if result.success:
+        replay_filter.add(network, payment_id)
+        confirmation_trackers.track(network, result.transaction or "")
+    return result
 
-    api_key_record = await get_api_key_by_key(api_key)
-    if api_key_record is None:
-        return None
-    return api_key_record.seller_id
+async def _settle_once_and_record(
+    request_data: SettleRequest,
+    seller_id: str | None,
+    payment_id: str | None,
+    network: str | None,
+) -> SettleResponse:
+    """Call the facilitator settle and write one payment record."""
+    result = await _settle_once(request_data, network)
+
+    tx_hash = result.transaction or ""
+    status = "success" if result.success else "failed"
+    try:
+        await payment_recorder.record(payment_id, seller_id, network, tx_hash, status)
+        logger.info(f"Payment record queued: {seller_id} {network} {payment_id} -> {tx_hash}")
+    except Exception:
+        logger.exception("Failed to save payment record (settle result still returned): payment_id=%s", payment_id)
+
+    return result
+
+def _wants_async_settle(request: Request) -> bool:
+    """Async mode is opt-in via `Prefer: respond-async` header or `?mode=async`."""
+    if request.query_params.get("mode") == "async":
+        return True
+    prefer = request.headers.get("Prefer", "")
+    return any(p.strip().lower() == "respond-async" for p in prefer.split(","))
+
+def _ticket_to_response(ticket: SettlementTicket) -> SettlementTicketResponse:
+    """Build SettlementTicketResponse from SettlementTicket."""
+    return SettlementTicketResponse(
+        ticket=ticket.id,
+        status=ticket.status,
+        result=ticket.result,
+        error=ticket.error,
+        createdAt=datetime.fromtimestamp(ticket.created_at, tz=timezone.utc),
+        finishedAt=(
+            datetime.fromtimestamp(ticket.finished_at, tz=timezone.utc)
+            if ticket.finished_at is not None else None
+        ),
+    )
 
-@app.post("/settle", response_model=SettleResponse)
+@app.post(
+    "/settle",
+    response_model=SettleResponse,
+    responses={202: {"model": SettlementTicketResponse, "description": "Accepted for async settlement"}},
+)
 @limiter.limit(get_dynamic_rate_limit, key_func=get_dynamic_key_func)
 async def settle(request: Request, request_data: SettleRequest):
-    """Settle payment on-chain. Calls settle first; if payment_id present, writes one record after. Save failure does not affect response."""
-    payment_id = _get_payment_id_from_request(request_data)
-
+    """Settle payment on-chain. Calls settle first; if payment_id present, writes one record after. Save failure does not affect response.
+    With `Prefer: respond-async` (or `?mode=async`) the request is queued and 202 with a settlement ticket is returned.
+    A valid X-Verification-Ticket from /verify skips re-checking the payload signature (synchronous settle only).
+    """
+    seller_id = _get_seller_id(request)
     try:
-        result = await x402_facilitator.settle(
-            request_data.paymentPayload, request_data.paymentRequirements
+        prevalidator.validate(request_data.paymentPayload, request_data.paymentRequirements)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if _wants_async_settle(request):
+        try:
+            ticket = settlement_queue.submit(request_data, getattr(request.state, "api_key", None), seller_id)
+        except SettlementQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except SettlementQueueUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(_ticket_to_response(ticket), by_alias=True),
+            headers={
+                "Location": f"/settlements/{ticket.id}",
+                "Preference-Applied": "respond-async",
+            },
         )
+
+    ticket = request.headers.get(VERIFICATION_TICKET_HEADER)
+    try:
+        if verification_tickets.check(ticket, request_data.paymentPayload, request_data.paymentRequirements):
+            with verified_payload(request_data.paymentPayload):
+                return await _settle_and_record(request_data, seller_id)
+        return await _settle_and_record(request_data, seller_id)
+    except (SettleInProgressError, PaymentReplayError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception:
         logger.exception("Settle failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-    tx_hash = result.transaction or ""
-    status = "success" if result.success else "failed"
+@app.post("/verify-and-settle", response_model=VerifyAndSettleResponse)
+@limiter.limit(get_dynamic_rate_limit, key_func=get_dynamic_key_func)
+async def verify_and_settle(request: Request, request_data: SettleRequest):
+    """Verify, then settle (and record, as /settle does) only if the payload is valid. The body is parsed once and
+    the signature is not checked a second time during settlement.
+    """
+    seller_id = _get_seller_id(request)
     try:
-        network = _get_network_from_request(request_data)
-        seller_id = await _get_seller_id_from_api_key(getattr(request.state, "api_key", None))
-        await save_payment_record(payment_id, seller_id, network, tx_hash, status)
-        logger.info(f"Payment record saved: {seller_id} {network} {payment_id} -> {tx_hash}")
+        prevalidator.validate(request_data.paymentPayload, request_data.paymentRequirements)
+        verify_result = await x402_facilitator.verify(request_data.paymentPayload, request_data.paymentRequirements)
+        if not verify_result.is_valid:
+            return VerifyAndSettleResponse(verify=verify_result)
+        with verified_payload(request_data.paymentPayload):
+            settle_result = await _settle_and_record(request_data, seller_id)
+        return VerifyAndSettleResponse(verify=verify_result, settle=settle_result)
+    except (SettleInProgressError, PaymentReplayError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception:
-        logger.exception("Failed to save payment record (settle result still returned): payment_id=%s", payment_id)
+        logger.exception("Verify-and-settle failed")
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-    return result
+@app.post("/settle/batch", response_model=list[SettleBatchItemResponse], response_model_exclude_none=True)
+@limiter.limit(get_settle_batch_rate_limit, key_func=get_dynamic_key_func)
+async def settle_batch(request: Request, items: list[dict[str, Any]] = Body(...)):
+    """Settle many payments: grouped by network/scheme with bounded concurrency per group,
+    each item recorded as soon as it settles. Results are in request order, one error per failed item.
+    """
+    if len(items) > config.settle_batch_max_items:
+        raise HTTPException(
+            status_code=400, detail=f"At most {config.settle_batch_max_items} items per batch"
+        )
+    seller_id = _get_seller_id(request)
+    group_limits: dict[tuple[str, str], asyncio.Semaphore] = {}
+
+    async def settle_item(item: dict[str, Any]) -> SettleBatchItemResponse:
+        try:
+            request_data = SettleRequest.model_validate(item)
+        except ValidationError as e:
+            details = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            return SettleBatchItemResponse(error=f"Invalid request: {details}")
+        try:
+            prevalidator.validate(request_data.paymentPayload, request_data.paymentRequirements)
+        except ValueError as e:
+            return SettleBatchItemResponse(error=str(e))
+        payment_id = _get_payment_id_from_request(request_data)
+        network = _get_network_from_request(request_data)
+        group = (network or "", request_data.paymentRequirements.scheme)
+        limit = group_limits.get(group)
+        if limit is None:
+            limit = group_limits[group] = asyncio.Semaphore(config.settle_batch_network_concurrency)
+
+        key = SettleIdempotencyKey.build(network, payment_id, request_data.paymentPayload)
+        async with limit:
+            try:
+                result = await settle_idempotency.execute(
+                    key, lambda: _settle_once_and_record(request_data, seller_id, payment_id, network)
+                )
+            except ValueError as e:
+                return SettleBatchItemResponse(error=str(e))
+            except Exception:
+                logger.exception("Settle failed")
+                return SettleBatchItemResponse(error="Internal server error")
+        return SettleBatchItemResponse(result=result)
+
+    return await asyncio.gather(*(settle_item(item) for item in items))
+
+@app.get("/settlements/{ticket_id}", response_model=SettlementTicketResponse)
+async def get_settlement(request: Request, ticket_id: str):
+    """Poll an async settlement ticket. `result` holds the SettleResponse once status is `done`."""
+    ticket = settlement_queue.get(ticket_id)
+    if ticket is None or not ticket.is_owned_by(getattr(request.state, "api_key", None)):
+        raise HTTPException(status_code=404, detail="Settlement ticket not found")
+    return _ticket_to_response(ticket)
+
+def _require_seller_id(request: Request) -> str:
+    """Seller id for seller-scoped listings; 401 for anonymous requests."""
+    seller_id = _get_seller_id(request)
+    if seller_id is None:
+        raise HTTPException(status_code=401, detail="X-API-KEY required")
+    return seller_id
+
+def _parse_cursor(cursor: str | None) -> int | None:
+    """Cursor is the id of the last record of the previous page."""
+    if cursor is None:
+        return None
+    if not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return int(cursor)
+
+@app.get("/payments", response_model=PaymentRecordPage)
+async def list_payments(
+    request: Request,
+    network: str | None = None,
+    status: str | None = None,
+    since: datetime | None = Query(None, description="created_at >= since (ISO 8601)"),
+    until: datetime | None = Query(None, description="created_at < until (ISO 8601)"),
+    cursor: str | None = Query(None, description="nextCursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """List the caller's payment records, oldest first, with keyset pagination on id."""
+    seller_id = _require_seller_id(request)
+    records = await list_payment_records(
+        seller_id,
+        network=network,
+        status=status,
+        since=since,
+        until=until,
+        after_id=_parse_cursor(cursor),
+        limit=limit,
+    )
+    next_cursor = str(records[-1].id) if len(records) == limit else None
+    return PaymentRecordPage(
+        items=[_payment_record_to_response(record, with_network=True) for record in records],
+        nextCursor=next_cursor,
+    )
+
+_EXPORT_COLUMNS = ("id", "paymentId", "txHash", "network", "status", "createdAt")
+
+async def _export_payment_rows(batches: AsyncIterator[list[dict]], fmt: str) -> AsyncIterator[str]:
+    """Encode streamed payment record batches as NDJSON lines or CSV rows, one chunk per batch."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        writer.writerow(_EXPORT_COLUMNS)
+    async for batch in batches:
+        for row in batch:
+            values = (
+                row["id"], row["payment_id"], row["tx_hash"], row["network"], row["status"],
+                row["created_at"].isoformat(),
+            )
+            if fmt == "csv":
+                writer.writerow(values)
+            else:
+                buf.write(json.dumps(dict(zip(_EXPORT_COLUMNS, values)), separators=(",", ":")) + "\n")
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+@app.get("/payments/export")
+async def export_payments(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    network: str | None = None,
+    status: str | None = None,
+    since: datetime | None = Query(None, description="created_at >= since (ISO 8601)"),
+    until: datetime | None = Query(None, description="created_at < until (ISO 8601)"),
+):
+    """Stream all of the caller's payment records matching the filters (server-side cursor, constant memory)."""
+    seller_id = _require_seller_id(request)
+    batches = stream_payment_records(seller_id, network=network, status=status, since=since, until=until)
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_payment_rows(batches, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="payments.{fmt}"'},
+    )
 
 @app.get("/payments/{payment_id}", response_model=list[PaymentRecordResponse])
 async def get_payment(request: Request, payment_id: str):
     """Get payment record by payment_id."""
-    seller_id = await _get_seller_id_from_api_key(getattr(request.state, "api_key", None))
+    seller_id = _get_seller_id(request)
     records = await get_payment_by_id(payment_id, seller_id)
     if not records:
         raise HTTPException(status_code=404, detail="Payment not found")
@@ -261,20 +792,21 @@ async def get_payment(request: Request, payment_id: str):
 @app.get("/payments/tx/{tx_hash}", response_model=list[PaymentRecordResponse])
 async def get_payment_by_tx(request: Request, tx_hash: str):
     """Get payment record by transaction hash. Returns latest if multiple."""
-    seller_id = await _get_seller_id_from_api_key(getattr(request.state, "api_key", None))
+    seller_id = _get_seller_id(request)
     records = await get_payment_by_tx_hash(tx_hash, seller_id)
     if not records:
         raise HTTPException(status_code=404, detail="Payment not found")
     return [_payment_record_to_response(record) for record in records]
 
 
-def _payment_record_to_response(record):
+def _payment_record_to_response(record, with_network: bool = False):
     """Build PaymentRecordResponse from PaymentRecord."""
     return PaymentRecordResponse(
         paymentId=record.payment_id,
         txHash=record.tx_hash,
         status=record.status,
         createdAt=record.created_at,
+        network=record.network if with_network else None,
     )
 
 def main():
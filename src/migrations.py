@@ -0,0 +1,179 @@
+"""
+Versioned schema migrations, applied in order at startup under a Postgres advisory lock.
+
+Each migration runs once; applied versions are recorded in schema_migrations. Migrations are
+append-only: never edit a released migration, add a new version instead.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key, shared by every replica of this service
+MIGRATION_LOCK_ID = 0x7834_3032_6D69_67  # "x402mig"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema version: statements run in a single transaction."""
+
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        1,
+        "baseline tables",
+        (
+            # IF NOT EXISTS: databases created by the old create_all start from here too
+            """
+            CREATE TABLE IF NOT EXISTS payment_records (
+                id BIGSERIAL PRIMARY KEY,
+                seller_id VARCHAR(64),
+                network VARCHAR(32),
+                payment_id VARCHAR(128),
+                tx_hash VARCHAR(128) NOT NULL,
+                status VARCHAR(32) NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS api_keys (
+                id BIGSERIAL PRIMARY KEY,
+                seller_id VARCHAR(64) NOT NULL,
+                key VARCHAR(64) NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS sellers (
+                id BIGSERIAL PRIMARY KEY,
+                seller_id VARCHAR(64) NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS settle_idempotency (
+                idempotency_key VARCHAR(256) PRIMARY KEY,
+                network VARCHAR(32) NOT NULL,
+                payment_id VARCHAR(128) NOT NULL,
+                payload_hash VARCHAR(64) NOT NULL,
+                status VARCHAR(16) NOT NULL,
+                response TEXT,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """,
+        ),
+    ),
+    Migration(
+        2,
+        "api_keys.revoked_at tombstone",
+        (
+            "ALTER TABLE api_keys ADD COLUMN IF NOT EXISTS revoked_at TIMESTAMP WITH TIME ZONE",
+        ),
+    ),
+    Migration(
+        3,
+        "payment_records lookup indexes",
+        (
+            # get_payment_by_id / get_payment_by_tx_hash with seller scope, latest first
+            "CREATE INDEX IF NOT EXISTS ix_payment_records_seller_payment_id "
+            "ON payment_records (seller_id, payment_id, id DESC)",
+            "CREATE INDEX IF NOT EXISTS ix_payment_records_seller_tx_hash "
+            "ON payment_records (seller_id, tx_hash, id DESC)",
+            # Same lookups without seller scope
+            "CREATE INDEX IF NOT EXISTS ix_payment_records_payment_id "
+            "ON payment_records (payment_id, id DESC)",
+            "CREATE INDEX IF NOT EXISTS ix_payment_records_tx_hash "
+            "ON payment_records (tx_hash, id DESC)",
+        ),
+    ),
+    Migration(
+        4,
+        "api_keys unique key and revocation index",
+        (
+            # Fails if duplicate keys already exist; remove them before upgrading
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_api_keys_key ON api_keys (key)",
+            # Incremental refresh reads rows revoked since a high-water mark
+            "CREATE INDEX IF NOT EXISTS ix_api_keys_revoked_at "
+            "ON api_keys (revoked_at) WHERE revoked_at IS NOT NULL",
+        ),
+    ),
+    Migration(
+        5,
+        "payment_records seller listing index",
+        (
+            # GET /payments and /payments/export: seller scope, keyset on id
+            "CREATE INDEX IF NOT EXISTS ix_payment_records_seller_id "
+            "ON payment_records (seller_id, id)",
+        ),
+    ),
+    Migration(
+        6,
+        "payment_records unconfirmed settlements index",
+        (
+            # Confirmation tracker resume: settled rows awaiting confirmation, per network
+            "CREATE INDEX IF NOT EXISTS ix_payment_records_unconfirmed "
+            "ON payment_records (network, created_at) WHERE status = 'success'",
+        ),
+    ),
+    Migration(
+        7,
+        "settle_idempotency retention index",
+        (
+            # Periodic pruning of completed claims past idempotency.retention
+            "CREATE INDEX IF NOT EXISTS ix_settle_idempotency_done "
+            "ON settle_idempotency (updated_at) WHERE status = 'done'",
+        ),
+    ),
+)
+
+
+async def run_migrations(conn: AsyncConnection, migrations: tuple[Migration, ...] = MIGRATIONS) -> list[int]:
+    """
+    Apply pending migrations on conn (inside the caller's transaction).
+
+    Concurrent replicas serialize on a transaction-scoped advisory lock, so the second one
+    to start sees the versions recorded by the first and applies nothing.
+
+    Returns:
+        Versions applied by this call
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+    await conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description VARCHAR(256) NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            )
+            """
+        )
+    )
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    applied_versions = set(result.scalars().all())
+
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in applied_versions:
+            continue
+        logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+        for statement in migration.statements:
+            await conn.execute(text(statement))
+        await conn.execute(
+            text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+            {"version": migration.version, "description": migration.description},
+        )
+        applied.append(migration.version)
+
+    if applied:
+        logger.info(f"Schema migrated to version {applied[-1]}")
+    return applied
@@ -1,9 +1,193 @@
+import asyncio
 import logging
 from fastapi import FastAPI
+from prometheus_client import Counter, Gauge, Histogram
 from prometheus_fastapi_instrumentator import Instrumentator
 
 logger = logging.getLogger(__name__)
 
+# Application metrics (default registry, exposed together with the HTTP metrics)
+PAYMENT_RECORD_QUEUE_DEPTH = Gauge(
+    "facilitator_payment_record_queue_depth",
+    "Payment records waiting in the write-behind queue",
+)
+PAYMENT_RECORD_FLUSH_SECONDS = Histogram(
+    "facilitator_payment_record_flush_seconds",
+    "Latency of one batched payment record INSERT",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+PAYMENT_RECORD_FLUSH_ROWS = Histogram(
+    "facilitator_payment_record_flush_rows",
+    "Rows written per batched payment record INSERT",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+PAYMENT_RECORDS_WRITTEN = Counter(
+    "facilitator_payment_records_written_total",
+    "Payment records persisted, by write path",
+    ["path"],
+)
+PAYMENT_RECORDS_DROPPED = Counter(
+    "facilitator_payment_records_dropped_total",
+    "Payment records that could not be persisted after retries",
+)
+CONFIRMATION_PENDING = Gauge(
+    "facilitator_confirmation_pending",
+    "Settled transactions waiting for confirmation depth",
+    ["network"],
+)
+CONFIRMATIONS_RESOLVED = Counter(
+    "facilitator_confirmations_resolved_total",
+    "Settled transactions resolved by the confirmation tracker",
+    ["network", "status"],
+)
+CONFIRMATION_POLL_SECONDS = Histogram(
+    "facilitator_confirmation_poll_seconds",
+    "Duration of one confirmation poll cycle (head block + all pending receipts)",
+    ["network"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+RPC_REQUEST_SECONDS = Histogram(
+    "facilitator_rpc_request_seconds",
+    "Chain RPC request latency per endpoint",
+    ["network", "endpoint", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RPC_FAILOVERS = Counter(
+    "facilitator_rpc_failovers_total",
+    "Chain RPC calls retried on another endpoint",
+    ["network"],
+)
+RPC_ENDPOINT_EJECTED = Gauge(
+    "facilitator_rpc_endpoint_ejected",
+    "1 while the endpoint's circuit breaker is open",
+    ["network", "endpoint"],
+)
+HTTP_CLIENT_REQUEST_SECONDS = Histogram(
+    "facilitator_http_client_request_seconds",
+    "Shared chain HTTP client: time to response headers, by host and status",
+    ["host", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_CLIENT_IN_FLIGHT = Gauge(
+    "facilitator_http_client_in_flight",
+    "Shared chain HTTP client: requests in flight per host",
+    ["host"],
+)
+HTTP_CLIENT_POOL_CONNECTIONS = Gauge(
+    "facilitator_http_client_pool_connections",
+    "Shared chain HTTP client: pooled connections by state",
+    ["state"],
+)
+SIGNER_IN_FLIGHT = Gauge(
+    "facilitator_signer_in_flight",
+    "Settlements in flight per facilitator signer",
+    ["network", "signer"],
+)
+SIGNER_SETTLEMENTS = Counter(
+    "facilitator_signer_settlements_total",
+    "Settlements submitted per facilitator signer",
+    ["network", "signer", "outcome"],
+)
+SIGNER_HEALTHY = Gauge(
+    "facilitator_signer_healthy",
+    "1 while the signer is in rotation, 0 while cooling down after failures",
+    ["network", "signer"],
+)
+SIGNER_BALANCE = Gauge(
+    "facilitator_signer_balance",
+    "Native token balance of the facilitator signer (TRX / ETH / BNB)",
+    ["network", "signer"],
+)
+SIGNER_ENERGY_AVAILABLE = Gauge(
+    "facilitator_signer_energy_available",
+    "TRON energy available to the facilitator signer",
+    ["network", "signer"],
+)
+SIGNER_BANDWIDTH_AVAILABLE = Gauge(
+    "facilitator_signer_bandwidth_available",
+    "TRON bandwidth available to the facilitator signer",
+    ["network", "signer"],
+)
+NONCE_RESYNCS = Counter(
+    "facilitator_nonce_resyncs_total",
+    "EVM signer nonce resyncs forced by send failures",
+    ["network", "signer", "reason"],
+)
+NONCE_GAPS_FILLED = Counter(
+    "facilitator_nonce_gaps_filled_total",
+    "EVM nonces reused after a transaction that was never broadcast",
+    ["network", "signer"],
+)
+REF_BLOCK_REQUESTS = Counter(
+    "facilitator_ref_block_requests_total",
+    "TRON reference-block lookups for transaction building, served from cache (hit) or RPC (miss)",
+    ["network", "result"],
+)
+GAS_ORACLE_WEI = Gauge(
+    "facilitator_gas_oracle_wei",
+    "Latest EVM fee estimate in wei (kind: gas_price, base_fee, priority_fee)",
+    ["network", "kind"],
+)
+GAS_ORACLE_LOOKUPS = Counter(
+    "facilitator_gas_oracle_lookups_total",
+    "EVM transaction fee lookups served from a fresh estimate or falling back to RPC (stale)",
+    ["network", "result"],
+)
+FEE_QUOTE_CACHE = Counter(
+    "facilitator_fee_quote_cache_total",
+    "Fee quote lookups by result (hit, miss, coalesced)",
+    ["result"],
+)
+PREVALIDATION_REJECTS = Counter(
+    "facilitator_prevalidation_rejects_total",
+    "Payments rejected before reaching the facilitator library, by reason",
+    ["reason"],
+)
+SETTLE_IDEMPOTENCY_PRUNED = Counter(
+    "facilitator_settle_idempotency_pruned_total",
+    "Completed settle idempotency rows deleted after idempotency.retention",
+)
+REPLAY_FILTER_CHECKS = Counter(
+    "facilitator_replay_filter_checks_total",
+    "Settle replay checks by result (miss, replay, false_positive, error)",
+    ["result"],
+)
+REPLAY_FILTER_ENTRIES = Gauge(
+    "facilitator_replay_filter_entries",
+    "Settled paymentIds added to the replay filter",
+    ["network"],
+)
+VERIFICATION_TICKETS = Counter(
+    "facilitator_verification_tickets_total",
+    "Verification tickets by result (issued, accepted, expired, invalid)",
+    ["result"],
+)
+CRYPTO_OP_SECONDS = Histogram(
+    "facilitator_crypto_op_seconds",
+    "Signature recovery and transaction signing time including executor queueing, by op and executor",
+    ["op", "executor"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+CRYPTO_BATCH_SIZE = Histogram(
+    "facilitator_crypto_batch_size",
+    "Signature recoveries per batched executor call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "facilitator_event_loop_lag_seconds",
+    "How late the event loop woke a periodic probe (time the loop was blocked)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Record event loop lag every interval seconds until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - interval))
+
 def attach_prometheus_middleware(main_app: FastAPI) -> Instrumentator:
     """
     Attach Prometheus instrumentation middleware to the main app.
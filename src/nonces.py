@@ -0,0 +1,116 @@
+"""
+Local EVM nonce allocation - lets one signer broadcast many transactions without a nonce round-trip each.
+
+Nonces are handed out from local state, synced from the chain's pending transaction count on first
+use, after an ambiguous or nonce-related send failure, and every resync_interval seconds. A nonce
+whose transaction was never broadcast goes back to the pool and is reused first, so later
+transactions are not left queued behind a gap.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from monitoring import NONCE_GAPS_FILLED, NONCE_RESYNCS
+
+logger = logging.getLogger(__name__)
+
+# Send errors meaning the local view of the account nonce is stale
+_NONCE_ERROR_MARKERS = (
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    "replacement transaction underpriced",
+)
+
+# Send errors meaning this exact transaction is already in the node's mempool
+_ALREADY_KNOWN_MARKERS = ("already known", "known transaction", "already imported")
+
+
+def is_nonce_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(marker in message for marker in _NONCE_ERROR_MARKERS)
+
+
+def is_already_known(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(marker in message for marker in _ALREADY_KNOWN_MARKERS)
+
+
+class NonceManager:
+    """
+    Nonce allocator for one account on one network.
+
+    reserve() a nonce before building the transaction, then report the outcome:
+    submitted() once the node accepted it, release() if it was never broadcast,
+    invalidate() if the outcome is unknown or the node rejected the nonce itself.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        address: str,
+        fetch_pending_nonce: Callable[[], Awaitable[int]],
+        *,
+        resync_interval: float = 60.0,
+    ) -> None:
+        self.network = network
+        self.address = address
+        self._fetch = fetch_pending_nonce
+        self._resync_interval = resync_interval
+        self._lock = asyncio.Lock()
+        self._next: Optional[int] = None  # None: sync before the next reservation
+        self._synced_at = 0.0
+        self._gaps: list[int] = []  # heap of released nonces below _next
+        self._reserved: set[int] = set()  # handed out, outcome not reported yet
+        self._submitted: set[int] = set()  # accepted by a node, not yet below the chain nonce
+
+    async def reserve(self) -> int:
+        async with self._lock:
+            if self._next is None or time.monotonic() - self._synced_at >= self._resync_interval:
+                await self._sync()
+            if self._gaps:
+                nonce = heapq.heappop(self._gaps)
+                NONCE_GAPS_FILLED.labels(network=self.network, signer=self.address).inc()
+            else:
+                nonce = self._next
+                self._next += 1
+            self._reserved.add(nonce)
+            return nonce
+
+    def submitted(self, nonce: int) -> None:
+        self._reserved.discard(nonce)
+        self._submitted.add(nonce)
+
+    def release(self, nonce: int) -> None:
+        """The transaction was not broadcast; hand the nonce out again before any new one."""
+        self._reserved.discard(nonce)
+        if self._next is not None and nonce < self._next and nonce not in self._gaps:
+            heapq.heappush(self._gaps, nonce)
+
+    def invalidate(self, nonce: int, reason: str) -> None:
+        """The nonce may or may not be used on chain; resync before the next reservation."""
+        self._reserved.discard(nonce)
+        self._next = None
+        NONCE_RESYNCS.labels(network=self.network, signer=self.address, reason=reason).inc()
+        logger.warning(f"Nonce {nonce} of {self.address} on {self.network} invalidated ({reason}); resyncing")
+
+    async def _sync(self) -> None:
+        """
+        Rebase on the chain's pending nonce.
+
+        Local submissions above it are kept (an RPC node may not have seen them yet); numbers between
+        it and the highest local nonce that are neither reserved nor submitted become gaps to fill.
+        """
+        chain_nonce = await self._fetch()
+        self._submitted = {n for n in self._submitted if n >= chain_nonce}
+        in_use = self._reserved | self._submitted
+        next_nonce = max([chain_nonce, *(n + 1 for n in in_use)])
+        self._gaps = [n for n in range(chain_nonce, next_nonce) if n not in in_use]
+        heapq.heapify(self._gaps)
+        if self._next is not None and next_nonce != self._next:
+            logger.info(f"Nonce of {self.address} on {self.network} resynced: {self._next} -> {next_nonce}")
+        self._next = next_nonce
+        self._synced_at = time.monotonic()
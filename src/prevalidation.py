@@ -0,0 +1,108 @@
+"""
+Pre-validation - rejects obviously invalid payments before they reach the facilitator library.
+
+Expired permits, unknown networks or assets, zero amounts and payTo mismatches fail inside
+x402_facilitator.verify/settle only after mechanism lookup, address conversion and logging.
+These checks run on the parsed request in microseconds; /verify, /settle and their batch and
+combined variants answer a failure with 400 and the reason (same codes as the library where
+they overlap). Rejections are counted per reason.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from bankofai.x402.types import PaymentPayload, PaymentRequirements
+
+from monitoring import PREVALIDATION_REJECTS
+
+logger = logging.getLogger(__name__)
+
+
+class PrevalidationError(ValueError):
+    """Raised for a payment rejected by pre-validation; str() is the reason code."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _default_normalize(address: str) -> str:
+    return address.lower() if address.startswith("0x") else address
+
+
+class Prevalidator:
+    """Cheap request checks. Network and asset checks apply once configured with the registered networks."""
+
+    def __init__(self) -> None:
+        # network -> address normalizer; None until configured (network/asset not checked)
+        self._normalizers: Optional[dict[str, Callable[[str], str]]] = None
+        self._assets: dict[str, frozenset[str]] = {}
+
+    def configure(self, networks: dict[str, tuple[Callable[[str], str], list[str]]]) -> None:
+        """networks: network -> (address normalizer, known token addresses; empty = any asset)."""
+        self._normalizers = {network: normalize for network, (normalize, _) in networks.items()}
+        self._assets = {
+            network: frozenset(normalize(address) for address in assets)
+            for network, (normalize, assets) in networks.items()
+        }
+
+    def reset(self) -> None:
+        self._normalizers = None
+        self._assets = {}
+
+    def check(self, payload: PaymentPayload, requirements: PaymentRequirements) -> Optional[str]:
+        """Reason code of the first failed check, or None."""
+        network = requirements.network
+        normalize = _default_normalize
+        if self._normalizers is not None:
+            if network not in self._normalizers:
+                return "unsupported_network"
+            normalize = self._normalizers[network]
+
+        try:
+            amount = int(requirements.amount)
+        except (TypeError, ValueError):
+            return "invalid_amount"
+        if amount <= 0:
+            return "invalid_amount"
+
+        try:
+            pay_to = normalize(requirements.pay_to)
+            assets = self._assets.get(network)
+            if assets and normalize(requirements.asset) not in assets:
+                return "unsupported_token"
+
+            permit = getattr(payload.payload, "payment_permit", None)
+            authorization = getattr(payload.payload, "authorization", None)
+            if permit is not None:
+                paid, recipient, valid_before = permit.payment.pay_amount, permit.payment.pay_to, permit.meta.valid_before
+            elif authorization is not None:
+                paid, recipient, valid_before = authorization.value, authorization.to, authorization.valid_before
+            else:
+                return None
+            if normalize(recipient) != pay_to:
+                return "payto_mismatch"
+        except Exception:
+            return "invalid_address"
+
+        try:
+            if int(paid) < amount:
+                return "amount_mismatch"
+            if int(valid_before) < time.time():
+                return "expired"
+        except (TypeError, ValueError):
+            return "invalid_amount"
+        return None
+
+    def validate(self, payload: PaymentPayload, requirements: PaymentRequirements) -> None:
+        """Raise PrevalidationError (and count it) if check() fails."""
+        reason = self.check(payload, requirements)
+        if reason is not None:
+            PREVALIDATION_REJECTS.labels(reason=reason).inc()
+            logger.debug(f"Pre-validation rejected payment on {requirements.network}: {reason}")
+            raise PrevalidationError(reason)
+
+
+# Global pre-validator (networks registered in lifespan)
+prevalidator = Prevalidator()
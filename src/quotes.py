@@ -0,0 +1,125 @@
+"""
+Fee quote cache - memoizes mechanism fee quotes per normalized payment requirement for ttl seconds.
+
+Resource servers request quotes for the same few (network, scheme, asset) requirements on every 402
+challenge. Quotes are cached per signer (pooled mechanisms keep rotating the quoted caller),
+concurrent misses for one key share a single evaluation, and the cache empties whenever the
+configuration is reloaded.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from bankofai.x402.types import FeeQuoteResponse, PaymentRequirements
+
+from monitoring import FEE_QUOTE_CACHE
+
+logger = logging.getLogger(__name__)
+
+# A cached quote is not served once it expires in less than this many seconds
+_MIN_REMAINING_VALIDITY = 60
+
+
+def requirement_key(accept: PaymentRequirements, context: dict[str, Any] | None = None) -> str:
+    """Canonical JSON of a requirement (hex addresses lowercased) and its quote context."""
+    data = accept.model_dump(mode="json", by_alias=True, exclude_none=True)
+    for field in ("asset", "payTo"):
+        value = data.get(field)
+        if isinstance(value, str) and value.startswith("0x"):
+            data[field] = value.lower()
+    return json.dumps({"accept": data, "context": context or None}, sort_keys=True, separators=(",", ":"))
+
+
+class QuoteCache:
+    """Bounded TTL cache of fee quotes with in-flight coalescing."""
+
+    def __init__(
+        self,
+        ttl: float = 10.0,
+        max_entries: int = 10000,
+        generation: Callable[[], int] = lambda: 0,
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._generation = generation
+        self._seen_generation: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, tuple[float, Optional[FeeQuoteResponse]]]" = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def configure(self, *, ttl: float, max_entries: int, generation: Callable[[], int]) -> None:
+        """Apply settings from config (called once in lifespan)."""
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._generation = generation
+        self.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[Optional[FeeQuoteResponse]]],
+    ) -> Optional[FeeQuoteResponse]:
+        """Cached quote for key, else the result of load() (cached too, including None for unsupported)."""
+        if self._ttl <= 0:
+            return await load()
+
+        generation = self._generation()
+        if generation != self._seen_generation:
+            self.clear()
+            self._seen_generation = generation
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, quote = entry
+            if time.monotonic() < expires_at and _still_valid(quote):
+                self._entries.move_to_end(key)
+                FEE_QUOTE_CACHE.labels(result="hit").inc()
+                return quote
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            FEE_QUOTE_CACHE.labels(result="coalesced").inc()
+            return await asyncio.shield(inflight)
+
+        FEE_QUOTE_CACHE.labels(result="miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved when nobody else is waiting on the future
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            quote = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(quote)
+            if self._generation() == generation:
+                self._store(key, quote)
+            return quote
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: Hashable, quote: Optional[FeeQuoteResponse]) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, quote)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+def _still_valid(quote: Optional[FeeQuoteResponse]) -> bool:
+    expires_at = getattr(quote, "expires_at", None)
+    return expires_at is None or expires_at - time.time() >= _MIN_REMAINING_VALIDITY
+
+
+# Global fee quote cache
+quote_cache = QuoteCache()
@@ -0,0 +1,151 @@
+"""
+Write-behind payment recorder - settle results are queued in memory and flushed as multi-row INSERTs.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from database import save_payment_record, save_payment_records
+from monitoring import (
+    PAYMENT_RECORD_FLUSH_ROWS,
+    PAYMENT_RECORD_FLUSH_SECONDS,
+    PAYMENT_RECORD_QUEUE_DEPTH,
+    PAYMENT_RECORDS_DROPPED,
+    PAYMENT_RECORDS_WRITTEN,
+)
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel: everything enqueued before it is flushed, then the flusher exits
+_STOP = object()
+
+# Attempts per batch before its rows are dropped (DB outage longer than this loses records)
+_FLUSH_ATTEMPTS = 3
+
+
+class PaymentRecorder:
+    """
+    Bounded in-memory queue of payment records drained by one background flusher.
+
+    The flusher writes a batch every flush_interval_ms or as soon as batch_size rows are queued.
+    When the recorder is not running (e.g. before startup) or the queue is full, records are
+    written directly so they are never silently lost to backpressure.
+    """
+
+    def __init__(self) -> None:
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed: bool = True
+        self._batch_size: int = 500
+        self._flush_interval: float = 0.05
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closed
+
+    async def start(self, *, max_queue: int, batch_size: int, flush_interval_ms: int) -> None:
+        """Start the background flusher."""
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0, flush_interval_ms) / 1000
+        self._closed = False
+        self._task = asyncio.create_task(self._run(), name="payment-recorder")
+        logger.info(
+            f"Payment recorder started: max_queue={max_queue}, batch_size={batch_size}, "
+            f"flush_interval_ms={flush_interval_ms}"
+        )
+
+    async def stop(self) -> None:
+        """Flush every queued record, then stop the flusher."""
+        if self._task is None:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+        PAYMENT_RECORD_QUEUE_DEPTH.set(0)
+        logger.info("Payment recorder stopped (queue flushed)")
+
+    async def record(
+        self,
+        payment_id: str | None,
+        seller_id: str | None,
+        network: str | None,
+        tx_hash: str,
+        status: str,
+    ) -> None:
+        """Queue one payment record; writes it directly when not running or when the queue is full."""
+        if self.running:
+            row = dict(
+                payment_id=payment_id,
+                seller_id=seller_id,
+                network=network,
+                tx_hash=tx_hash,
+                status=status,
+                created_at=datetime.now(timezone.utc),
+            )
+            try:
+                self._queue.put_nowait(row)
+                PAYMENT_RECORD_QUEUE_DEPTH.set(self._queue.qsize())
+                return
+            except asyncio.QueueFull:
+                logger.warning("Payment record queue full, writing record directly")
+        await save_payment_record(payment_id, seller_id, network, tx_hash, status)
+        PAYMENT_RECORDS_WRITTEN.labels(path="direct").inc()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            PAYMENT_RECORD_QUEUE_DEPTH.set(self._queue.qsize())
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: list[dict]) -> None:
+        for attempt in range(1, _FLUSH_ATTEMPTS + 1):
+            started = time.perf_counter()
+            try:
+                await save_payment_records(batch)
+            except Exception:
+                logger.exception(f"Failed to flush {len(batch)} payment records (attempt {attempt}/{_FLUSH_ATTEMPTS})")
+                if attempt < _FLUSH_ATTEMPTS:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+                continue
+            PAYMENT_RECORD_FLUSH_SECONDS.observe(time.perf_counter() - started)
+            PAYMENT_RECORD_FLUSH_ROWS.observe(len(batch))
+            PAYMENT_RECORDS_WRITTEN.labels(path="batch").inc(len(batch))
+            return
+        PAYMENT_RECORDS_DROPPED.inc(len(batch))
+        logger.error(
+            "Dropped payment records after retries: "
+            + ", ".join(f"{r['payment_id']}->{r['tx_hash']}" for r in batch)
+        )
+
+
+# Global payment recorder
+payment_recorder = PaymentRecorder()
@@ -0,0 +1,95 @@
+"""
+TRON reference-block cache - keeps a recent solid block id in memory for transaction building.
+
+tronpy fetches the latest solid block (getnodeinfo) for ref_block_bytes/hash on every build. A
+background task per network refreshes it every few seconds instead, so TRON settlements skip that
+round trip. Any block among the last 65536 is a valid reference; if refreshes stop, entries older
+than max_age fall back to a live fetch.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from tronpy import AsyncTron
+
+from monitoring import REF_BLOCK_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class RefBlockCache:
+    """Latest solid block id of one TRON network."""
+
+    def __init__(self, network: str, fetch: Callable[[], Awaitable[str]], *, max_age: float = 30.0) -> None:
+        self.network = network
+        self._fetch = fetch
+        self._max_age = max_age
+        self._block_id: Optional[str] = None
+        self._fetched_at = 0.0
+
+    async def get(self) -> str:
+        """Cached block id, or a live fetch when the cache is empty or older than max_age."""
+        if self._block_id is not None and time.monotonic() - self._fetched_at < self._max_age:
+            REF_BLOCK_REQUESTS.labels(network=self.network, result="hit").inc()
+            return self._block_id
+        REF_BLOCK_REQUESTS.labels(network=self.network, result="miss").inc()
+        return await self.refresh()
+
+    async def refresh(self) -> str:
+        block_id = await self._fetch()
+        self._block_id = block_id
+        self._fetched_at = time.monotonic()
+        return block_id
+
+
+class RefBlockTron(AsyncTron):
+    """AsyncTron whose transaction builder takes its reference block from a RefBlockCache."""
+
+    def __init__(self, *args, ref_blocks: RefBlockCache, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._ref_blocks = ref_blocks
+
+    async def get_latest_solid_block_id(self) -> str:
+        return await self._ref_blocks.get()
+
+
+class RefBlockCaches:
+    """Registry of per-network caches, each refreshed by its own background task."""
+
+    def __init__(self) -> None:
+        self._caches: dict[str, RefBlockCache] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add(self, cache: RefBlockCache) -> None:
+        self._caches[cache.network] = cache
+
+    def get(self, network: str) -> Optional[RefBlockCache]:
+        return self._caches.get(network)
+
+    def start(self, *, refresh_interval: float) -> None:
+        for cache in self._caches.values():
+            self._tasks.append(
+                asyncio.create_task(self._run(cache, refresh_interval), name=f"ref-block-{cache.network}")
+            )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, cache: RefBlockCache, interval: float) -> None:
+        while True:
+            try:
+                await cache.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Reference block refresh failed on {cache.network}: {e}")
+            await asyncio.sleep(interval)
+
+
+# Global reference-block caches (one per TRON network)
+ref_block_caches = RefBlockCaches()
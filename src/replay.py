@@ -0,0 +1,119 @@
+"""
+Replay filter - rejects resubmitted payments whose paymentId was already settled, without going on-chain.
+
+One Bloom filter per network holds the paymentIds of settled payments. It is rebuilt from
+payment_records at startup and updated after every successful settle. A miss means the payment was
+never settled here, so it proceeds as before. A hit is confirmed against the database, since the
+filter has false positives, and a confirmed replay is rejected before any RPC call.
+"""
+
+import hashlib
+import logging
+import math
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from database import is_payment_settled
+from monitoring import REPLAY_FILTER_CHECKS, REPLAY_FILTER_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentReplayError(ValueError):
+    """Raised when a paymentId that was already settled on the network is settled again."""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings (blake2b double hashing)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class ReplayFilter:
+    """Per-network Bloom filters of settled paymentIds with database confirmation of hits."""
+
+    def __init__(
+        self,
+        confirm: Callable[[str, str], Awaitable[bool]] = is_payment_settled,
+    ) -> None:
+        self._confirm = confirm
+        self._enabled = False
+        self._capacity = 1_000_000
+        self._error_rate = 0.001
+        self._filters: dict[str, BloomFilter] = {}
+
+    def configure(self, *, enabled: bool, capacity: int, error_rate: float) -> None:
+        """Apply settings from config (called once in lifespan, before load)."""
+        self._enabled = enabled
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._filters.clear()
+
+    def add(self, network: Optional[str], payment_id: Optional[str]) -> None:
+        if not self._enabled or not payment_id:
+            return
+        network = network or ""
+        bloom = self._filters.get(network)
+        if bloom is None:
+            bloom = self._filters[network] = BloomFilter(self._capacity, self._error_rate)
+        bloom.add(payment_id)
+        REPLAY_FILTER_ENTRIES.labels(network=network).set(bloom.count)
+        if bloom.count == self._capacity + 1:
+            logger.warning(f"Replay filter for {network} is over capacity; more lookups will reach the database")
+
+    def might_contain(self, network: Optional[str], payment_id: Optional[str]) -> bool:
+        bloom = self._filters.get(network or "")
+        return bloom is not None and bool(payment_id) and payment_id in bloom
+
+    async def is_replay(self, network: Optional[str], payment_id: Optional[str]) -> bool:
+        """True if payment_id is known to be settled on network; only filter hits query the database."""
+        if not self._enabled or not self.might_contain(network, payment_id):
+            REPLAY_FILTER_CHECKS.labels(result="miss").inc()
+            return False
+        try:
+            settled = await self._confirm(network or "", payment_id)
+        except Exception as e:
+            # Fail open: the chain still rejects a real replay
+            logger.warning(f"Replay confirmation failed for {network}/{payment_id}: {e}")
+            REPLAY_FILTER_CHECKS.labels(result="error").inc()
+            return False
+        REPLAY_FILTER_CHECKS.labels(result="replay" if settled else "false_positive").inc()
+        return settled
+
+    async def check(self, network: Optional[str], payment_id: Optional[str]) -> None:
+        """Raise PaymentReplayError for a confirmed replay."""
+        if await self.is_replay(network, payment_id):
+            raise PaymentReplayError(f"Payment {payment_id} was already settled on {network}")
+
+    async def load(self, batches: AsyncIterator[list[tuple[Optional[str], str]]]) -> int:
+        """Add (network, payment_id) rows of settled payments; returns the number of rows."""
+        if not self._enabled:
+            return 0
+        rows = 0
+        async for batch in batches:
+            for network, payment_id in batch:
+                self.add(network, payment_id)
+            rows += len(batch)
+        logger.info(f"Replay filter loaded {rows} settled payments")
+        return rows
+
+
+# Global replay filter
+replay_filter = ReplayFilter()
@@ -0,0 +1,316 @@
+"""
+Multi-endpoint chain RPC - routes each call to the healthiest endpoint of a network.
+
+Every endpoint keeps an EWMA of its latency and error rate. Calls go to the endpoint with the
+lowest score; transport errors, timeouts, 429 and 5xx fail over to the next one. Endpoints
+that fail failure_threshold times in a row are ejected (circuit open) for cooldown seconds,
+then get a single trial call (half-open) before receiving traffic again.
+
+Broadcasts (eth_sendRawTransaction, TRON broadcasttransaction) fail over only on connect-phase
+errors: after a read timeout or 5xx the node may already have accepted the transaction, so it is
+not sent again elsewhere. A duplicate-transaction answer to a broadcast means the transaction is
+already in the mempool and is returned as success.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+from eth_utils import keccak
+from tronpy.providers.async_http import AsyncHTTPProvider as TronHTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from monitoring import RPC_ENDPOINT_EJECTED, RPC_FAILOVERS, RPC_REQUEST_SECONDS
+from ref_blocks import RefBlockCache, RefBlockTron
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error rate weight in the routing score: a 10% error rate doubles the effective latency
+_ERROR_PENALTY = 10.0
+
+# Methods that submit a signed transaction; resending one after it may have reached a node is unsafe
+EVM_BROADCAST_METHODS = frozenset({"eth_sendRawTransaction"})
+TRON_BROADCAST_METHODS = frozenset({"wallet/broadcasttransaction", "wallet/broadcasthex"})
+
+# Errors raised before the request was sent
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# JSON-RPC error messages for a transaction the node already has (geth, erigon / parity, besu)
+_EVM_DUPLICATE_MARKERS = ("already known", "known transaction", "already imported")
+
+
+class RpcUnavailableError(Exception):
+    """Raised when every RPC endpoint of a network failed for one call."""
+
+
+def endpoint_label(url: str) -> str:
+    """Metric/log label for an endpoint: scheme and host only (paths may carry API keys)."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _is_failover_error(exc: Exception, *, broadcast: bool = False) -> bool:
+    """Endpoint-level failures; anything else (4xx, bad params) is the caller's problem."""
+    if broadcast:
+        return isinstance(exc, _CONNECT_ERRORS)
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+@dataclass
+class EndpointState:
+    """Health statistics of one RPC endpoint."""
+
+    url: str
+    latency: Optional[float] = None  # EWMA seconds; None until the first call
+    error_rate: float = 0.0  # EWMA of failures, 0..1
+    consecutive_failures: int = 0
+    open_until: float = 0.0  # circuit open (ejected) until this monotonic time
+    probing: bool = False  # half-open trial call in flight
+
+    @property
+    def score(self) -> float:
+        # Unmeasured endpoints score 0 so each one is tried early
+        return (self.latency or 0.0) * (1 + _ERROR_PENALTY * self.error_rate)
+
+    def is_open(self, now: float) -> bool:
+        return self.open_until > now
+
+
+class RpcRouter:
+    """Latency-aware router with per-endpoint circuit breakers for one network."""
+
+    def __init__(
+        self,
+        network: str,
+        urls: list[str],
+        *,
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> None:
+        if not urls:
+            raise ValueError(f"No RPC endpoints configured for {network}")
+        self.network = network
+        self.endpoints = [EndpointState(url=url) for url in urls]
+        self._alpha = ewma_alpha
+        self._failure_threshold = max(1, failure_threshold)
+        self._cooldown = cooldown
+
+    def candidates(self) -> list[EndpointState]:
+        """
+        Endpoints to try for one call, in order.
+
+        A half-open endpoint (cooldown over, no trial in flight) goes first so recovery is detected;
+        closed endpoints follow by score. If every circuit is open, all endpoints are tried anyway,
+        soonest-to-close first, rather than failing without a request.
+        """
+        now = time.monotonic()
+        closed = sorted((e for e in self.endpoints if not e.open_until), key=lambda e: e.score)
+        half_open = [e for e in self.endpoints if e.open_until and not e.is_open(now) and not e.probing]
+        ordered = half_open[:1] + closed
+        if not ordered:
+            ordered = sorted(self.endpoints, key=lambda e: e.open_until)
+        return ordered
+
+    async def call(self, fn: Callable[[str], Awaitable[T]], *, broadcast: bool = False) -> T:
+        """
+        Run fn(endpoint_url) on the best endpoint, failing over on endpoint-level errors.
+
+        With broadcast=True only connect-phase errors fail over; other endpoint errors are recorded
+        and raised, since the transaction may already have been accepted.
+
+        Raises:
+            RpcUnavailableError: If every candidate endpoint failed.
+        """
+        last_error: Optional[Exception] = None
+        for attempt, endpoint in enumerate(self.candidates()):
+            if attempt:
+                RPC_FAILOVERS.labels(network=self.network).inc()
+            probe = bool(endpoint.open_until)
+            endpoint.probing = probe
+            started = time.perf_counter()
+            try:
+                result = await fn(endpoint.url)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                if not _is_failover_error(e):
+                    # The endpoint answered; the request itself was rejected
+                    self.record(endpoint, elapsed, ok=True)
+                    raise
+                if not _is_failover_error(e, broadcast=broadcast):
+                    # The broadcast may have reached the node; do not send it again elsewhere
+                    self.record(endpoint, elapsed, ok=False)
+                    logger.warning(
+                        f"RPC broadcast failed on {endpoint_label(endpoint.url)} ({self.network}), not retried: {e!r}"
+                    )
+                    raise
+                self.record(endpoint, elapsed, ok=False)
+                logger.warning(f"RPC call failed on {endpoint_label(endpoint.url)} ({self.network}): {e!r}")
+                last_error = e
+                continue
+            finally:
+                if probe:
+                    endpoint.probing = False
+            self.record(endpoint, time.perf_counter() - started, ok=True)
+            return result
+        raise RpcUnavailableError(f"All RPC endpoints failed for {self.network}") from last_error
+
+    def record(self, endpoint: EndpointState, elapsed: float, *, ok: bool) -> None:
+        """Update EWMA latency/error rate and the circuit breaker after one call."""
+        label = endpoint_label(endpoint.url)
+        RPC_REQUEST_SECONDS.labels(
+            network=self.network, endpoint=label, outcome="ok" if ok else "error"
+        ).observe(elapsed)
+        alpha = self._alpha
+        endpoint.latency = elapsed if endpoint.latency is None else (1 - alpha) * endpoint.latency + alpha * elapsed
+        endpoint.error_rate = (1 - alpha) * endpoint.error_rate + alpha * (0.0 if ok else 1.0)
+        if ok:
+            if endpoint.open_until:
+                logger.info(f"RPC endpoint {label} ({self.network}) recovered")
+                RPC_ENDPOINT_EJECTED.labels(network=self.network, endpoint=label).set(0)
+            endpoint.consecutive_failures = 0
+            endpoint.open_until = 0.0
+            return
+        endpoint.consecutive_failures += 1
+        if endpoint.open_until or endpoint.consecutive_failures >= self._failure_threshold:
+            endpoint.open_until = time.monotonic() + self._cooldown
+            RPC_ENDPOINT_EJECTED.labels(network=self.network, endpoint=label).set(1)
+            logger.warning(
+                f"RPC endpoint {label} ({self.network}) ejected for {self._cooldown}s "
+                f"after {endpoint.consecutive_failures} consecutive failures"
+            )
+
+
+class RoutedTronProvider(TronHTTPProvider):
+    """tronpy AsyncHTTPProvider that sends every request through an RpcRouter."""
+
+    def __init__(self, router: RpcRouter, client: httpx.AsyncClient, api_key: Optional[str] = None) -> None:
+        super().__init__(endpoint_uri=router.endpoints[0].url, client=client, api_key=api_key)
+        self._router = router
+        self._api_key = api_key
+
+    async def make_request(self, method: str, params: Any = None) -> dict:
+        from tronpy.version import VERSION
+
+        async def send(url: str) -> dict:
+            headers = {"User-Agent": f"Tronpy/{VERSION}"}
+            if self._api_key and "trongrid" in url:
+                headers["Tron-Pro-Api-Key"] = self._api_key
+            resp = await self.client.post(urljoin(url.rstrip("/") + "/", method), headers=headers, json=params or {})
+            resp.raise_for_status()
+            return resp.json()
+
+        if method not in TRON_BROADCAST_METHODS:
+            return await self._router.call(send)
+        payload = await self._router.call(send, broadcast=True)
+        if payload.get("code") == "DUP_TRANSACTION_ERROR":
+            # Already in the node's pending pool (e.g. sent by an earlier attempt)
+            return {"result": True, "txid": payload.get("txid") or (params or {}).get("txID")}
+        return payload
+
+
+class RoutedEvmProvider(AsyncJSONBaseProvider):
+    """web3 async JSON-RPC provider that posts every request through an RpcRouter."""
+
+    def __init__(self, router: RpcRouter, client: httpx.AsyncClient) -> None:
+        super().__init__()
+        self._router = router
+        self._client = client
+
+    def __str__(self) -> str:
+        return f"Routed RPC connection {self._router.network}"
+
+    async def _post(self, request_data: bytes, *, broadcast: bool = False) -> bytes:
+        async def send(url: str) -> bytes:
+            resp = await self._client.post(url, content=request_data, headers={"Content-Type": "application/json"})
+            resp.raise_for_status()
+            return resp.content
+
+        return await self._router.call(send, broadcast=broadcast)
+
+    async def make_request(self, method, params):
+        broadcast = method in EVM_BROADCAST_METHODS
+        response = self.decode_rpc_response(
+            await self._post(self.encode_rpc_request(method, params), broadcast=broadcast)
+        )
+        if broadcast and _is_duplicate_transaction(response):
+            # Already in the node's mempool (e.g. sent by an earlier attempt): report its hash
+            raw_tx = params[0]
+            tx_hash = keccak(hexstr=raw_tx) if isinstance(raw_tx, str) else keccak(raw_tx)
+            return {"jsonrpc": "2.0", "id": response.get("id"), "result": "0x" + tx_hash.hex()}
+        return response
+
+    async def make_batch_request(self, batch_requests):
+        response = self.decode_rpc_response(await self._post(self.encode_batch_rpc_request(batch_requests)))
+        if not isinstance(response, list):
+            # RPC errors return only one response with the error object
+            return response
+        return sorted(response, key=lambda r: r.get("id", 0))
+
+
+def _is_duplicate_transaction(response: Any) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    message = str(error.get("message", "")).lower() if isinstance(error, dict) else ""
+    return any(marker in message for marker in _EVM_DUPLICATE_MARKERS)
+
+
+def default_rpc_endpoints(network: str, trongrid_api_key: Optional[str] = None) -> list[str]:
+    """
+    The endpoint the library would use for an internal network id, for networks without rpc_endpoints.
+    TRON: TronGrid when an API key is set, otherwise the library's fallback RPC. EVM: NetworkConfig RPC URL.
+    """
+    if network.startswith("tron:"):
+        from tronpy.defaults import conf_for_name
+        from bankofai.x402.utils import tron_client
+
+        name = network.split(":", 1)[1]
+        if trongrid_api_key:
+            conf = conf_for_name(name)
+            return [conf["fullnode"]] if conf else []
+        fallback = getattr(tron_client, f"TRON_{name.upper()}_FALLBACK_URL", None)
+        if fallback:
+            return [fallback]
+        conf = conf_for_name(name)
+        return [conf["fullnode"]] if conf else []
+
+    from bankofai.x402.signers.utils import resolve_provider_uri
+
+    uri = resolve_provider_uri(network)
+    return [uri] if uri else []
+
+
+def create_tron_client(
+    network: str,
+    router: RpcRouter,
+    client: httpx.AsyncClient,
+    api_key: Optional[str] = None,
+    ref_blocks: Optional[RefBlockCache] = None,
+) -> Any:
+    """AsyncTron for a 'tron:<name>' network whose requests go through router (reference block from ref_blocks)."""
+    from tronpy import AsyncTron
+
+    name = network.split(":", 1)[1] if network.startswith("tron:") else network
+    provider = RoutedTronProvider(router, client, api_key=api_key)
+    if ref_blocks is not None:
+        return RefBlockTron(provider=provider, network=name, ref_blocks=ref_blocks)
+    return AsyncTron(provider=provider, network=name)
+
+
+def create_web3_client(router: RpcRouter, client: httpx.AsyncClient) -> Any:
+    """AsyncWeb3 whose requests go through router (POA extra-data tolerant, like the library client)."""
+    from web3 import AsyncWeb3
+    from web3.middleware import ExtraDataToPOAMiddleware
+
+    w3 = AsyncWeb3(RoutedEvmProvider(router, client))
+    w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+    return w3
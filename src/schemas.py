@@ -1,8 +1,10 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from bankofai.x402.types import (
     PaymentPayload,
     PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
 )
 
 class VerifyRequest(BaseModel):
@@ -11,24 +13,62 @@ class VerifyRequest(BaseModel):
     paymentRequirements: PaymentRequirements
 
 
+class VerifyBatchItemResponse(BaseModel):
+    """One /verify/batch result: the VerifyResponse, or the error that prevented verification"""
+    result: VerifyResponse | None = None
+    error: str | None = None
+
+
 class SettleRequest(BaseModel):
     """Settle request model"""
     paymentPayload: PaymentPayload
     paymentRequirements: PaymentRequirements
 
 
+class SettleBatchItemResponse(BaseModel):
+    """One /settle/batch result: the SettleResponse, or the error that prevented settlement"""
+    result: SettleResponse | None = None
+    error: str | None = None
+
+
+class VerifyAndSettleResponse(BaseModel):
+    """/verify-and-settle result: settle is null when verification failed (nothing was submitted)"""
+    verify: VerifyResponse
+    settle: SettleResponse | None = None
+
+
 class FeeQuoteRequest(BaseModel):
     """Fee quote request model"""
     accepts: list[PaymentRequirements]
     paymentPermitContext: dict | None = None
 
 
+class SettlementTicketResponse(BaseModel):
+    """Async settlement ticket response model"""
+    ticket: str
+    status: str
+    result: SettleResponse | None = None
+    error: str | None = None
+    created_at: datetime = Field(alias="createdAt")
+    finished_at: datetime | None = Field(default=None, alias="finishedAt")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class PaymentRecordResponse(BaseModel):
     """Payment record response model"""
-    payment_id: str = Field(alias="paymentId")
+    payment_id: str | None = Field(alias="paymentId")
     tx_hash: str = Field(alias="txHash")
     status: str
     created_at: datetime = Field(alias="createdAt")
+    network: str | None = None
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class PaymentRecordPage(BaseModel):
+    """One page of GET /payments; pass nextCursor as `cursor` to fetch the next page"""
+    items: list[PaymentRecordResponse]
+    next_cursor: str | None = Field(default=None, alias="nextCursor")
+
+    model_config = ConfigDict(populate_by_name=True)
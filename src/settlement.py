@@ -0,0 +1,170 @@
+"""
+Asynchronous settlement - in-process worker pool with pollable settlement tickets.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Ticket states
+TICKET_PENDING = "pending"
+TICKET_PROCESSING = "processing"
+TICKET_DONE = "done"
+TICKET_ERROR = "error"
+
+
+class SettlementQueueFull(Exception):
+    """Raised when the async settlement queue is at capacity."""
+
+
+class SettlementQueueUnavailable(Exception):
+    """Raised when async settlement is requested but the worker pool is not running."""
+
+
+@dataclass
+class SettlementTicket:
+    """State of one asynchronously processed settlement."""
+
+    id: str
+    owner: Optional[str]
+    seller_id: Optional[str] = None
+    status: str = TICKET_PENDING
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def is_owned_by(self, api_key: Optional[str]) -> bool:
+        """Tickets created with an API key can only be read back with the same key."""
+        if self.owner is None:
+            return True
+        return api_key is not None and secrets.compare_digest(self.owner, api_key)
+
+
+SettleHandler = Callable[[Any, Optional[str]], Awaitable[Any]]  # (request_data, seller_id)
+
+
+class SettlementQueue:
+    """
+    Bounded queue of settle requests drained by a fixed pool of asyncio workers.
+
+    Each submitted request gets a ticket that can be polled until the worker
+    stores the SettleResponse (or the error) on it. Finished tickets expire after ttl seconds.
+    """
+
+    def __init__(self) -> None:
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._tickets: "OrderedDict[str, SettlementTicket]" = OrderedDict()
+        self._handler: Optional[SettleHandler] = None
+        self._ticket_ttl: int = 3600
+        self._max_tickets: int = 0
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None and bool(self._workers)
+
+    async def start(
+        self,
+        handler: SettleHandler,
+        *,
+        workers: int,
+        max_pending: int,
+        ticket_ttl: int,
+    ) -> None:
+        """Start the worker pool. handler(request_data, seller_id) performs one settlement."""
+        self._handler = handler
+        self._ticket_ttl = ticket_ttl
+        # Keep finished tickets for polling, but never more than a few queues' worth
+        self._max_tickets = max(max_pending * 10, workers * 10)
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"settlement-worker-{i}")
+            for i in range(workers)
+        ]
+        logger.info(f"Async settlement started: workers={workers}, max_pending={max_pending}")
+
+    async def stop(self, timeout: float) -> None:
+        """Let workers finish queued settlements (up to timeout seconds), then cancel them."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Async settlement shutdown timed out with {self._queue.qsize()} settlements still queued"
+            )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        logger.info("Async settlement stopped")
+
+    def submit(self, request_data: Any, api_key: Optional[str], seller_id: Optional[str] = None) -> SettlementTicket:
+        """
+        Enqueue a settle request and return its ticket (readable only with the same api_key).
+
+        Raises:
+            SettlementQueueUnavailable: If the worker pool is not running.
+            SettlementQueueFull: If max_pending settlements are already queued.
+        """
+        if not self.running:
+            raise SettlementQueueUnavailable("Async settlement is not available")
+        self._purge_expired()
+        ticket = SettlementTicket(id=uuid.uuid4().hex, owner=api_key, seller_id=seller_id)
+        try:
+            self._queue.put_nowait((ticket, request_data))
+        except asyncio.QueueFull:
+            raise SettlementQueueFull("Async settlement queue is full")
+        self._tickets[ticket.id] = ticket
+        return ticket
+
+    def get(self, ticket_id: str) -> Optional[SettlementTicket]:
+        """Get a ticket by id; returns None if unknown or expired."""
+        self._purge_expired()
+        return self._tickets.get(ticket_id)
+
+    def _purge_expired(self) -> None:
+        """Drop finished tickets older than ttl, oldest first; cap total ticket count."""
+        now = time.time()
+        while self._tickets:
+            ticket = next(iter(self._tickets.values()))
+            expired = ticket.finished_at is not None and now - ticket.finished_at > self._ticket_ttl
+            overflow = self._max_tickets and len(self._tickets) > self._max_tickets and ticket.finished_at is not None
+            if not (expired or overflow):
+                break
+            self._tickets.popitem(last=False)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            ticket, request_data = await self._queue.get()
+            ticket.status = TICKET_PROCESSING
+            try:
+                ticket.result = await self._handler(request_data, ticket.seller_id)
+                ticket.status = TICKET_DONE
+            except asyncio.CancelledError:
+                ticket.status = TICKET_ERROR
+                ticket.error = "Settlement cancelled"
+                raise
+            except ValueError as e:
+                ticket.status = TICKET_ERROR
+                ticket.error = str(e)
+            except Exception:
+                logger.exception(f"Async settle failed: ticket={ticket.id}")
+                ticket.status = TICKET_ERROR
+                ticket.error = "Internal server error"
+            finally:
+                ticket.finished_at = time.time()
+                self._queue.task_done()
+
+
+# Global async settlement queue
+settlement_queue = SettlementQueue()
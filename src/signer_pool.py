@@ -0,0 +1,240 @@
+"""
+Signer pools - several hot wallets per network, with settlements spread across them.
+
+exact_permit payments name the facilitator account allowed to submit them (permit.caller), so
+load is balanced when quoting: each fee quote names the least-loaded healthy signer as caller,
+and the settle is then dispatched to that signer. Payments any account may submit (exact) go
+straight to the least-loaded healthy signer.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from bankofai.x402.types import FeeQuoteResponse, PaymentPayload, PaymentRequirements, SettleResponse, VerifyResponse
+
+from monitoring import (
+    SIGNER_BALANCE,
+    SIGNER_BANDWIDTH_AVAILABLE,
+    SIGNER_ENERGY_AVAILABLE,
+    SIGNER_HEALTHY,
+    SIGNER_IN_FLIGHT,
+    SIGNER_SETTLEMENTS,
+)
+from quotes import quote_cache, requirement_key
+from verification import honor_verification_tickets
+
+logger = logging.getLogger(__name__)
+
+# Settle outcomes that point at the submitting account (resources, nonce, RPC) rather than the payment
+_SIGNER_FAILURE_REASONS = {"transaction_failed"}
+
+
+@dataclass
+class PooledSigner:
+    """One facilitator account in a pool, with its load and health."""
+
+    address: str
+    signer: Any
+    in_flight: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return self.unhealthy_until <= now
+
+
+class SignerPool:
+    """Facilitator signers of one network."""
+
+    def __init__(
+        self,
+        network: str,
+        normalize_address: Callable[[str], str],
+        *,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+    ) -> None:
+        self.network = network
+        self._normalize = normalize_address
+        self._failure_threshold = max(1, failure_threshold)
+        self._cooldown = cooldown
+        self.members: list[PooledSigner] = []
+        self._by_address: dict[str, PooledSigner] = {}
+        self._round_robin = itertools.count()
+
+    @property
+    def normalize_address(self) -> Callable[[str], str]:
+        return self._normalize
+
+    def add(self, signer: Any) -> PooledSigner:
+        member = PooledSigner(address=signer.get_address(), signer=signer)
+        self.members.append(member)
+        self._by_address[self._normalize(member.address)] = member
+        SIGNER_HEALTHY.labels(network=self.network, signer=member.address).set(1)
+        return member
+
+    def get(self, address: str | None) -> Optional[PooledSigner]:
+        """Pool member with this address (any format the network's converter accepts), if any."""
+        if not address:
+            return None
+        try:
+            return self._by_address.get(self._normalize(address))
+        except Exception:
+            return None
+
+    def pick(self) -> PooledSigner:
+        """Least-loaded healthy member; ties rotate. Falls back to all members when none is healthy."""
+        now = time.monotonic()
+        candidates = [m for m in self.members if m.is_healthy(now)] or self.members
+        least = min(m.in_flight for m in candidates)
+        tied = [m for m in candidates if m.in_flight == least]
+        return tied[next(self._round_robin) % len(tied)]
+
+    def acquire(self, member: PooledSigner) -> None:
+        member.in_flight += 1
+        SIGNER_IN_FLIGHT.labels(network=self.network, signer=member.address).set(member.in_flight)
+
+    def release(self, member: PooledSigner, *, ok: bool, signer_failure: bool) -> None:
+        """Finish one settlement; signer_failure counts toward taking the member out of rotation."""
+        member.in_flight -= 1
+        SIGNER_IN_FLIGHT.labels(network=self.network, signer=member.address).set(member.in_flight)
+        SIGNER_SETTLEMENTS.labels(
+            network=self.network, signer=member.address, outcome="success" if ok else "failed"
+        ).inc()
+        if not signer_failure:
+            if ok:
+                self._mark_healthy(member)
+            return
+        member.consecutive_failures += 1
+        if member.consecutive_failures >= self._failure_threshold:
+            member.unhealthy_until = time.monotonic() + self._cooldown
+            SIGNER_HEALTHY.labels(network=self.network, signer=member.address).set(0)
+            logger.warning(
+                f"Signer {member.address} on {self.network} out of rotation for {self._cooldown}s "
+                f"after {member.consecutive_failures} consecutive failures"
+            )
+
+    def _mark_healthy(self, member: PooledSigner) -> None:
+        if member.consecutive_failures or member.unhealthy_until:
+            member.consecutive_failures = 0
+            member.unhealthy_until = 0.0
+            SIGNER_HEALTHY.labels(network=self.network, signer=member.address).set(1)
+
+    async def refresh_resources(self) -> None:
+        """Export balance (and TRON energy/bandwidth) of every member as metrics."""
+        for member in self.members:
+            try:
+                await self._refresh_member(member)
+            except Exception as e:
+                logger.warning(f"Failed to read resources of signer {member.address} on {self.network}: {e}")
+
+    async def _refresh_member(self, member: PooledSigner) -> None:
+        labels = dict(network=self.network, signer=member.address)
+        if self.network.startswith("tron:"):
+            client = member.signer._ensure_async_tron_client(self.network)
+            resource = await client.get_account_resource(member.address)
+            energy = resource.get("EnergyLimit", 0) - resource.get("EnergyUsed", 0)
+            bandwidth = (
+                resource.get("freeNetLimit", 0) - resource.get("freeNetUsed", 0)
+                + resource.get("NetLimit", 0) - resource.get("NetUsed", 0)
+            )
+            SIGNER_ENERGY_AVAILABLE.labels(**labels).set(energy)
+            SIGNER_BANDWIDTH_AVAILABLE.labels(**labels).set(bandwidth)
+            SIGNER_BALANCE.labels(**labels).set(float(await client.get_account_balance(member.address)))
+        else:
+            w3 = member.signer._ensure_async_web3_client(self.network)
+            SIGNER_BALANCE.labels(**labels).set((await w3.eth.get_balance(member.address)) / 10**18)
+
+
+class PooledFacilitatorMechanism:
+    """
+    Facilitator mechanism (X402Facilitator protocol) over one mechanism instance per pool signer.
+
+    Registered once per network/scheme in place of a single-signer mechanism. Fee quotes are
+    memoized per signer in quote_cache; settle skips the signature check of ticket-verified payloads.
+    """
+
+    def __init__(self, pool: SignerPool, factory: Callable[[Any], Any]) -> None:
+        self._pool = pool
+        self._mechanisms = {
+            id(member): honor_verification_tickets(factory(member.signer)) for member in pool.members
+        }
+        self._scheme = next(iter(self._mechanisms.values())).scheme()
+
+    def scheme(self) -> str:
+        return self._scheme
+
+    def _mechanism(self, member: PooledSigner) -> Any:
+        return self._mechanisms[id(member)]
+
+    def _member_for(self, payload: PaymentPayload) -> PooledSigner:
+        """The signer named as permit caller, else the least-loaded healthy one."""
+        permit = getattr(payload.payload, "payment_permit", None)
+        member = self._pool.get(getattr(permit, "caller", None))
+        return member or self._pool.pick()
+
+    async def fee_quote(
+        self,
+        accept: PaymentRequirements,
+        context: dict[str, Any] | None = None,
+    ) -> FeeQuoteResponse | None:
+        member = self._pool.pick()
+        mechanism = self._mechanism(member)
+        return await quote_cache.get_or_load(
+            (self._scheme, member.address, requirement_key(accept, context)),
+            lambda: mechanism.fee_quote(accept, context),
+        )
+
+    async def verify(self, payload: PaymentPayload, requirements: PaymentRequirements) -> VerifyResponse:
+        return await self._mechanism(self._member_for(payload)).verify(payload, requirements)
+
+    async def settle(self, payload: PaymentPayload, requirements: PaymentRequirements) -> SettleResponse:
+        member = self._member_for(payload)
+        self._pool.acquire(member)
+        ok = signer_failure = False
+        try:
+            result = await self._mechanism(member).settle(payload, requirements)
+            ok = result.success
+            signer_failure = not ok and result.error_reason in _SIGNER_FAILURE_REASONS
+            return result
+        except Exception:
+            signer_failure = True
+            raise
+        finally:
+            self._pool.release(member, ok=ok, signer_failure=signer_failure)
+
+
+class SignerPools:
+    """Registry of per-network signer pools with a background resource refresher."""
+
+    def __init__(self) -> None:
+        self.pools: dict[str, SignerPool] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, pool: SignerPool) -> None:
+        self.pools[pool.network] = pool
+
+    def start(self, *, resource_interval: float) -> None:
+        if resource_interval > 0 and self.pools:
+            self._task = asyncio.create_task(self._run(resource_interval), name="signer-resources")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            for pool in self.pools.values():
+                await pool.refresh_resources()
+            await asyncio.sleep(interval)
+
+
+# Global signer pools (one per configured network)
+signer_pools = SignerPools()
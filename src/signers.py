@@ -0,0 +1,213 @@
+"""
+Facilitator signers whose chain clients route through an RpcRouter when rpc_endpoints are configured.
+TRON signers build on a cached reference block (see ref_blocks.py); EVM signers allocate nonces
+locally (see nonces.py) so settlements can be broadcast back-to-back. EIP-712 recovery and
+local-key signing run on the crypto executor (see crypto.py).
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+import httpx
+from bankofai.x402.signers.facilitator import EvmFacilitatorSigner, TronFacilitatorSigner
+from bankofai.x402.utils.address import checksum_evm_address, tron_address_to_evm
+from eth_utils import keccak
+
+from crypto import crypto_executor, sign_evm_transaction
+from gas import GasOracle
+from nonces import NonceManager, is_already_known, is_nonce_error
+from ref_blocks import RefBlockCache
+from rpc import RpcRouter, create_tron_client, create_web3_client
+
+try:
+    from web3.exceptions import Web3RPCError as _RpcRejected
+except ImportError:  # web3 < 7 raises ValueError for JSON-RPC errors
+    _RpcRejected = ValueError
+
+logger = logging.getLogger(__name__)
+
+
+class RoutedTronFacilitatorSigner(TronFacilitatorSigner):
+    """
+    TronFacilitatorSigner using a multi-endpoint AsyncTron client once use_rpc_router() is called.
+
+    With ref_blocks, transactions are built on the cached reference block instead of a live fetch.
+    """
+
+    _rpc_router: Optional[RpcRouter] = None
+    _rpc_http_client: Optional[httpx.AsyncClient] = None
+    _rpc_api_key: Optional[str] = None
+    _ref_blocks: Optional[RefBlockCache] = None
+
+    def use_rpc_router(
+        self,
+        router: RpcRouter,
+        client: httpx.AsyncClient,
+        api_key: Optional[str] = None,
+        ref_blocks: Optional[RefBlockCache] = None,
+    ) -> None:
+        self._rpc_router = router
+        self._rpc_http_client = client
+        self._rpc_api_key = api_key
+        self._ref_blocks = ref_blocks
+
+    def _ensure_async_tron_client(self, network: str) -> Any:
+        if self._rpc_router is None:
+            return super()._ensure_async_tron_client(network)
+        if network not in self._async_tron_clients:
+            self._async_tron_clients[network] = create_tron_client(
+                network,
+                self._rpc_router,
+                self._rpc_http_client,
+                api_key=self._rpc_api_key,
+                ref_blocks=self._ref_blocks,
+            )
+        return self._async_tron_clients[network]
+
+    async def verify_typed_data(
+        self,
+        address: str,
+        domain: dict[str, Any],
+        types: dict[str, Any],
+        message: dict[str, Any],
+        signature: str,
+        primary_type: str,
+    ) -> bool:
+        """Verify an EIP-712 signature, recovering the signer on the crypto executor."""
+        try:
+            recovered = await crypto_executor.recover_typed_data(domain, types, message, primary_type, signature)
+            return recovered.lower() == tron_address_to_evm(address).lower()
+        except Exception as e:
+            logger.error(f"Signature verification error: {e}")
+            return False
+
+
+class RoutedEvmFacilitatorSigner(EvmFacilitatorSigner):
+    """
+    EvmFacilitatorSigner using a multi-endpoint AsyncWeb3 client once use_rpc_router() is called.
+
+    write_contract takes its nonce from a per-network NonceManager instead of eth_getTransactionCount,
+    so concurrent settlements do not wait on (or collide over) the pending nonce, and its fee fields
+    from a GasOracle when one is set.
+    """
+
+    _rpc_router: Optional[RpcRouter] = None
+    _rpc_http_client: Optional[httpx.AsyncClient] = None
+    _nonce_resync_interval: float = 60.0
+    _gas_oracle: Optional[GasOracle] = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._nonce_managers: dict[str, NonceManager] = {}
+        self._chain_ids: dict[str, int] = {}
+
+    def configure_nonces(self, *, resync_interval: float) -> None:
+        self._nonce_resync_interval = resync_interval
+
+    def use_gas_oracle(self, oracle: GasOracle) -> None:
+        self._gas_oracle = oracle
+
+    def use_rpc_router(self, router: RpcRouter, client: httpx.AsyncClient) -> None:
+        self._rpc_router = router
+        self._rpc_http_client = client
+
+    def _ensure_async_web3_client(self, network: str) -> Any:
+        if self._rpc_router is None:
+            return super()._ensure_async_web3_client(network)
+        if network not in self._async_web3_clients:
+            self._async_web3_clients[network] = create_web3_client(self._rpc_router, self._rpc_http_client)
+        return self._async_web3_clients[network]
+
+    def _nonce_manager(self, network: str, w3: Any, address: str) -> NonceManager:
+        if network not in self._nonce_managers:
+            self._nonce_managers[network] = NonceManager(
+                network,
+                address,
+                lambda: w3.eth.get_transaction_count(address, "pending"),
+                resync_interval=self._nonce_resync_interval,
+            )
+        return self._nonce_managers[network]
+
+    async def _chain_id(self, network: str, w3: Any) -> int:
+        if network not in self._chain_ids:
+            self._chain_ids[network] = await w3.eth.chain_id
+        return self._chain_ids[network]
+
+    async def _sign_transaction(self, tx: dict) -> bytes:
+        wallet = getattr(self, "_wallet", None)
+        if wallet is not None:
+            # Wallet interface: hex-encoded signed transaction
+            signed = await wallet.sign_transaction(tx)
+            return bytes.fromhex(signed[2:] if signed.startswith("0x") else signed)
+        return await crypto_executor.run("sign", sign_evm_transaction, tx, bytes(self._account.key))
+
+    async def verify_typed_data(
+        self,
+        address: str,
+        domain: dict[str, Any],
+        types: dict[str, Any],
+        message: dict[str, Any],
+        signature: str,
+        primary_type: str,
+    ) -> bool:
+        """Verify an EIP-712 signature, recovering the signer on the crypto executor."""
+        try:
+            recovered = await crypto_executor.recover_typed_data(domain, types, message, primary_type, signature)
+            return recovered.lower() == address.lower()
+        except Exception as e:
+            logger.error(f"Signature verification error: {e}")
+            return False
+
+    async def write_contract(
+        self,
+        contract_address: str,
+        abi: Any,
+        method: str,
+        args: list[Any],
+        network: str,
+    ) -> str | None:
+        """Build, sign and broadcast a contract call with a locally allocated nonce."""
+        w3 = self._ensure_async_web3_client(network)
+        if w3 is None:
+            return None
+
+        abi_list = json.loads(abi) if isinstance(abi, str) else abi
+        contract = w3.eth.contract(address=checksum_evm_address(contract_address), abi=abi_list)
+        checked_args = [checksum_evm_address(arg) if isinstance(arg, str) else arg for arg in args]
+        from_address = checksum_evm_address(self.get_address())
+        nonces = self._nonce_manager(network, w3, from_address)
+
+        nonce = await nonces.reserve()
+        try:
+            params = {"from": from_address, "nonce": nonce, "chainId": await self._chain_id(network, w3)}
+            if self._gas_oracle is not None:
+                params.update(self._gas_oracle.tx_params())
+            tx = await getattr(contract.functions, method)(*checked_args).build_transaction(params)
+            raw_tx = await self._sign_transaction(tx)
+        except Exception as e:
+            # Never broadcast (e.g. gas estimation reverted): the nonce is reused by the next call
+            nonces.release(nonce)
+            logger.error(f"Contract write failed before broadcast ({method} on {contract_address}): {e}")
+            raise
+
+        try:
+            tx_hash = await w3.eth.send_raw_transaction(raw_tx)
+        except _RpcRejected as e:
+            if is_already_known(e):
+                # This exact transaction is already in the mempool (e.g. an earlier send that timed out)
+                nonces.submitted(nonce)
+                return keccak(raw_tx).hex()
+            if is_nonce_error(e):
+                nonces.invalidate(nonce, "nonce_error")
+            else:
+                nonces.release(nonce)
+            logger.error(f"Transaction rejected ({method} on {contract_address}, nonce {nonce}): {e}")
+            raise
+        except Exception as e:
+            # Timeout or transport error: the node may have accepted it
+            nonces.invalidate(nonce, "send_error")
+            logger.error(f"Transaction send failed ({method} on {contract_address}, nonce {nonce}): {e}")
+            raise
+        nonces.submitted(nonce)
+        return tx_hash.hex()
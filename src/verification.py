@@ -0,0 +1,122 @@
+"""
+Verification tickets - lets /settle skip the signature check /verify just did for the same payment.
+
+A successful /verify returns a short-lived ticket: an HMAC over (expiry, hash of paymentPayload and
+paymentRequirements) under a server secret. /settle with a valid ticket for the same payload and
+requirements still runs the mechanism's cheap permit checks (amounts, recipients, deadlines) but
+not the EIP-712 signature recovery. The skip is scoped to that settle call through a ContextVar.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from idempotency import payload_hash
+from monitoring import VERIFICATION_TICKETS
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_TICKET_HEADER = "X-Verification-Ticket"
+
+# Signature of the payload whose settle call presented a valid ticket
+_verified_signature: ContextVar[Optional[str]] = ContextVar("verified_signature", default=None)
+
+
+def _binding(payload: Any, requirements: Any) -> str:
+    return payload_hash(
+        {
+            "payload": payload.model_dump(mode="json", by_alias=True),
+            "requirements": requirements.model_dump(mode="json", by_alias=True),
+        }
+    )
+
+
+class VerificationTickets:
+    """Issues and checks HMAC verification tickets (disabled until configured with a ttl > 0)."""
+
+    def __init__(self) -> None:
+        self._key = secrets.token_bytes(32)
+        self._ttl = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def configure(self, *, ttl: int, secret: Optional[str] = None) -> None:
+        """Apply settings from config (called once in lifespan)."""
+        self._ttl = ttl
+        if secret:
+            self._key = secret.encode("utf-8")
+        elif ttl > 0:
+            logger.warning(
+                "verification_ticket.secret not set: tickets are only accepted by the process that issued them"
+            )
+
+    def _sign(self, expires_at: int, binding: str) -> str:
+        mac = hmac.new(self._key, f"{expires_at}.{binding}".encode("ascii"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(mac).rstrip(b"=").decode("ascii")
+
+    def issue(self, payload: Any, requirements: Any) -> Optional[str]:
+        """Ticket for a verified payload and requirements; None when tickets are disabled."""
+        if not self.enabled:
+            return None
+        expires_at = int(time.time()) + self._ttl
+        VERIFICATION_TICKETS.labels(result="issued").inc()
+        return f"{expires_at}.{self._sign(expires_at, _binding(payload, requirements))}"
+
+    def check(self, ticket: Optional[str], payload: Any, requirements: Any) -> bool:
+        """True if ticket was issued by this server for exactly this payload and requirements and has not expired."""
+        if not ticket or not self.enabled:
+            return False
+        expires_part, _, mac = ticket.partition(".")
+        try:
+            expires_at = int(expires_part)
+        except ValueError:
+            VERIFICATION_TICKETS.labels(result="invalid").inc()
+            return False
+        if not hmac.compare_digest(mac, self._sign(expires_at, _binding(payload, requirements))):
+            VERIFICATION_TICKETS.labels(result="invalid").inc()
+            return False
+        if expires_at < time.time():
+            VERIFICATION_TICKETS.labels(result="expired").inc()
+            return False
+        VERIFICATION_TICKETS.labels(result="accepted").inc()
+        return True
+
+
+@contextmanager
+def verified_payload(payload: Any) -> Iterator[None]:
+    """Within this block, the signature check of payload is skipped (see honor_verification_tickets)."""
+    token = _verified_signature.set(getattr(payload.payload, "signature", None))
+    try:
+        yield
+    finally:
+        _verified_signature.reset(token)
+
+
+def honor_verification_tickets(mechanism: Any) -> Any:
+    """Wrap a mechanism's _verify_signature to pass signatures verified by ticket in the current settle call."""
+    verify_signature = getattr(mechanism, "_verify_signature", None)
+    if verify_signature is None:
+        return mechanism
+
+    async def _verify_signature(*args: Any, **kwargs: Any) -> bool:
+        # (permit | authorization, signature, network | requirements)
+        signature = args[1] if len(args) > 1 else kwargs.get("signature")
+        verified = _verified_signature.get()
+        if verified is not None and signature == verified:
+            return True
+        return await verify_signature(*args, **kwargs)
+
+    mechanism._verify_signature = _verify_signature
+    return mechanism
+
+
+# Global verification ticket issuer
+verification_tickets = VerificationTickets()
@@ -36,3 +36,41 @@ def mock_db(mocker):
     """Fixture to mock database operations."""
     mock_get = mocker.patch("main.get_payment_by_id", new_callable=AsyncMock)
     return {"get": mock_get}
+
+@pytest.fixture(autouse=True)
+def reset_settle_idempotency():
+    """Settle results are replayed per payment; start each test with an empty replay cache."""
+    from idempotency import settle_idempotency
+    settle_idempotency.clear()
+    yield
+    settle_idempotency.clear()
+
+@pytest.fixture(autouse=True)
+def reset_quote_cache():
+    """Fee quotes are cached per requirement; start each test with an empty cache."""
+    from quotes import quote_cache
+    quote_cache.clear()
+    yield
+    quote_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_prevalidator():
+    """Pre-validation checks networks/assets only once lifespan registers them; tests start unconfigured."""
+    from prevalidation import prevalidator
+    prevalidator.reset()
+    yield
+    prevalidator.reset()
+
+@pytest.fixture
+def api_keys(mocker):
+    """Install API keys (key -> seller_id) into the in-memory auth index for one test."""
+    import auth
+
+    def install(keys: dict[str, str]) -> None:
+        rows = [
+            MagicMock(key=key, seller_id=seller_id, id=i, created_at=None, revoked_at=None)
+            for i, (key, seller_id) in enumerate(keys.items(), start=1)
+        ]
+        mocker.patch.object(auth, "API_KEY_INDEX", auth.build_api_key_index(rows))
+
+    return install
@@ -1,4 +1,5 @@
 
+import asyncio
 import pytest
 import json
 from datetime import datetime
@@ -27,7 +28,7 @@ SETTLE_BODY = {
                 },
                 "buyer": "TXxx0000000000000000000000000000000",
                 "caller": "TXxx0000000000000000000000000000000",
-                "payment": {"payToken": "USDT", "payAmount": "0", "payTo": "TXxx0000000000000000000000000000000"},
+                "payment": {"payToken": "USDT", "payAmount": "1000", "payTo": "TXxx0000000000000000000000000000000"},
                 "fee": {"feeTo": "TXxx0000000000000000000000000000000", "feeAmount": "0"},
                 "delivery": {
                     "receiveToken": "USDT",
@@ -40,7 +41,7 @@ SETTLE_BODY = {
     "paymentRequirements": {
         "scheme": "tron",
         "network": "mainnet",
-        "amount": "0",
+        "amount": "1000",
         "asset": "USDT",
         "payTo": "TXxx0000000000000000000000000000000",
     },
@@ -113,7 +114,7 @@ async def test_rate_limiting_trigger(client, mocker):
         new_callable=AsyncMock,
         return_value=SettleResponse(success=True, transaction="0xtx"),
     )
-    mocker.patch("main.save_payment_record", new_callable=AsyncMock)
+    mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
 
     resp1 = await client.post("/settle", json=SETTLE_BODY)
     assert resp1.status_code == 200
@@ -123,12 +124,12 @@ async def test_rate_limiting_trigger(client, mocker):
     assert "Rate limit exceeded" in resp2.json()["error"]
 
 
-# --- Settle flow tests (settle first -> save_payment_record; no transaction, no 409) ---
+# --- Settle flow tests (settle first -> payment_recorder.record; no transaction) ---
 
 
 @pytest.mark.asyncio
 async def test_settle_success_with_payment_id(client, mocker):
-    """Settle with payment_id: settle succeeds -> save_payment_record(payment_id, seller_id, network, tx_hash, 'success') -> 200."""
+    """Settle with payment_id: settle succeeds -> payment_recorder.record(payment_id, seller_id, network, tx_hash, 'success') -> 200."""
     mocker.patch("auth.get_remote_address", return_value="127.0.0.1")
     mocker.patch("main._get_payment_id_from_request", return_value="pay-123")
 
@@ -139,7 +140,7 @@ async def test_settle_success_with_payment_id(client, mocker):
         return_value=SettleResponse(success=True, transaction="0xtxhash"),
     )
     save_payment_record_mock = mocker.patch(
-        "main.save_payment_record",
+        "main.payment_recorder.record",
         new_callable=AsyncMock,
     )
 
@@ -163,7 +164,7 @@ async def test_settle_no_payment_id_calls_settle_only(client, mocker):
         new_callable=AsyncMock,
         return_value=SettleResponse(success=True, transaction="0xtxhash"),
     )
-    save_payment_record_mock = mocker.patch("main.save_payment_record")
+    save_payment_record_mock = mocker.patch("main.payment_recorder.record")
 
     response = await client.post("/settle", json=SETTLE_BODY)
     assert response.status_code == 200
@@ -175,7 +176,7 @@ async def test_settle_no_payment_id_calls_settle_only(client, mocker):
 
 @pytest.mark.asyncio
 async def test_settle_failure_returns_500_no_record(client, mocker):
-    """Settle raises -> 500; save_payment_record not called."""
+    """Settle raises -> 500; no payment record written."""
     mocker.patch("auth.get_remote_address", return_value="127.0.0.5")
     mocker.patch("main._get_payment_id_from_request", return_value="pay-123")
     mocker.patch(
@@ -183,8 +184,521 @@ async def test_settle_failure_returns_500_no_record(client, mocker):
         new_callable=AsyncMock,
         side_effect=Exception("chain error"),
     )
-    save_payment_record_mock = mocker.patch("main.save_payment_record")
+    save_payment_record_mock = mocker.patch("main.payment_recorder.record")
 
     response = await client.post("/settle", json=SETTLE_BODY)
     assert response.status_code == 500
     save_payment_record_mock.assert_not_called()
+
+
+# --- Async settle mode (Prefer: respond-async -> 202 + ticket; poll /settlements/{ticket}) ---
+
+
+@pytest.fixture
+async def running_settlement_queue():
+    """Start the global settlement queue with the real settle handler; stop it after the test."""
+    from main import _settle_and_record
+    from settlement import settlement_queue
+
+    await settlement_queue.start(_settle_and_record, workers=2, max_pending=10, ticket_ttl=60)
+    yield settlement_queue
+    await settlement_queue.stop(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_settle_async_returns_ticket_then_result(client, mocker, running_settlement_queue):
+    """Prefer: respond-async -> 202 with ticket; ticket resolves to the SettleResponse and the record is saved."""
+    import asyncio
+    from bankofai.x402.types import SettleResponse
+
+    mocker.patch("auth.get_remote_address", return_value="127.0.0.10")
+    mocker.patch(
+        "main.x402_facilitator.settle",
+        new_callable=AsyncMock,
+        return_value=SettleResponse(success=True, transaction="0xasync"),
+    )
+    save_payment_record_mock = mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+
+    response = await client.post("/settle", json=SETTLE_BODY, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+    assert response.headers["Preference-Applied"] == "respond-async"
+    ticket = response.json()["ticket"]
+    assert response.headers["Location"] == f"/settlements/{ticket}"
+
+    for _ in range(50):
+        poll = await client.get(f"/settlements/{ticket}")
+        assert poll.status_code == 200
+        if poll.json()["status"] == "done":
+            break
+        await asyncio.sleep(0.01)
+    data = poll.json()
+    assert data["status"] == "done"
+    assert data["result"]["transaction"] == "0xasync"
+    save_payment_record_mock.assert_awaited_once_with("pay-123", None, "mainnet", "0xasync", "success")
+
+
+@pytest.mark.asyncio
+async def test_settle_async_query_mode_without_workers_returns_503(client, mocker):
+    """?mode=async when the worker pool is not running -> 503, settle not called."""
+    mocker.patch("auth.get_remote_address", return_value="127.0.0.11")
+    settle_mock = mocker.patch("main.x402_facilitator.settle", new_callable=AsyncMock)
+
+    response = await client.post("/settle?mode=async", json=SETTLE_BODY)
+    assert response.status_code == 503
+    settle_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_settlement_unknown_ticket(client):
+    """Unknown ticket -> 404."""
+    response = await client.get("/settlements/does-not-exist")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_settle_duplicate_payment_replayed(client, mocker):
+    """Same paymentId + payload twice: second response replayed, settle and save called once."""
+    from bankofai.x402.types import SettleResponse
+
+    mocker.patch("auth.get_remote_address", side_effect=["127.0.0.20", "127.0.0.21"])
+    mocker.patch("idempotency.claim_settle_idempotency", new_callable=AsyncMock, return_value=(True, None))
+    mocker.patch("idempotency.complete_settle_idempotency", new_callable=AsyncMock)
+    settle_mock = mocker.patch(
+        "main.x402_facilitator.settle",
+        new_callable=AsyncMock,
+        return_value=SettleResponse(success=True, transaction="0xonce"),
+    )
+    save_payment_record_mock = mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+
+    first = await client.post("/settle", json=SETTLE_BODY)
+    second = await client.post("/settle", json=SETTLE_BODY)
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["transaction"] == "0xonce"
+    settle_mock.assert_awaited_once()
+    save_payment_record_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_settle_in_progress_on_other_replica_returns_409(client, mocker):
+    """DB claim held by another replica -> 409, settle not called."""
+    mocker.patch("auth.get_remote_address", return_value="127.0.0.22")
+    mocker.patch("idempotency.claim_settle_idempotency", new_callable=AsyncMock, return_value=(False, None))
+    settle_mock = mocker.patch("main.x402_facilitator.settle", new_callable=AsyncMock)
+
+    response = await client.post("/settle", json=SETTLE_BODY)
+    assert response.status_code == 409
+    settle_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_settle_records_seller_from_api_key_index(client, mocker, api_keys):
+    """X-API-KEY resolves seller_id from the in-memory index (no DB lookup) and it is recorded."""
+    from bankofai.x402.types import SettleResponse
+
+    api_keys({"seller-key": "seller-1"})
+    mocker.patch("idempotency.claim_settle_idempotency", new_callable=AsyncMock, return_value=(True, None))
+    mocker.patch("idempotency.complete_settle_idempotency", new_callable=AsyncMock)
+    mocker.patch(
+        "main.x402_facilitator.settle",
+        new_callable=AsyncMock,
+        return_value=SettleResponse(success=True, transaction="0xseller"),
+    )
+    record_mock = mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+
+    response = await client.post("/settle", json=SETTLE_BODY, headers={"X-API-KEY": "seller-key"})
+    assert response.status_code == 200
+    record_mock.assert_awaited_once_with("pay-123", "seller-1", "mainnet", "0xseller", "success")
+
+
+@pytest.mark.asyncio
+async def test_get_payment_scoped_to_seller(client, mock_db, api_keys):
+    """GET /payments/{id} passes the seller resolved by the middleware to the query."""
+    api_keys({"seller-key": "seller-1"})
+    mock_db["get"].return_value = []
+
+    response = await client.get("/payments/pay-123", headers={"X-API-KEY": "seller-key"})
+    assert response.status_code == 404
+    mock_db["get"].assert_awaited_once_with("pay-123", "seller-1")
+
+
+def _payment_row(id, payment_id="pay-1", status="success"):
+    return dict(
+        id=id, seller_id="seller-1", network="tron:nile", payment_id=payment_id,
+        tx_hash=f"0xtx{id}", status=status, created_at=datetime(2026, 1, 1, 12, 0, id),
+    )
+
+@pytest.mark.asyncio
+async def test_list_payments_requires_api_key(client):
+    """GET /payments is seller-scoped, so anonymous callers get 401."""
+    response = await client.get("/payments")
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_list_payments_keyset_pagination(client, mocker, api_keys):
+    """Filters and cursor are passed through; a full page returns the last id as nextCursor."""
+    api_keys({"seller-key": "seller-1"})
+    rows = [MagicMock(**_payment_row(i)) for i in (11, 12)]
+    list_mock = mocker.patch("main.list_payment_records", new_callable=AsyncMock, return_value=rows)
+
+    response = await client.get(
+        "/payments",
+        params={"network": "tron:nile", "status": "success", "since": "2026-01-01T00:00:00Z", "cursor": "10", "limit": 2},
+        headers={"X-API-KEY": "seller-key"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["txHash"] for item in data["items"]] == ["0xtx11", "0xtx12"]
+    assert data["items"][0]["network"] == "tron:nile"
+    assert data["nextCursor"] == "12"
+    args, kwargs = list_mock.await_args
+    assert args == ("seller-1",)
+    assert kwargs["after_id"] == 10 and kwargs["limit"] == 2
+    assert kwargs["network"] == "tron:nile" and kwargs["status"] == "success"
+    assert kwargs["since"].year == 2026 and kwargs["until"] is None
+
+@pytest.mark.asyncio
+async def test_list_payments_last_page_and_bad_cursor(client, mocker, api_keys):
+    """A short page has no nextCursor; a non-numeric cursor is rejected."""
+    api_keys({"seller-key": "seller-1"})
+    mocker.patch("main.list_payment_records", new_callable=AsyncMock, return_value=[MagicMock(**_payment_row(1))])
+
+    response = await client.get("/payments", headers={"X-API-KEY": "seller-key"})
+    assert response.json()["nextCursor"] is None
+
+    response = await client.get("/payments", params={"cursor": "abc"}, headers={"X-API-KEY": "seller-key"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+async def test_export_payments_streams_batches(client, mocker, api_keys, fmt):
+    """Export encodes every streamed batch as NDJSON lines or CSV rows."""
+    api_keys({"seller-key": "seller-1"})
+
+    async def batches(*args, **kwargs):
+        yield [_payment_row(1), _payment_row(2, payment_id=None)]
+        yield [_payment_row(3, status="failed")]
+
+    stream_mock = mocker.patch("main.stream_payment_records", side_effect=batches)
+
+    response = await client.get("/payments/export", params={"format": fmt}, headers={"X-API-KEY": "seller-key"})
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    if fmt == "csv":
+        assert response.headers["content-type"].startswith("text/csv")
+        assert lines[0] == "id,paymentId,txHash,network,status,createdAt"
+        assert lines[2] == "2,,0xtx2,tron:nile,success,2026-01-01T12:00:02"
+        assert len(lines) == 4
+    else:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in lines]
+        assert [r["id"] for r in records] == [1, 2, 3]
+        assert records[1]["paymentId"] is None
+        assert records[2]["status"] == "failed"
+    assert stream_mock.call_args.args == ("seller-1",)
+
+
+@pytest.mark.asyncio
+async def test_fee_quote_evaluates_accepts_concurrently(client, mocker):
+    """Each accepts entry is quoted separately and concurrently; results keep request order."""
+    mocker.patch("auth.get_remote_address", return_value="127.0.0.1")
+    in_flight = {"now": 0, "max": 0}
+
+    async def quote(accepts, context):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return [] if accepts[0].network == "unsupported:net" else [{"network": accepts[0].network}]
+
+    mocker.patch("main.x402_facilitator.fee_quote", side_effect=quote)
+    accept = {"scheme": "exact_permit", "amount": "1", "asset": "TAsset", "payTo": "TPayTo"}
+    response = await client.post(
+        "/fee/quote",
+        json={
+            "accepts": [
+                {**accept, "network": "tron:nile"},
+                {**accept, "network": "unsupported:net"},
+                {**accept, "network": "tron:mainnet"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"network": "tron:nile"}, {"network": "tron:mainnet"}]
+    assert in_flight["max"] == 3
+
+
+@pytest.mark.asyncio
+async def test_supported_etag_and_not_modified(client, mocker, monkeypatch):
+    """/supported is serialized once; a matching If-None-Match gets 304 without a body."""
+    import main
+
+    monkeypatch.setattr(main, "_supported_payload", None)
+    supported = mocker.patch("main.x402_facilitator.supported", return_value={"kinds": [{"network": "tron:nile"}]})
+
+    first = await client.get("/supported")
+    assert first.status_code == 200
+    assert first.json() == {"kinds": [{"network": "tron:nile"}]}
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert first.headers["cache-control"].startswith("public, max-age=")
+
+    second = await client.get("/supported", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    third = await client.get("/supported", headers={"If-None-Match": '"stale"'})
+    assert third.status_code == 200
+    assert supported.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_verify_batch_per_item_results(client, mocker):
+    """Items are verified concurrently; invalid items and verify errors fail individually, in order."""
+    from bankofai.x402.types import VerifyResponse
+
+    mocker.patch("auth.get_remote_address", return_value="10.0.0.1")
+    mocker.patch("main.config._config", {"verify_batch": {"concurrency": 2}})
+    in_flight = {"now": 0, "max": 0}
+
+    async def verify(payload, requirements):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        if requirements.network == "bad":
+            raise ValueError("Unsupported network")
+        return VerifyResponse(is_valid=True)
+
+    mocker.patch("main.x402_facilitator.verify", side_effect=verify)
+    bad_network = {**SETTLE_BODY, "paymentRequirements": {**SETTLE_BODY["paymentRequirements"], "network": "bad"}}
+    items = [SETTLE_BODY, {"paymentPayload": {}}, bad_network, SETTLE_BODY, SETTLE_BODY]
+
+    response = await client.post("/verify/batch", json=items)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 5
+    assert results[0] == {"result": {"isValid": True}}
+    assert results[1]["error"].startswith("Invalid request: ")
+    assert results[2] == {"error": "Unsupported network"}
+    assert results[3] == results[4] == {"result": {"isValid": True}}
+    assert in_flight["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_batch_rejects_oversized_batch(client, mocker):
+    mocker.patch("auth.get_remote_address", return_value="10.0.0.2")
+    mocker.patch("main.config._config", {"verify_batch": {"max_items": 2}})
+    response = await client.post("/verify/batch", json=[SETTLE_BODY] * 3)
+    assert response.status_code == 400
+
+
+def _settle_item(payment_id, network="mainnet", scheme="tron"):
+    body = json.loads(json.dumps(SETTLE_BODY))
+    body["paymentPayload"]["payload"]["paymentPermit"]["meta"]["paymentId"] = payment_id
+    body["paymentRequirements"].update(network=network, scheme=scheme)
+    return body
+
+
+@pytest.mark.asyncio
+async def test_settle_batch_groups_and_records_each_item(client, mocker):
+    """Items are settled with bounded concurrency per network/scheme; each settled item is recorded once."""
+    from bankofai.x402.types import SettleResponse
+
+    mocker.patch("auth.get_remote_address", return_value="10.0.1.1")
+    mocker.patch("main.config._config", {"settle_batch": {"network_concurrency": 1}})
+    in_flight: dict[str, int] = {}
+    max_in_flight: dict[str, int] = {}
+
+    async def settle(payload, requirements):
+        network = requirements.network
+        in_flight[network] = in_flight.get(network, 0) + 1
+        max_in_flight[network] = max(max_in_flight.get(network, 0), in_flight[network])
+        await asyncio.sleep(0.01)
+        in_flight[network] -= 1
+        if requirements.amount == "bad":
+            raise ValueError("Unsupported network")
+        return SettleResponse(success=True, transaction=f"0x{payload.payload.payment_permit.meta.payment_id}")
+
+    mocker.patch("main.x402_facilitator.settle", side_effect=settle)
+    record = mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+    bad = _settle_item("p-bad", network="nile")
+    bad["paymentRequirements"]["amount"] = "bad"
+    items = [
+        _settle_item("p-1"),
+        _settle_item("p-2", network="nile"),
+        _settle_item("p-3"),
+        {"paymentRequirements": {}},
+        bad,
+        _settle_item("p-1"),  # duplicate: coalesced, not settled or recorded twice
+    ]
+
+    response = await client.post("/settle/batch", json=items)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [r.get("result", {}).get("transaction") for r in results] == [
+        "0xp-1", "0xp-2", "0xp-3", None, None, "0xp-1"
+    ]
+    assert results[3]["error"].startswith("Invalid request: ")
+    assert results[4] == {"error": "invalid_amount"}  # rejected by pre-validation, never settled
+    assert max_in_flight == {"mainnet": 1, "nile": 1}
+
+    assert sorted(c.args[0] for c in record.await_args_list) == ["p-1", "p-2", "p-3"]
+    assert all(c.args[4] == "success" for c in record.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_verify_ticket_lets_settle_skip_signature_check(client, mocker):
+    """A ticket from /verify marks the same payload as verified during /settle; other payloads are re-checked."""
+    import verification
+    from bankofai.x402.types import SettleResponse, VerifyResponse
+
+    mocker.patch("auth.get_remote_address", side_effect=["10.0.2.1", "10.0.2.2", "10.0.2.3"])
+    mocker.patch.object(verification.verification_tickets, "_ttl", 60)
+    mocker.patch("main.x402_facilitator.verify", new_callable=AsyncMock, return_value=VerifyResponse(is_valid=True))
+    mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+    seen = []
+
+    async def settle(payload, requirements):
+        seen.append(verification._verified_signature.get())
+        return SettleResponse(success=True, transaction="0xtx")
+
+    mocker.patch("main.x402_facilitator.settle", side_effect=settle)
+
+    body = _settle_item("pay-ticket")
+    response = await client.post("/verify", json=body)
+    ticket = response.headers["X-Verification-Ticket"]
+
+    await client.post("/settle", json=_settle_item("pay-other"), headers={"X-Verification-Ticket": ticket})
+    await client.post("/settle", json=body, headers={"X-Verification-Ticket": ticket})
+    assert seen == [None, "0x"]
+
+
+@pytest.mark.asyncio
+async def test_verify_ticket_matches_settle_with_lowercase_evm_addresses(client, mocker):
+    """The library checksums EVM requirements in place during verify; the ticket still binds the raw body."""
+    import verification
+    from bankofai.x402.facilitator.x402_facilitator import X402Facilitator
+    from bankofai.x402.types import SettleResponse, VerifyResponse
+
+    mocker.patch("auth.get_remote_address", side_effect=["10.0.2.4", "10.0.2.5"])
+    mocker.patch.object(verification.verification_tickets, "_ttl", 60)
+    mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+
+    async def verify(payload, requirements):
+        X402Facilitator._normalize_evm_requirements(requirements)
+        return VerifyResponse(is_valid=True)
+
+    seen = []
+
+    async def settle(payload, requirements):
+        seen.append(verification._verified_signature.get())
+        return SettleResponse(success=True, transaction="0xtx")
+
+    mocker.patch("main.x402_facilitator.verify", side_effect=verify)
+    mocker.patch("main.x402_facilitator.settle", side_effect=settle)
+
+    pay_to = "0x" + "ab" * 20
+    body = _settle_item("pay-evm-ticket", network="eip155:97", scheme="exact_permit")
+    body["paymentRequirements"].update(asset="0x" + "cd" * 20, payTo=pay_to)
+    body["paymentPayload"]["payload"]["paymentPermit"]["payment"]["payTo"] = pay_to
+
+    response = await client.post("/verify", json=body)
+    ticket = response.headers["X-Verification-Ticket"]
+    await client.post("/settle", json=body, headers={"X-Verification-Ticket": ticket})
+    assert seen == ["0x"]
+
+
+@pytest.mark.asyncio
+async def test_verify_and_settle_settles_only_valid_payloads(client, mocker):
+    """Valid: settled without a second signature check and recorded like /settle. Invalid: nothing submitted."""
+    import verification
+    from bankofai.x402.types import SettleResponse, VerifyResponse
+
+    mocker.patch("auth.get_remote_address", side_effect=["10.0.3.1", "10.0.3.2"])
+    verify = mocker.patch(
+        "main.x402_facilitator.verify",
+        new_callable=AsyncMock,
+        side_effect=[VerifyResponse(is_valid=True), VerifyResponse(is_valid=False, invalidReason="invalid_signature")],
+    )
+    record = mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+    seen = []
+
+    async def settle(payload, requirements):
+        seen.append(verification._verified_signature.get())
+        return SettleResponse(success=True, transaction="0xtx", network="mainnet")
+
+    mocker.patch("main.x402_facilitator.settle", side_effect=settle)
+
+    response = await client.post("/verify-and-settle", json=_settle_item("pay-vs-1"))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["verify"]["isValid"] is True
+    assert data["settle"]["transaction"] == "0xtx"
+    assert seen == ["0x"]
+    record.assert_awaited_once_with("pay-vs-1", None, "mainnet", "0xtx", "success")
+
+    response = await client.post("/verify-and-settle", json=_settle_item("pay-vs-2"))
+    data = response.json()
+    assert data["verify"]["invalidReason"] == "invalid_signature"
+    assert data["settle"] is None
+    assert verify.await_count == 2
+    assert len(seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_prevalidation_rejects_before_facilitator(client, mocker):
+    """Expired or zero-amount payments get 400 with the reason; the facilitator library is not called."""
+    mocker.patch("auth.get_remote_address", side_effect=["10.0.4.1", "10.0.4.2"])
+    verify = mocker.patch("main.x402_facilitator.verify", new_callable=AsyncMock)
+    settle = mocker.patch("main.x402_facilitator.settle", new_callable=AsyncMock)
+
+    expired = _settle_item("pay-expired")
+    expired["paymentPayload"]["payload"]["paymentPermit"]["meta"]["validBefore"] = 1
+    response = await client.post("/verify", json=expired)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "expired"
+
+    zero = _settle_item("pay-zero")
+    zero["paymentRequirements"]["amount"] = "0"
+    response = await client.post("/settle", json=zero)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "invalid_amount"
+
+    verify.assert_not_awaited()
+    settle.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_settle_rejects_replayed_payment_without_submitting(client, mocker):
+    """A settled paymentId is added to the replay filter; settling it again (after the idempotency window) is 409."""
+    from bankofai.x402.types import SettleResponse
+    from replay import ReplayFilter
+
+    async def confirm(network, payment_id):
+        return True
+
+    replay = ReplayFilter(confirm=confirm)
+    replay.configure(enabled=True, capacity=1000, error_rate=0.001)
+    mocker.patch("main.replay_filter", replay)
+    mocker.patch("auth.get_remote_address", side_effect=["10.0.5.1", "10.0.5.2"])
+    mocker.patch("main.payment_recorder.record", new_callable=AsyncMock)
+    settle = mocker.patch(
+        "main.x402_facilitator.settle",
+        new_callable=AsyncMock,
+        return_value=SettleResponse(success=True, transaction="0xtx", network="mainnet"),
+    )
+
+    body = _settle_item("pay-replay")
+    assert (await client.post("/settle", json=body)).status_code == 200
+
+    from idempotency import settle_idempotency
+    settle_idempotency.clear()
+    response = await client.post("/settle", json=body)
+    assert response.status_code == 409
+    assert "already settled" in response.json()["detail"]
+    settle.assert_awaited_once()
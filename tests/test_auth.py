@@ -1,17 +1,100 @@
+import asyncio
+from datetime import datetime, timezone
 
 import pytest
-from auth import _constant_time_key_check, get_dynamic_key_func, API_KEY_CACHE
+import auth
+from auth import _constant_time_key_check, _lookup_api_key, get_dynamic_key_func, APIKeyInfo
 from fastapi import Request
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-def test_constant_time_key_check():
+def test_constant_time_key_check(api_keys):
     """Verify constant-time comparison for API Keys"""
-    global API_KEY_CACHE
-    API_KEY_CACHE.clear()
-    API_KEY_CACHE.add("valid-key-123")
+    api_keys({"valid-key-123": "seller-1"})
     
     assert _constant_time_key_check("valid-key-123") is True
     assert _constant_time_key_check("wrong-key") is False
+    assert _constant_time_key_check("valid-key-12") is False
+
+def test_lookup_api_key_returns_seller(api_keys):
+    """API key resolves to its seller from the in-memory index"""
+    api_keys({"key-a": "seller-a", "key-b": "seller-b"})
+
+    assert _lookup_api_key("key-b").seller_id == "seller-b"
+    assert _lookup_api_key("key-c") is None
+    assert _lookup_api_key("ключ") is None
+
+def test_lookup_api_key_rejects_digest_collision(mocker):
+    """The indexed candidate is still compared against the presented key"""
+    mocker.patch.object(auth, "API_KEY_INDEX", {
+        auth._api_key_digest("attacker-key"): ("real-key", APIKeyInfo(seller_id="seller-a", key_id=1)),
+    })
+    assert _lookup_api_key("attacker-key") is None
+
+def test_index_keys_are_keyed_digests():
+    """Index keys are HMAC digests, not the raw API keys"""
+    index = auth.build_api_key_index([MagicMock(key="key-a", seller_id="seller-a", id=1, created_at=None, revoked_at=None)])
+    assert "key-a" not in index
+    assert list(index) == [auth._api_key_digest("key-a")]
+
+@pytest.fixture
+def refresh_state(mocker):
+    """Fresh incremental-refresh state and empty index for one test."""
+    mocker.patch.object(auth, "API_KEY_INDEX", {})
+    mocker.patch.object(auth, "_refresh_state", auth._RefreshState())
+    mocker.patch.object(auth, "_notified_key_ids", set())
+    mocker.patch.object(auth, "_refresh_requested", asyncio.Event())
+
+@pytest.mark.asyncio
+async def test_refresh_api_keys_cache_builds_index(mocker, refresh_state):
+    """Refresher loads key -> (seller_id, metadata) from the api_keys rows"""
+    row = MagicMock(key="key-a", seller_id="seller-a", id=7, created_at=None, revoked_at=None)
+    mocker.patch("auth.get_api_keys_changed_since", new_callable=AsyncMock, return_value=[row])
+
+    await auth.refresh_api_keys_cache()
+    assert _lookup_api_key("key-a") == APIKeyInfo(seller_id="seller-a", key_id=7, created_at=None)
+
+@pytest.mark.asyncio
+async def test_refresh_api_keys_cache_incremental(mocker, refresh_state):
+    """After the first full load only changed rows are read and applied; revoked keys are dropped"""
+    revoked_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    initial = [
+        MagicMock(key="key-a", seller_id="seller-a", id=1, created_at=None, revoked_at=None),
+        MagicMock(key="key-b", seller_id="seller-b", id=2, created_at=None, revoked_at=None),
+    ]
+    changed = [
+        MagicMock(key="key-a", seller_id="seller-a", id=1, created_at=None, revoked_at=revoked_at),
+        MagicMock(key="key-c", seller_id="seller-c", id=3, created_at=None, revoked_at=None),
+    ]
+    fetch = mocker.patch("auth.get_api_keys_changed_since", new_callable=AsyncMock, side_effect=[initial, changed])
+
+    await auth.refresh_api_keys_cache()
+    auth._on_api_keys_changed("3")
+    await auth.refresh_api_keys_cache()
+
+    fetch.assert_awaited_with(2, None, [3])
+    assert _lookup_api_key("key-a") is None
+    assert _lookup_api_key("key-b").seller_id == "seller-b"
+    assert _lookup_api_key("key-c").seller_id == "seller-c"
+    assert auth._refresh_state.last_id == 3
+    assert auth._refresh_state.last_revoked_at == revoked_at
+
+@pytest.mark.asyncio
+async def test_refresh_api_keys_cache_failure_keeps_index(mocker, api_keys):
+    """A failed refresh leaves the current index in place"""
+    api_keys({"key-a": "seller-a"})
+    mocker.patch.object(auth, "_refresh_state", auth._RefreshState(loaded=True, last_id=1))
+    mocker.patch("auth.get_api_keys_changed_since", new_callable=AsyncMock, side_effect=RuntimeError("db down"))
+
+    await auth.refresh_api_keys_cache()
+    assert _lookup_api_key("key-a").seller_id == "seller-a"
+
+def test_api_keys_notify_wakes_refresher(refresh_state):
+    """NOTIFY api_keys_changed records the key id and wakes the refresher"""
+    auth._on_api_keys_changed("42")
+    auth._on_api_keys_changed("")
+
+    assert auth._refresh_requested.is_set()
+    assert auth._notified_key_ids == {42}
 
 def test_get_dynamic_key_func_auth():
     """Test dynamic key generation for authenticated users"""
@@ -1,6 +1,7 @@
 """
 Detailed unit tests for config changes: _network_config, get_fee_to_address,
-get_base_fee, _validate_required, get_private_key (per-network + 1Password fallback).
+get_base_fee, _validate_required, get_private_key (per-network + 1Password fallback),
+get_private_keys (signer pool).
 """
 import pytest
 from unittest.mock import AsyncMock, patch
@@ -359,3 +360,48 @@ def test_networks_returns_empty_when_not_dict():
     config = Config()
     config._config = {"facilitator": {"networks": ["tron:nile"]}}
     assert config.networks == []
+
+
+# ---- get_private_keys: signer pool ----
+@pytest.mark.asyncio
+async def test_get_private_keys_falls_back_to_single_key():
+    config = Config()
+    config._config = {
+        "facilitator": {
+            "networks": {
+                "tron:nile": {"fee_to_address": "T...", "private_key": "key-nile"},
+            }
+        }
+    }
+    assert await config.get_private_keys("tron:nile") == ["key-nile"]
+
+
+@pytest.mark.asyncio
+async def test_get_private_keys_resolves_direct_and_1password_entries():
+    config = Config()
+    config._config = {
+        "facilitator": {
+            "networks": {
+                "tron:nile": {"fee_to_address": "T...", "private_keys": ["key-a", "V/I/signer_b"]},
+            }
+        },
+        "onepassword": {"token": "t"},
+    }
+    with patch("onepassword_client.get_secret_from_1password", new_callable=AsyncMock, return_value="op-key-b") as fetch:
+        keys = await config.get_private_keys("tron:nile")
+        assert await config.get_private_keys("tron:nile") == keys
+    assert keys == ["key-a", "op-key-b"]
+    fetch.assert_awaited_once_with(vault="V", item="I", field="signer_b", token="t")
+
+
+def test_validate_required_accepts_private_keys_list():
+    config = Config()
+    config._config = {
+        "facilitator": {
+            "networks": {
+                "tron:nile": {"fee_to_address": "TNile123", "private_keys": ["a" * 64, "b" * 64]},
+            }
+        },
+        "database": {"url": "postgresql://localhost/db"},
+    }
+    config._validate_required()  # no raise
@@ -0,0 +1,100 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from confirmations import ConfirmationTracker, ReceiptSource, TxReceipt
+
+
+class FakeSource(ReceiptSource):
+    def __init__(self, head, receipts):
+        super().__init__(concurrency=2)
+        self.head = head
+        self.receipts = receipts
+        self.fetched = []
+
+    async def head_block(self):
+        return self.head
+
+    async def _fetch_receipt(self, tx_hash):
+        self.fetched.append(tx_hash)
+        receipt = self.receipts.get(tx_hash)
+        if isinstance(receipt, Exception):
+            raise receipt
+        return receipt
+
+
+@pytest.fixture
+def db_updates(mocker):
+    async def update(network, tx_hashes, status, *, from_status):
+        return list(tx_hashes)
+
+    return mocker.patch("confirmations.update_payment_status_by_tx_hash", side_effect=update)
+
+
+@pytest.mark.asyncio
+async def test_poll_resolves_by_depth_in_one_cycle(db_updates):
+    """All pending receipts are fetched in one cycle; only deep-enough txs are resolved."""
+    source = FakeSource(
+        head=100,
+        receipts={
+            "0xok": TxReceipt(block_number=90, success=True),
+            "0xbad": TxReceipt(block_number=91, success=False),
+            "0xshallow": TxReceipt(block_number=95, success=True),
+            "0xerr": RuntimeError("rpc down"),
+        },
+    )
+    tracker = ConfirmationTracker("tron:nile", source, depth=10, max_pending_age=3600)
+    for tx in ("0xok", "0xbad", "0xshallow", "0xmissing", "0xerr"):
+        tracker.track(tx)
+
+    await tracker.poll_once()
+
+    assert sorted(source.fetched) == ["0xbad", "0xerr", "0xmissing", "0xok", "0xshallow"]
+    calls = {call.args[2]: call.args[1] for call in db_updates.await_args_list}
+    assert calls == {"confirmed": ["0xok"], "reverted": ["0xbad"]}
+    assert all(call.kwargs["from_status"] == "success" for call in db_updates.await_args_list)
+    assert tracker.pending == ["0xshallow", "0xmissing", "0xerr"]
+
+
+@pytest.mark.asyncio
+async def test_unflushed_record_stays_pending(mocker):
+    """A tx whose record is not in the DB yet is retried next cycle."""
+    update = mocker.patch("confirmations.update_payment_status_by_tx_hash", new_callable=AsyncMock, return_value=[])
+    source = FakeSource(head=10, receipts={"0xtx": TxReceipt(block_number=1, success=True)})
+    tracker = ConfirmationTracker("tron:nile", source, depth=1, max_pending_age=3600)
+    tracker.track("0xtx")
+
+    await tracker.poll_once()
+    assert tracker.pending == ["0xtx"]
+
+    update.return_value = ["0xtx"]
+    await tracker.poll_once()
+    assert tracker.pending == []
+
+
+@pytest.mark.asyncio
+async def test_load_pending_resumes_from_db(mocker):
+    """Restart resumes tracking of settled-but-unconfirmed records."""
+    load = mocker.patch(
+        "confirmations.get_unconfirmed_tx_hashes", new_callable=AsyncMock, return_value=["0xa", "0xb"]
+    )
+    tracker = ConfirmationTracker("eip155:97", FakeSource(0, {}), depth=12, max_pending_age=600)
+    tracker.track("0xa")
+
+    await tracker.load_pending()
+
+    assert tracker.pending == ["0xa", "0xb"]
+    assert load.await_args.args[0] == "eip155:97"
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_dropped(db_updates):
+    """Transactions that never resolve are dropped after max_pending_age."""
+    source = FakeSource(head=0, receipts={})
+    tracker = ConfirmationTracker("tron:nile", source, depth=1, max_pending_age=0)
+    tracker.track("0xlost")
+
+    await tracker.poll_once()
+
+    assert tracker.pending == []
+    assert source.fetched == []
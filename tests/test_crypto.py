@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+
+import crypto
+from crypto import (
+    CryptoExecutor,
+    crypto_executor,
+    recover_typed_data_signer,
+    recover_typed_data_signers,
+    sign_evm_transaction,
+    typed_data_hash,
+)
+from monitoring import EVENT_LOOP_LAG_SECONDS, monitor_event_loop_lag
+from signers import RoutedEvmFacilitatorSigner
+
+DOMAIN = {"name": "PaymentPermit", "chainId": 1, "verifyingContract": "0x" + "11" * 20}
+TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "Permit": [{"name": "buyer", "type": "address"}, {"name": "amount", "type": "uint256"}],
+}
+
+
+def _signed(account):
+    message = {"buyer": account.address, "amount": 1000}
+    signable = encode_typed_data(
+        full_message={"types": TYPES, "primaryType": "Permit", "domain": DOMAIN, "message": message}
+    )
+    return message, account.sign_message(signable).signature.hex()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+async def test_executor_modes_recover_same_signer(mode):
+    account = Account.create()
+    message, signature = _signed(account)
+    executor = CryptoExecutor()
+    executor.start(mode=mode, workers=2)
+    try:
+        recovered = await executor.run("recover", recover_typed_data_signer, DOMAIN, TYPES, message, "Permit", signature)
+    finally:
+        executor.stop()
+    assert recovered == account.address
+
+
+def test_typed_data_hash_matches_eth_account_for_nested_types():
+    from eth_account.messages import _hash_eip191_message
+
+    types = {
+        **TYPES,
+        "Order": [
+            {"name": "permit", "type": "Permit"},
+            {"name": "fees", "type": "Permit[]"},
+            {"name": "id", "type": "bytes16"},
+            {"name": "memo", "type": "string"},
+        ],
+    }
+    permit = {"buyer": "0x" + "22" * 20, "amount": "1000"}
+    for fees in ([permit, permit], []):
+        message = {"permit": permit, "fees": fees, "id": "0x" + "ab" * 16, "memo": "x"}
+        signable = encode_typed_data(
+            full_message={"types": types, "primaryType": "Order", "domain": DOMAIN, "message": message}
+        )
+        assert typed_data_hash(DOMAIN, types, message, "Order") == _hash_eip191_message(signable)
+
+
+def test_typed_data_hash_rejects_mismatched_primary_type():
+    with pytest.raises(ValueError):
+        typed_data_hash(DOMAIN, TYPES, {"buyer": "0x" + "22" * 20, "amount": 1}, "Other")
+
+
+@pytest.mark.parametrize("backend", ["coincurve", "python"])
+def test_backends_recover_same_signer(backend):
+    account = Account.create()
+    message, signature = _signed(account)
+    try:
+        assert crypto.set_backend(backend) == backend
+        assert recover_typed_data_signer(DOMAIN, TYPES, message, "Permit", signature) == account.address
+    finally:
+        crypto.set_backend("auto")
+
+
+@pytest.mark.parametrize("backend", ["coincurve", "python"])
+@pytest.mark.parametrize("v", [0, 1])
+def test_recover_accepts_v_0_and_1_like_eth_account(backend, v):
+    # Re-sign until the recovery id is v, then encode it without the +27 offset
+    while True:
+        account = Account.create()
+        message, signature = _signed(account)
+        sig_bytes = bytes.fromhex(signature.removeprefix("0x"))
+        if sig_bytes[64] - 27 == v:
+            break
+    low_v = (sig_bytes[:64] + bytes([v])).hex()
+    signable = encode_typed_data(
+        full_message={"types": TYPES, "primaryType": "Permit", "domain": DOMAIN, "message": message}
+    )
+    try:
+        crypto.set_backend(backend)
+        assert recover_typed_data_signer(DOMAIN, TYPES, message, "Permit", low_v) == account.address
+        assert Account.recover_message(signable, signature=low_v) == account.address
+        with pytest.raises(ValueError):
+            recover_typed_data_signer(DOMAIN, TYPES, message, "Permit", low_v[:-2] + "1d")
+    finally:
+        crypto.set_backend("auto")
+
+
+def test_recover_batch_returns_errors_per_item():
+    account = Account.create()
+    message, signature = _signed(account)
+    results = recover_typed_data_signers(
+        [(DOMAIN, TYPES, message, "Permit", signature), (DOMAIN, TYPES, message, "Permit", "0xdead")]
+    )
+    assert results[0] == account.address
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_batch_window_shares_one_executor_call(mocker):
+    accounts = [Account.create() for _ in range(3)]
+    signed = [_signed(account) for account in accounts]
+    executor = CryptoExecutor()
+    executor.start(mode="thread", workers=1, batch_window_ms=5)
+    run = mocker.spy(executor, "run")
+    try:
+        results = await asyncio.gather(
+            *(executor.recover_typed_data(DOMAIN, TYPES, m, "Permit", s) for m, s in signed),
+            executor.recover_typed_data(DOMAIN, TYPES, signed[0][0], "Permit", "0xdead"),
+            return_exceptions=True,
+        )
+    finally:
+        executor.stop()
+    assert results[:3] == [account.address for account in accounts]
+    assert isinstance(results[3], ValueError)
+    assert run.call_count == 1
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        CryptoExecutor().start(mode="gpu")
+
+
+def test_sign_evm_transaction_matches_account():
+    account = Account.create()
+    tx = {"to": "0x" + "22" * 20, "value": 0, "gas": 21000, "gasPrice": 10**9, "nonce": 0, "chainId": 1}
+    assert sign_evm_transaction(tx, bytes(account.key)) == bytes(account.sign_transaction(tx).raw_transaction)
+
+
+@pytest.mark.asyncio
+async def test_signer_verifies_typed_data_on_executor(mocker):
+    account = Account.create()
+    message, signature = _signed(account)
+    signer = RoutedEvmFacilitatorSigner.__new__(RoutedEvmFacilitatorSigner)
+    run = mocker.spy(crypto_executor, "run")
+
+    assert await signer.verify_typed_data(account.address.lower(), DOMAIN, TYPES, message, signature, "Permit")
+    assert run.call_args.args[:2] == ("recover", recover_typed_data_signer)
+    assert not await signer.verify_typed_data("0x" + "33" * 20, DOMAIN, TYPES, message, signature, "Permit")
+    assert not await signer.verify_typed_data(account.address, DOMAIN, TYPES, message, "0xdead", "Permit")
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_records_blocking():
+    before = EVENT_LOOP_LAG_SECONDS._sum.get()
+    task = asyncio.create_task(monitor_event_loop_lag(0.01))
+    await asyncio.sleep(0)
+    time.sleep(0.05)  # block the loop
+    await asyncio.sleep(0.02)
+    task.cancel()
+    assert EVENT_LOOP_LAG_SECONDS._sum.get() - before >= 0.03
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import pytest
+
+from gas import FeeEstimate, GasOracle
+
+GWEI = 10**9
+
+
+class FakeEth:
+    def __init__(self, history, gas_price):
+        self._history = history
+        self._gas_price = gas_price
+        self.calls = 0
+
+    async def fee_history(self, blocks, newest, percentiles):
+        self.calls += 1
+        if isinstance(self._history, Exception):
+            raise self._history
+        return self._history
+
+    @property
+    async def gas_price(self):
+        return self._gas_price
+
+
+def _oracle(history, gas_price=5 * GWEI, **kwargs):
+    eth = FakeEth(history, gas_price)
+    return GasOracle("eip155:1", SimpleNamespace(eth=eth), **kwargs), eth
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_base_fee_and_median_tips():
+    oracle, _ = _oracle(
+        {
+            "baseFeePerGas": [10 * GWEI, 11 * GWEI, 12 * GWEI],
+            "reward": [[1 * GWEI, 2 * GWEI, 5 * GWEI], [1 * GWEI, 3 * GWEI, 9 * GWEI]],
+        }
+    )
+    estimate = await oracle.refresh()
+
+    assert estimate.base_fee == 12 * GWEI
+    assert estimate.priority_fees == {10: 1 * GWEI, 50: int(2.5 * GWEI), 90: 7 * GWEI}
+    assert oracle.tx_params() == {
+        "maxPriorityFeePerGas": int(2.5 * GWEI),
+        "maxFeePerGas": 24 * GWEI + int(2.5 * GWEI),
+    }
+
+
+@pytest.mark.asyncio
+async def test_legacy_gas_price_without_base_fee():
+    """Chains without a base fee (or without eth_feeHistory) get gasPrice."""
+    oracle, _ = _oracle(ValueError("method not found"), gas_price=3 * GWEI)
+    await oracle.refresh()
+    assert oracle.tx_params() == {"gasPrice": 3 * GWEI}
+
+    assert FeeEstimate(gas_price=1, base_fee=0, priority_fees={50: 2}).tx_params(50) == {"gasPrice": 1}
+
+
+@pytest.mark.asyncio
+async def test_stale_estimate_is_not_used(mocker):
+    clock = mocker.patch("gas.time.monotonic", return_value=100.0)
+    oracle, _ = _oracle({"baseFeePerGas": [GWEI], "reward": [[1, 2, 3]]}, max_age=30)
+
+    assert oracle.tx_params() == {}  # nothing fetched yet
+    await oracle.refresh()
+    clock.return_value = 125.0
+    assert oracle.tx_params() == {"maxPriorityFeePerGas": 2, "maxFeePerGas": 2 * GWEI + 2}
+    clock.return_value = 131.0
+    assert oracle.tx_params() == {}
+
+
+def test_rejects_unknown_percentile():
+    with pytest.raises(ValueError):
+        GasOracle("eip155:1", SimpleNamespace(eth=None), percentile=75)
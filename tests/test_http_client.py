@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+import pytest
+
+import http_client
+from http_client import ChainHttpClient, PooledTransport
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_and_release():
+    """At most max_per_host requests per host are in flight; slots free once the body is read."""
+    active = {"a.example": 0, "b.example": 0}
+    peak = {"a.example": 0, "b.example": 0}
+    gate = asyncio.Event()
+
+    async def handler(request):
+        host = request.url.host
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        await gate.wait()
+        active[host] -= 1
+        return httpx.Response(200, json={"host": host})
+
+    client = httpx.AsyncClient(transport=PooledTransport(httpx.MockTransport(handler), max_per_host=2))
+    tasks = [asyncio.create_task(client.post(f"https://a.example/{i}")) for i in range(4)]
+    tasks.append(asyncio.create_task(client.post("https://b.example/")))
+    await asyncio.sleep(0.05)
+    assert active == {"a.example": 2, "b.example": 1}
+
+    gate.set()
+    responses = await asyncio.gather(*tasks)
+    assert [r.json()["host"] for r in responses] == ["a.example"] * 4 + ["b.example"]
+    assert peak["a.example"] == 2
+    # Every slot was released after the bodies were read
+    assert all(sem._value == 2 for sem in client._transport._host_limits.values())
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_transport_error_releases_slot():
+    def handler(request):
+        raise httpx.ConnectError("down", request=request)
+
+    transport = PooledTransport(httpx.MockTransport(handler), max_per_host=1)
+    client = httpx.AsyncClient(transport=transport)
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://down.example/")
+    assert transport._host_limits["down.example"]._value == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_start_falls_back_to_http1_without_h2(mocker):
+    mocker.patch.object(http_client, "_http2_available", return_value=False)
+    shared = ChainHttpClient()
+    client = shared.start(
+        http2=True,
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=30,
+        max_connections_per_host=5,
+        timeout=10,
+        connect_timeout=2,
+    )
+    assert shared.client is client
+    assert client.timeout.connect == 2
+    assert client._transport._transport._pool._http2 is False
+    await shared.stop()
+    with pytest.raises(RuntimeError):
+        shared.client
@@ -0,0 +1,146 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from bankofai.x402.types import SettleResponse
+
+from idempotency import (
+    SettleIdempotency,
+    SettleIdempotencyKey,
+    SettleInProgressError,
+    payload_hash,
+)
+
+
+@pytest.fixture
+def db_claims(mocker):
+    """Mock the DB claim functions; by default every claim succeeds."""
+    return {
+        "claim": mocker.patch("idempotency.claim_settle_idempotency", new_callable=AsyncMock, return_value=(True, None)),
+        "complete": mocker.patch("idempotency.complete_settle_idempotency", new_callable=AsyncMock),
+        "release": mocker.patch("idempotency.release_settle_idempotency", new_callable=AsyncMock),
+    }
+
+
+def _key(payment_id: str = "pay-1") -> SettleIdempotencyKey:
+    return SettleIdempotencyKey.build("tron:nile", payment_id, {"payload": payment_id})
+
+
+def test_key_requires_payment_id():
+    assert SettleIdempotencyKey.build("tron:nile", None, {"a": 1}) is None
+    key = SettleIdempotencyKey.build("tron:nile", "pay-1", {"a": 1})
+    assert str(key) == f"tron:nile:pay-1:{payload_hash({'a': 1})}"
+
+
+def test_payload_hash_is_order_independent():
+    assert payload_hash({"a": 1, "b": 2}) == payload_hash({"b": 2, "a": 1})
+    assert payload_hash({"a": 1}) != payload_hash({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_settle(db_claims):
+    layer = SettleIdempotency()
+    calls = 0
+
+    async def settle_fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return SettleResponse(success=True, transaction="0xone")
+
+    results = await asyncio.gather(*(layer.execute(_key(), settle_fn) for _ in range(5)))
+    assert calls == 1
+    assert all(r.transaction == "0xone" for r in results)
+    db_claims["claim"].assert_awaited_once()
+    db_claims["complete"].assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_completed_result_replayed_until_ttl(db_claims):
+    layer = SettleIdempotency(ttl=60)
+    settle_fn = AsyncMock(return_value=SettleResponse(success=True, transaction="0xone"))
+
+    await layer.execute(_key(), settle_fn)
+    replay = await layer.execute(_key(), settle_fn)
+    assert replay.transaction == "0xone"
+    settle_fn.assert_awaited_once()
+
+    layer.configure(ttl=0, max_entries=10, pending_timeout=300)
+    await asyncio.sleep(0.001)
+    await layer.execute(_key(), settle_fn)
+    assert settle_fn.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_settle_not_cached_and_claim_released(db_claims):
+    layer = SettleIdempotency()
+    settle_fn = AsyncMock(return_value=SettleResponse(success=False, error_reason="transaction_failed"))
+
+    await layer.execute(_key(), settle_fn)
+    await layer.execute(_key(), settle_fn)
+    assert settle_fn.await_count == 2
+    assert db_claims["release"].await_count == 2
+    db_claims["complete"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_exception_propagates_and_releases_claim(db_claims):
+    layer = SettleIdempotency()
+    settle_fn = AsyncMock(side_effect=RuntimeError("rpc down"))
+
+    with pytest.raises(RuntimeError):
+        await layer.execute(_key(), settle_fn)
+    db_claims["release"].assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_db_replay_and_in_progress(db_claims):
+    layer = SettleIdempotency()
+    settle_fn = AsyncMock()
+
+    stored = SettleResponse(success=True, transaction="0xother-replica").model_dump_json(by_alias=True)
+    db_claims["claim"].return_value = (False, stored)
+    result = await layer.execute(_key("pay-done"), settle_fn)
+    assert result.transaction == "0xother-replica"
+
+    db_claims["claim"].return_value = (False, None)
+    with pytest.raises(SettleInProgressError):
+        await layer.execute(_key("pay-pending"), settle_fn)
+    settle_fn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_unavailable_falls_back_to_local(db_claims):
+    layer = SettleIdempotency()
+    db_claims["claim"].side_effect = RuntimeError("Database not initialized")
+    settle_fn = AsyncMock(return_value=SettleResponse(success=True, transaction="0xlocal"))
+
+    result = await layer.execute(_key(), settle_fn)
+    assert result.transaction == "0xlocal"
+    db_claims["complete"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_no_key_always_settles(db_claims):
+    layer = SettleIdempotency()
+    settle_fn = AsyncMock(return_value=SettleResponse(success=True, transaction="0x"))
+    await layer.execute(None, settle_fn)
+    await layer.execute(None, settle_fn)
+    assert settle_fn.await_count == 2
+    db_claims["claim"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_prune_deletes_rows_past_retention(mocker):
+    from datetime import datetime, timedelta, timezone
+
+    prune = mocker.patch("idempotency.prune_settle_idempotency", new_callable=AsyncMock, return_value=3)
+
+    assert await SettleIdempotency().prune() == 0  # retention 0: rows are kept
+    prune.assert_not_awaited()
+
+    idem = SettleIdempotency(retention=3600)
+    assert await idem.prune() == 3
+    cutoff = prune.await_args.args[0]
+    expected = datetime.now(timezone.utc) - timedelta(seconds=3600)
+    assert abs((cutoff - expected).total_seconds()) < 5
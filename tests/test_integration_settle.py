@@ -98,6 +98,14 @@ async def clear_payment_records():
         await session.commit()
 
 
+async def clear_settle_idempotency():
+    """Delete all settle idempotency claims so duplicate detection starts clean."""
+    from database import get_session, SettleIdempotencyRecord
+    async with get_session() as session:
+        await session.execute(delete(SettleIdempotencyRecord))
+        await session.commit()
+
+
 def _create_test_database(db_name: str) -> None:
     """Create a PostgreSQL database (requires createdb in PATH)."""
     env = os.environ.copy()
@@ -231,6 +239,7 @@ async def test_settle_integration_first_request_success(integration_client, mock
 
     payment_id = "pay-integ-first"
     await clear_payment_records()
+    await clear_settle_idempotency()
 
     response = await integration_client.post("/settle", json=settle_body(payment_id))
     assert response.status_code == 200
@@ -252,7 +261,7 @@ async def test_settle_integration_first_request_success(integration_client, mock
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_settle_integration_same_payment_id_twice(integration_client, mocker):
-    """Same payment_id twice: both 200; two records in DB; GET returns latest."""
+    """Same payment_id and payload twice: both 200; second is replayed (settle called once, one record)."""
     from bankofai.x402.types import SettleResponse
 
     tx_hashes = ["0xintegration_dup_1", "0xintegration_dup_2"]
@@ -268,6 +277,7 @@ async def test_settle_integration_same_payment_id_twice(integration_client, mock
 
     payment_id = "pay-integ-dup"
     await clear_payment_records()
+    await clear_settle_idempotency()
 
     first = await integration_client.post("/settle", json=settle_body(payment_id))
     assert first.status_code == 200
@@ -275,23 +285,51 @@ async def test_settle_integration_same_payment_id_twice(integration_client, mock
 
     second = await integration_client.post("/settle", json=settle_body(payment_id))
     assert second.status_code == 200
-    assert second.json()["transaction"] == tx_hashes[1]
+    assert second.json()["transaction"] == tx_hashes[0]
+    assert call_idx[0] == 1
 
     get_resp = await integration_client.get(f"/payments/{payment_id}")
     assert get_resp.status_code == 200
     records = get_resp.json()
     assert isinstance(records, list)
-    assert len(records) >= 2
+    assert len(records) == 1
     latest = records[0]
     assert latest["paymentId"] == payment_id
     assert latest["status"] == "success"
-    assert latest["txHash"] == tx_hashes[1]
+    assert latest["txHash"] == tx_hashes[0]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_settle_integration_replayed_across_replicas(integration_client, mocker):
+    """A completed settle is replayed from the DB claim even when the in-memory cache is empty (other replica)."""
+    from bankofai.x402.types import SettleResponse
+    from idempotency import settle_idempotency
+
+    settle_mock = mocker.patch(
+        "main.x402_facilitator.settle",
+        new_callable=AsyncMock,
+        return_value=SettleResponse(success=True, transaction="0xintegration_replica"),
+    )
+
+    payment_id = "pay-integ-replica"
+    await clear_payment_records()
+    await clear_settle_idempotency()
+
+    first = await integration_client.post("/settle", json=settle_body(payment_id))
+    assert first.status_code == 200
+    settle_idempotency.clear()
+
+    second = await integration_client.post("/settle", json=settle_body(payment_id))
+    assert second.status_code == 200
+    assert second.json()["transaction"] == "0xintegration_replica"
+    settle_mock.assert_awaited_once()
 
 
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_settle_integration_concurrent_same_payment_id(integration_client, mocker):
-    """Concurrent requests with same payment_id: all 200, settle called n times, n records; GET returns latest."""
+    """Concurrent requests with same payment_id: all 200, settle called once (coalesced), one record."""
     from bankofai.x402.types import SettleResponse
 
     settle_call_count = 0
@@ -306,6 +344,7 @@ async def test_settle_integration_concurrent_same_payment_id(integration_client,
 
     payment_id = "pay-integ-concurrent"
     await clear_payment_records()
+    await clear_settle_idempotency()
 
     n = 5
     tasks = [
@@ -316,13 +355,14 @@ async def test_settle_integration_concurrent_same_payment_id(integration_client,
 
     ok_count = sum(1 for r in responses if not isinstance(r, Exception) and r.status_code == 200)
     assert ok_count == n
-    assert settle_call_count == n
+    assert settle_call_count == 1
+    assert all(r.json()["transaction"] == "0xconcurrent_1" for r in responses)
 
     get_resp = await integration_client.get(f"/payments/{payment_id}")
     assert get_resp.status_code == 200
     records = get_resp.json()
     assert isinstance(records, list)
-    assert len(records) >= 1
+    assert len(records) == 1
     latest = records[0]
     assert latest["paymentId"] == payment_id
     assert latest["status"] == "success"
@@ -0,0 +1,192 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from nonces import NonceManager, is_already_known, is_nonce_error
+
+
+def _manager(chain_nonces, **kwargs):
+    """NonceManager whose chain pending nonce comes from chain_nonces (one value per sync)."""
+    values = iter(chain_nonces)
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return next(values)
+
+    kwargs.setdefault("resync_interval", 3600)
+    manager = NonceManager("eip155:97", "0xabc", fetch, **kwargs)
+    manager.fetches = fetches
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reservations_are_unique_with_one_sync():
+    manager = _manager([7])
+    nonces = await asyncio.gather(*(manager.reserve() for _ in range(20)))
+    assert sorted(nonces) == list(range(7, 27))
+    assert len(manager.fetches) == 1
+
+
+@pytest.mark.asyncio
+async def test_released_nonce_is_reused_first():
+    """A transaction that was never broadcast leaves a gap; the next reservation fills it."""
+    manager = _manager([0])
+    first, second, third = [await manager.reserve() for _ in range(3)]
+    manager.submitted(first)
+    manager.submitted(third)
+    manager.release(second)
+
+    assert await manager.reserve() == second
+    assert await manager.reserve() == 3
+
+
+@pytest.mark.asyncio
+async def test_invalidate_resyncs_and_keeps_local_submissions():
+    """After an unknown send outcome, rebase on the chain but keep nonces a lagging node has not seen."""
+    manager = _manager([5, 6])
+    n5, n6, n7 = [await manager.reserve() for _ in range(3)]
+    manager.submitted(n5)
+    manager.submitted(n7)
+    manager.invalidate(n6, "send_error")
+
+    # Chain saw 5 only: 6 is unused (gap) and 7 is still ours
+    assert await manager.reserve() == 6
+    assert await manager.reserve() == 8
+    assert len(manager.fetches) == 2
+
+
+@pytest.mark.asyncio
+async def test_resync_moves_forward_when_chain_is_ahead():
+    manager = _manager([0, 10])
+    nonce = await manager.reserve()
+    manager.invalidate(nonce, "nonce_error")
+    assert await manager.reserve() == 10
+
+
+@pytest.mark.asyncio
+async def test_periodic_resync(mocker):
+    manager = _manager([0, 4], resync_interval=10)
+    clock = mocker.patch("nonces.time.monotonic", return_value=100.0)
+    assert await manager.reserve() == 0
+    clock.return_value = 111.0
+    # Chain reports 4 pending (another process used the key): 1..3 are not ours to skip to
+    assert await manager.reserve() == 4
+
+
+def test_is_nonce_error():
+    assert is_nonce_error(ValueError({"code": -32000, "message": "nonce too low"}))
+    assert is_nonce_error(Exception("replacement transaction underpriced"))
+    assert not is_nonce_error(Exception("insufficient funds for gas * price + value"))
+    assert not is_nonce_error(ValueError({"code": -32000, "message": "already known"}))
+    assert is_already_known(ValueError({"code": -32000, "message": "already known"}))
+
+
+@pytest.mark.asyncio
+async def test_signer_write_contract_pipelines_nonces(mocker):
+    """Concurrent write_contract calls get consecutive nonces; a rejected send returns its nonce."""
+    from signers import RoutedEvmFacilitatorSigner
+
+    sent = []
+
+    class Call:
+        def __init__(self, *args):
+            pass
+
+        async def build_transaction(self, params):
+            return params
+
+    class Eth:
+        @property
+        async def chain_id(self):
+            return 97
+
+        def contract(self, address, abi):
+            return SimpleNamespace(functions=SimpleNamespace(transfer=Call))
+
+        async def get_transaction_count(self, address, block):
+            return 3
+
+        async def send_raw_transaction(self, raw):
+            if raw == b"reject":
+                raise ValueError("insufficient funds for gas * price + value")
+            sent.append(raw)
+            return bytes.fromhex("ab")
+
+    w3 = SimpleNamespace(eth=Eth())
+
+    signer = RoutedEvmFacilitatorSigner.__new__(RoutedEvmFacilitatorSigner)
+    signer._nonce_managers = {}
+    signer._chain_ids = {}
+    mocker.patch.object(signer, "get_address", return_value="0x" + "11" * 20)
+    mocker.patch.object(signer, "_ensure_async_web3_client", return_value=w3)
+    rejected = {"next": True}
+
+    async def sign(tx):
+        if tx["nonce"] == 4 and rejected.pop("next", False):
+            return b"reject"
+        return f"nonce-{tx['nonce']}".encode()
+
+    mocker.patch.object(signer, "_sign_transaction", side_effect=sign)
+    mocker.patch("signers._RpcRejected", ValueError)
+
+    async def write():
+        try:
+            return await signer.write_contract("0x" + "22" * 20, [], "transfer", [], "eip155:97")
+        except ValueError:
+            return None
+
+    results = await asyncio.gather(*(write() for _ in range(3)))
+    assert results.count(None) == 1
+    assert len(sent) == 2
+
+    # The rejected nonce 4 is reused, so no gap is left behind
+    await write()
+    assert sorted(sent) == [b"nonce-3", b"nonce-4", b"nonce-5"]
+
+
+@pytest.mark.asyncio
+async def test_signer_write_contract_already_known_is_submitted(mocker):
+    """'already known' means the transaction is in the mempool: return its hash, keep the nonce, no resync."""
+    from eth_utils import keccak
+
+    from signers import RoutedEvmFacilitatorSigner
+
+    async def _raw(tx):
+        return f"nonce-{tx['nonce']}".encode()
+
+    class Call:
+        def __init__(self, *args):
+            pass
+
+        async def build_transaction(self, params):
+            return params
+
+    class Eth:
+        @property
+        async def chain_id(self):
+            return 97
+
+        def contract(self, address, abi):
+            return SimpleNamespace(functions=SimpleNamespace(transfer=Call))
+
+        async def get_transaction_count(self, address, block):
+            return 3
+
+        async def send_raw_transaction(self, raw):
+            raise ValueError({"code": -32000, "message": "already known"})
+
+    signer = RoutedEvmFacilitatorSigner.__new__(RoutedEvmFacilitatorSigner)
+    signer._nonce_managers = {}
+    signer._chain_ids = {}
+    mocker.patch.object(signer, "get_address", return_value="0x" + "11" * 20)
+    mocker.patch.object(signer, "_ensure_async_web3_client", return_value=SimpleNamespace(eth=Eth()))
+    mocker.patch.object(signer, "_sign_transaction", side_effect=_raw)
+    mocker.patch("signers._RpcRejected", ValueError)
+
+    tx_hash = await signer.write_contract("0x" + "22" * 20, [], "transfer", [], "eip155:97")
+    assert tx_hash == keccak(b"nonce-3").hex()
+
+    # Nonce 3 counts as used; a resync would have handed it out again (the chain still reports 3)
+    assert await signer._nonce_managers["eip155:97"].reserve() == 4
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+from bankofai.x402.address import TronAddressConverter
+from bankofai.x402.types import PaymentPayload, PaymentRequirements
+
+from monitoring import PREVALIDATION_REJECTS
+from prevalidation import PrevalidationError, Prevalidator
+
+USDT_NILE = "TXYZopYRdj2D9XRtbG411XZZ3kM5VkAeBf"
+PAY_TO = "TNPeeaaFB7K9cmo4uQpcU32zGK8G1NYqeL"
+PAY_TO_HEX = "0x" + TronAddressConverter().to_evm_format(PAY_TO)[2:].lower()
+
+
+def _request(amount="1000", paid="1000", pay_to=PAY_TO, valid_before=None, network="tron:nile", asset=USDT_NILE):
+    requirements = PaymentRequirements(scheme="exact_permit", network=network, amount=amount, asset=asset, payTo=PAY_TO)
+    payload = PaymentPayload.model_validate(
+        {
+            "x402Version": 2,
+            "accepted": requirements.model_dump(by_alias=True),
+            "payload": {
+                "signature": "0x",
+                "paymentPermit": {
+                    "meta": {
+                        "kind": "PAYMENT_ONLY",
+                        "paymentId": "pay-1",
+                        "nonce": "0",
+                        "validAfter": 0,
+                        "validBefore": valid_before or int(time.time()) + 300,
+                    },
+                    "buyer": PAY_TO,
+                    "caller": PAY_TO,
+                    "payment": {"payToken": asset, "payAmount": paid, "payTo": pay_to},
+                    "fee": {"feeTo": PAY_TO, "feeAmount": "0"},
+                },
+            },
+        }
+    )
+    return payload, requirements
+
+
+def _configured():
+    prevalidator = Prevalidator()
+    prevalidator.configure({"tron:nile": (TronAddressConverter().normalize, [USDT_NILE])})
+    return prevalidator
+
+
+@pytest.mark.parametrize(
+    "overrides, reason",
+    [
+        ({}, None),
+        ({"pay_to": PAY_TO_HEX}, None),  # hex and Base58 forms of the same address
+        ({"network": "tron:shasta"}, "unsupported_network"),
+        ({"asset": PAY_TO}, "unsupported_token"),
+        ({"amount": "0", "paid": "0"}, "invalid_amount"),
+        ({"amount": "abc"}, "invalid_amount"),
+        ({"paid": "999"}, "amount_mismatch"),
+        ({"pay_to": USDT_NILE}, "payto_mismatch"),
+        ({"valid_before": 1}, "expired"),
+    ],
+)
+def test_check_reasons(overrides, reason):
+    assert _configured().check(*_request(**overrides)) == reason
+
+
+def test_unconfigured_skips_network_and_asset_checks():
+    assert Prevalidator().check(*_request(network="tron:shasta", asset="TUnknown")) is None
+
+
+def test_validate_raises_and_counts_reason():
+    before = PREVALIDATION_REJECTS.labels(reason="expired")._value.get()
+    with pytest.raises(PrevalidationError) as exc:
+        _configured().validate(*_request(valid_before=1))
+    assert str(exc.value) == "expired"
+    assert PREVALIDATION_REJECTS.labels(reason="expired")._value.get() == before + 1
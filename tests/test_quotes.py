@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from bankofai.x402.types import FeeInfo, FeeQuoteResponse, PaymentRequirements
+
+from quotes import QuoteCache, requirement_key
+
+
+def _accept(**overrides):
+    fields = dict(scheme="exact_permit", network="eip155:97", amount="1", asset="0xAbC", payTo="0xDeF")
+    fields.update(overrides)
+    return PaymentRequirements(**fields)
+
+
+def _quote(expires_in=300):
+    return FeeQuoteResponse(
+        fee=FeeInfo(feeTo="0xfee", feeAmount="100"),
+        pricing="flat",
+        scheme="exact_permit",
+        network="eip155:97",
+        asset="0xabc",
+        expires_at=int(time.time()) + expires_in,
+    )
+
+
+class Loader:
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result if result is not None else _quote()
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.result
+
+
+def test_requirement_key_normalizes_hex_addresses_only():
+    assert requirement_key(_accept(asset="0xABC")) == requirement_key(_accept(asset="0xabc"))
+    # Base58 (TRON) addresses are case-sensitive
+    assert requirement_key(_accept(asset="TAbc")) != requirement_key(_accept(asset="Tabc"))
+    assert requirement_key(_accept(), {"a": 1}) != requirement_key(_accept())
+
+
+@pytest.mark.asyncio
+async def test_hit_until_ttl(mocker):
+    clock = mocker.patch("quotes.time.monotonic", return_value=100.0)
+    cache = QuoteCache(ttl=10)
+    load = Loader()
+
+    assert await cache.get_or_load("k", load) == load.result
+    clock.return_value = 109.0
+    await cache.get_or_load("k", load)
+    assert load.calls == 1
+
+    clock.return_value = 111.0
+    await cache.get_or_load("k", load)
+    assert load.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_evaluation():
+    cache = QuoteCache(ttl=10)
+    load = Loader()
+    results = await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(5)))
+    assert load.calls == 1
+    assert all(r is load.result for r in results)
+
+
+@pytest.mark.asyncio
+async def test_config_reload_invalidates():
+    generation = {"value": 1}
+    cache = QuoteCache(ttl=10, generation=lambda: generation["value"])
+    load = Loader()
+
+    await cache.get_or_load("k", load)
+    await cache.get_or_load("k", load)
+    generation["value"] = 2
+    await cache.get_or_load("k", load)
+    assert load.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_quote_close_to_expiry_is_reloaded():
+    cache = QuoteCache(ttl=600)
+    load = Loader(_quote(expires_in=30))
+    await cache.get_or_load("k", load)
+    await cache.get_or_load("k", load)
+    assert load.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_bound():
+    cache = QuoteCache(ttl=10, max_entries=2)
+    load = Loader()
+    for key in ("a", "b", "c"):
+        await cache.get_or_load(key, load)
+    await cache.get_or_load("a", load)
+    assert load.calls == 4
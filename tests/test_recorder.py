@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from recorder import PaymentRecorder
+
+
+@pytest.fixture
+def db_writes(mocker):
+    return {
+        "single": mocker.patch("recorder.save_payment_record", new_callable=AsyncMock),
+        "batch": mocker.patch("recorder.save_payment_records", new_callable=AsyncMock),
+    }
+
+
+@pytest.mark.asyncio
+async def test_not_running_writes_directly(db_writes):
+    recorder = PaymentRecorder()
+    await recorder.record("pay-1", "seller-1", "tron:nile", "0xtx", "success")
+    db_writes["single"].assert_awaited_once_with("pay-1", "seller-1", "tron:nile", "0xtx", "success")
+    db_writes["batch"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_records_flushed_in_batches(db_writes):
+    recorder = PaymentRecorder()
+    await recorder.start(max_queue=100, batch_size=3, flush_interval_ms=1000)
+    for i in range(7):
+        await recorder.record(f"pay-{i}", None, "tron:nile", f"0x{i}", "success")
+    await asyncio.sleep(0.05)
+    # Two full batches are written without waiting for the interval
+    sizes = [len(call.args[0]) for call in db_writes["batch"].await_args_list]
+    assert sizes == [3, 3]
+
+    await recorder.stop()
+    sizes = [len(call.args[0]) for call in db_writes["batch"].await_args_list]
+    assert sizes == [3, 3, 1]
+    rows = [row for call in db_writes["batch"].await_args_list for row in call.args[0]]
+    assert [r["payment_id"] for r in rows] == [f"pay-{i}" for i in range(7)]
+    assert all(r["created_at"] is not None for r in rows)
+    db_writes["single"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_flush_after_interval(db_writes):
+    recorder = PaymentRecorder()
+    await recorder.start(max_queue=100, batch_size=100, flush_interval_ms=10)
+    await recorder.record("pay-1", None, "tron:nile", "0x1", "success")
+    await asyncio.sleep(0.1)
+    db_writes["batch"].assert_awaited_once()
+    await recorder.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_full_writes_directly(db_writes):
+    recorder = PaymentRecorder()
+    await recorder.start(max_queue=1, batch_size=10, flush_interval_ms=1000)
+    await recorder.record("pay-1", None, "tron:nile", "0x1", "success")
+    await recorder.record("pay-2", None, "tron:nile", "0x2", "success")
+    db_writes["single"].assert_awaited_once_with("pay-2", None, "tron:nile", "0x2", "success")
+    await recorder.stop()
+    assert [r["payment_id"] for r in db_writes["batch"].await_args.args[0]] == ["pay-1"]
+
+
+@pytest.mark.asyncio
+async def test_flush_retries_then_drops(db_writes, mocker):
+    mocker.patch("recorder.asyncio.sleep", new_callable=AsyncMock)
+    db_writes["batch"].side_effect = RuntimeError("db down")
+    recorder = PaymentRecorder()
+    await recorder.start(max_queue=10, batch_size=10, flush_interval_ms=0)
+    await recorder.record("pay-1", None, "tron:nile", "0x1", "success")
+    await recorder.stop()
+    assert db_writes["batch"].await_count == 3
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ref_blocks import RefBlockCache, RefBlockCaches
+from rpc import RpcRouter, create_tron_client
+
+BLOCK_A = "0" * 12 + "aaaa" + "1" * 48
+BLOCK_B = "0" * 12 + "bbbb" + "2" * 48
+
+
+def _cache(*block_ids, max_age=30):
+    values = iter(block_ids)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return next(values)
+
+    cache = RefBlockCache("tron:nile", fetch, max_age=max_age)
+    cache.calls = calls
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_get_serves_cached_block_until_max_age(mocker):
+    clock = mocker.patch("ref_blocks.time.monotonic", return_value=100.0)
+    cache = _cache(BLOCK_A, BLOCK_B, max_age=30)
+
+    assert await cache.get() == BLOCK_A  # empty: live fetch
+    clock.return_value = 120.0
+    assert await cache.get() == BLOCK_A
+    assert len(cache.calls) == 1
+
+    clock.return_value = 131.0
+    assert await cache.get() == BLOCK_B
+    assert len(cache.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_tron_client_takes_reference_block_from_cache():
+    """Transaction building asks the client for the solid block id; no RPC request is made for it."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(500)
+
+    cache = _cache(BLOCK_A)
+    await cache.refresh()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        tron = create_tron_client("tron:nile", RpcRouter("tron:nile", ["https://a"]), client, ref_blocks=cache)
+        assert await tron.get_latest_solid_block_id() == BLOCK_A
+    assert requests == []
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_survives_failures():
+    results = [RuntimeError("rpc down"), BLOCK_A, BLOCK_B]
+    refreshed = asyncio.Event()
+
+    async def fetch():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        if not results:
+            refreshed.set()
+        return result
+
+    cache = RefBlockCache("tron:nile", fetch)
+    caches = RefBlockCaches()
+    caches.add(cache)
+    caches.start(refresh_interval=0)
+    await asyncio.wait_for(refreshed.wait(), timeout=1)
+    await caches.stop()
+
+    assert await cache.get() == BLOCK_B
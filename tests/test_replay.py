@@ -0,0 +1,74 @@
+import pytest
+
+from replay import BloomFilter, PaymentReplayError, ReplayFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"pay-{i}")
+    assert all(f"pay-{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300  # ~1% expected
+
+
+def _filter(settled):
+    calls = []
+
+    async def confirm(network, payment_id):
+        calls.append((network, payment_id))
+        return (network, payment_id) in settled
+
+    replay = ReplayFilter(confirm=confirm)
+    replay.configure(enabled=True, capacity=1000, error_rate=0.001)
+    return replay, calls
+
+
+@pytest.mark.asyncio
+async def test_only_filter_hits_are_confirmed_against_db():
+    replay, calls = _filter({("tron:nile", "pay-1")})
+    replay.add("tron:nile", "pay-1")
+
+    await replay.check("tron:nile", "pay-2")  # miss: no DB query
+    await replay.check("tron:shasta", "pay-1")  # other network
+    assert calls == []
+
+    with pytest.raises(PaymentReplayError):
+        await replay.check("tron:nile", "pay-1")
+    assert calls == [("tron:nile", "pay-1")]
+
+
+@pytest.mark.asyncio
+async def test_false_positive_and_db_errors_let_settle_proceed():
+    replay, _ = _filter(set())  # in the filter, but the DB has no settled record
+    replay.add("tron:nile", "pay-1")
+    assert not await replay.is_replay("tron:nile", "pay-1")
+
+    async def broken(network, payment_id):
+        raise RuntimeError("db down")
+
+    failing = ReplayFilter(confirm=broken)
+    failing.configure(enabled=True, capacity=1000, error_rate=0.001)
+    failing.add("tron:nile", "pay-1")
+    assert not await failing.is_replay("tron:nile", "pay-1")
+
+
+@pytest.mark.asyncio
+async def test_load_rebuilds_from_settled_records():
+    replay, _ = _filter(set())
+
+    async def batches():
+        yield [("tron:nile", "pay-1"), ("eip155:97", "pay-2")]
+        yield [("tron:nile", "pay-3")]
+
+    assert await replay.load(batches()) == 3
+    assert replay.might_contain("tron:nile", "pay-3")
+    assert replay.might_contain("eip155:97", "pay-2")
+    assert not replay.might_contain("tron:nile", "pay-2")
+
+
+@pytest.mark.asyncio
+async def test_disabled_filter_never_rejects():
+    replay = ReplayFilter(confirm=None)
+    replay.add("tron:nile", "pay-1")
+    assert not await replay.is_replay("tron:nile", "pay-1")
@@ -0,0 +1,205 @@
+import json
+
+import httpx
+import pytest
+
+from rpc import RoutedTronProvider, RpcRouter, RpcUnavailableError, create_web3_client
+
+
+def _router(*urls, **kwargs):
+    kwargs.setdefault("failure_threshold", 2)
+    kwargs.setdefault("cooldown", 30)
+    return RpcRouter("tron:nile", list(urls), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_routes_to_lowest_latency_endpoint():
+    """After every endpoint has been measured, calls go to the fastest one."""
+    router = _router("https://a", "https://b")
+    router.record(router.endpoints[0], 0.5, ok=True)
+    router.record(router.endpoints[1], 0.05, ok=True)
+
+    called = []
+
+    async def fn(url):
+        called.append(url)
+        return url
+
+    assert await router.call(fn) == "https://b"
+    assert called == ["https://b"]
+
+
+@pytest.mark.asyncio
+async def test_error_rate_outweighs_latency():
+    """A fast endpoint with recent errors scores worse than a slightly slower healthy one."""
+    router = _router("https://fast", "https://steady", failure_threshold=10)
+    router.record(router.endpoints[0], 0.05, ok=True)
+    router.record(router.endpoints[0], 0.05, ok=False)
+    router.record(router.endpoints[1], 0.1, ok=True)
+
+    assert [e.url for e in router.candidates()] == ["https://steady", "https://fast"]
+
+
+@pytest.mark.asyncio
+async def test_failover_and_circuit_breaker(mocker):
+    """5xx fails over to the next endpoint; repeated failures eject the endpoint until cooldown ends."""
+    router = _router("https://bad", "https://good")
+    request = httpx.Request("POST", "https://bad")
+
+    async def fn(url):
+        if url == "https://bad":
+            raise httpx.HTTPStatusError("boom", request=request, response=httpx.Response(503, request=request))
+        return "ok"
+
+    for _ in range(2):
+        # Unmeasured/failed endpoint is still tried first until ejected
+        router.endpoints[0].latency = None
+        router.endpoints[0].error_rate = 0.0
+        assert await router.call(fn) == "ok"
+
+    bad = router.endpoints[0]
+    assert bad.open_until > 0
+    assert [e.url for e in router.candidates()] == ["https://good"]
+
+    # Cooldown over: one half-open trial goes first; success closes the circuit
+    bad.open_until = 1.0
+    assert [e.url for e in router.candidates()] == ["https://bad", "https://good"]
+
+    async def healthy(url):
+        return url
+
+    assert await router.call(healthy) == "https://bad"
+    assert bad.open_until == 0.0 and bad.consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_fail_over():
+    """4xx means the request is wrong, not the endpoint: raise without trying other endpoints."""
+    router = _router("https://a", "https://b")
+    request = httpx.Request("POST", "https://a")
+    called = []
+
+    async def fn(url):
+        called.append(url)
+        raise httpx.HTTPStatusError("bad", request=request, response=httpx.Response(400, request=request))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await router.call(fn)
+    assert called == ["https://a"]
+    assert router.endpoints[0].consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_all_endpoints_failing_raises():
+    router = _router("https://a", "https://b")
+
+    async def fn(url):
+        raise httpx.ConnectError("down")
+
+    with pytest.raises(RpcUnavailableError):
+        await router.call(fn)
+
+
+@pytest.mark.asyncio
+async def test_tron_provider_routes_requests():
+    """tronpy requests are posted to the routed endpoint with the TronGrid key only for TronGrid URLs."""
+    seen = []
+
+    def handler(request):
+        seen.append((str(request.url), request.headers.get("Tron-Pro-Api-Key")))
+        if request.url.host == "down.example":
+            return httpx.Response(502)
+        return httpx.Response(200, json={"blockID": "00"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    router = _router("https://down.example", "https://nile.trongrid.io/")
+    provider = RoutedTronProvider(router, client, api_key="grid-key")
+
+    assert await provider.make_request("wallet/getnowblock") == {"blockID": "00"}
+    assert seen == [
+        ("https://down.example/wallet/getnowblock", None),
+        ("https://nile.trongrid.io/wallet/getnowblock", "grid-key"),
+    ]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_web3_client_routes_json_rpc():
+    """AsyncWeb3 calls are JSON-RPC posts through the router."""
+
+    def handler(request):
+        body = json.loads(request.content)
+        assert body["method"] == "eth_blockNumber"
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": "0x10"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    w3 = create_web3_client(RpcRouter("eip155:97", ["https://bsc.example"]), client)
+
+    assert await w3.eth.block_number == 16
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_fails_over_only_before_send():
+    """A broadcast moves on after a connect error but not after a read timeout (the node may have it)."""
+    router = _router("https://a", "https://b")
+    called = []
+
+    async def read_timeout(url):
+        called.append(url)
+        raise httpx.ReadTimeout("slow")
+
+    with pytest.raises(httpx.ReadTimeout):
+        await router.call(read_timeout, broadcast=True)
+    assert called == ["https://a"]
+    assert router.endpoints[0].consecutive_failures == 1
+
+    async def connect_error(url):
+        if url == "https://a":
+            raise httpx.ConnectError("down")
+        return url
+
+    router.endpoints[0].latency = router.endpoints[1].latency = None
+    assert await router.call(connect_error, broadcast=True) == "https://b"
+
+
+@pytest.mark.asyncio
+async def test_evm_duplicate_broadcast_returns_tx_hash():
+    """'already known' from eth_sendRawTransaction is success with the hash of the raw transaction."""
+    from eth_utils import keccak
+
+    raw_tx = "0x" + "ab" * 40
+
+    def handler(request):
+        body = json.loads(request.content)
+        if request.url.host == "down.example":
+            return httpx.Response(503)
+        return httpx.Response(
+            200, json={"jsonrpc": "2.0", "id": body["id"], "error": {"code": -32000, "message": "already known"}}
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    w3 = create_web3_client(RpcRouter("eip155:97", ["https://bsc.example"]), client)
+
+    assert (await w3.eth.send_raw_transaction(raw_tx)) == keccak(hexstr=raw_tx)
+
+    # A 5xx on a broadcast is not retried on the next endpoint
+    w3 = create_web3_client(RpcRouter("eip155:97", ["https://down.example", "https://bsc.example"]), client)
+    with pytest.raises(httpx.HTTPStatusError):
+        await w3.eth.send_raw_transaction(raw_tx)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_tron_duplicate_broadcast_is_success():
+    def handler(request):
+        return httpx.Response(200, json={"code": "DUP_TRANSACTION_ERROR", "message": "6475702074786e"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = RoutedTronProvider(_router("https://nile.example"), client)
+
+    assert await provider.make_request("wallet/broadcasttransaction", {"txID": "ff" * 32}) == {
+        "result": True,
+        "txid": "ff" * 32,
+    }
+    await client.aclose()
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from settlement import (
+    SettlementQueue,
+    SettlementQueueFull,
+    SettlementQueueUnavailable,
+    TICKET_DONE,
+    TICKET_ERROR,
+)
+
+
+async def _wait_finished(queue: SettlementQueue, ticket_id: str):
+    for _ in range(100):
+        ticket = queue.get(ticket_id)
+        if ticket.finished_at is not None:
+            return ticket
+        await asyncio.sleep(0.01)
+    raise AssertionError("ticket did not finish")
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_running_queue():
+    queue = SettlementQueue()
+    with pytest.raises(SettlementQueueUnavailable):
+        queue.submit({"req": 1}, None)
+
+
+@pytest.mark.asyncio
+async def test_ticket_done_and_error_states():
+    async def handler(request_data, seller_id):
+        if request_data == "bad":
+            raise ValueError("invalid payload")
+        return f"ok:{request_data}:{seller_id}"
+
+    queue = SettlementQueue()
+    await queue.start(handler, workers=2, max_pending=10, ticket_ttl=60)
+    try:
+        good = queue.submit("good", "key-1", "seller-1")
+        bad = queue.submit("bad", None)
+        good = await _wait_finished(queue, good.id)
+        bad = await _wait_finished(queue, bad.id)
+        assert good.status == TICKET_DONE
+        assert good.result == "ok:good:seller-1"
+        assert bad.status == TICKET_ERROR
+        assert bad.error == "invalid payload"
+    finally:
+        await queue.stop(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_queue_full_raises():
+    release = asyncio.Event()
+
+    async def handler(request_data, seller_id):
+        await release.wait()
+
+    queue = SettlementQueue()
+    await queue.start(handler, workers=1, max_pending=1, ticket_ttl=60)
+    try:
+        queue.submit(1, None)
+        await asyncio.sleep(0)  # worker picks up the first item
+        queue.submit(2, None)
+        with pytest.raises(SettlementQueueFull):
+            queue.submit(3, None)
+    finally:
+        release.set()
+        await queue.stop(timeout=1)
+
+
+def test_ticket_ownership():
+    from settlement import SettlementTicket
+
+    anonymous = SettlementTicket(id="t1", owner=None)
+    owned = SettlementTicket(id="t2", owner="key-1")
+    assert anonymous.is_owned_by(None)
+    assert owned.is_owned_by("key-1")
+    assert not owned.is_owned_by("key-2")
+    assert not owned.is_owned_by(None)
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+from bankofai.x402.types import PaymentRequirements, SettleResponse
+
+from signer_pool import PooledFacilitatorMechanism, SignerPool
+
+
+class FakeSigner:
+    def __init__(self, address):
+        self._address = address
+
+    def get_address(self):
+        return self._address
+
+
+class FakeMechanism:
+    def __init__(self, signer, outcome=None):
+        self.signer = signer
+        self.outcome = outcome or SettleResponse(success=True, transaction="0xtx", network="tron:nile")
+        self.settled = 0
+
+    def scheme(self):
+        return "exact_permit"
+
+    async def fee_quote(self, accept, context=None):
+        return self.signer.get_address()
+
+    async def verify(self, payload, requirements):
+        return self.signer.get_address()
+
+    async def settle(self, payload, requirements):
+        self.settled += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def _pool(*addresses, **kwargs):
+    pool = SignerPool("tron:nile", str.lower, **kwargs)
+    for address in addresses:
+        pool.add(FakeSigner(address))
+    return pool
+
+
+def _payload(caller=None):
+    permit = SimpleNamespace(caller=caller) if caller else None
+    return SimpleNamespace(payload=SimpleNamespace(payment_permit=permit))
+
+
+def test_pick_prefers_least_loaded_and_rotates_ties():
+    pool = _pool("A", "B", "C")
+    assert {pool.pick().address for _ in range(3)} == {"A", "B", "C"}
+
+    pool.acquire(pool.members[0])
+    pool.acquire(pool.members[1])
+    assert pool.pick().address == "C"
+
+
+@pytest.mark.asyncio
+async def test_fee_quote_rotates_caller_across_signers():
+    """Each quote names the next idle signer, spreading future exact_permit settles."""
+    pool = _pool("A", "B")
+    mechanism = PooledFacilitatorMechanism(pool, FakeMechanism)
+    accept = PaymentRequirements(
+        scheme="exact_permit", network="tron:nile", amount="1", asset="TAsset", payTo="TPayTo"
+    )
+    quoted = [await mechanism.fee_quote(accept) for _ in range(4)]
+    assert sorted(quoted) == ["A", "A", "B", "B"]
+
+
+@pytest.mark.asyncio
+async def test_settle_uses_permit_caller_signer():
+    """A permit bound to one facilitator account is settled by that account (address format normalized)."""
+    pool = _pool("A", "B")
+    mechanism = PooledFacilitatorMechanism(pool, FakeMechanism)
+    await mechanism.settle(_payload(caller="b"), None)
+
+    assert [mechanism._mechanism(m).settled for m in pool.members] == [0, 1]
+    assert all(m.in_flight == 0 for m in pool.members)
+
+
+@pytest.mark.asyncio
+async def test_signer_failures_take_signer_out_of_rotation():
+    pool = _pool("A", "B", failure_threshold=2, cooldown=60)
+    failed = SettleResponse(success=False, network="tron:nile", errorReason="transaction_failed")
+    mechanism = PooledFacilitatorMechanism(
+        pool, lambda s: FakeMechanism(s, failed if s.get_address() == "A" else None)
+    )
+
+    for _ in range(2):
+        result = await mechanism.settle(_payload(caller="A"), None)
+        assert not result.success
+    assert pool.members[0].unhealthy_until > 0
+    assert {pool.pick().address for _ in range(3)} == {"B"}
+
+    # A success on the ejected signer (e.g. a pinned permit) returns it to rotation
+    pool.acquire(pool.members[0])
+    pool.release(pool.members[0], ok=True, signer_failure=False)
+    assert pool.members[0].unhealthy_until == 0.0
+
+
+@pytest.mark.asyncio
+async def test_payment_rejections_do_not_count_against_signer():
+    pool = _pool("A", failure_threshold=1)
+    rejected = SettleResponse(success=False, network="tron:nile", errorReason="invalid_signature")
+    mechanism = PooledFacilitatorMechanism(pool, lambda s: FakeMechanism(s, rejected))
+
+    await mechanism.settle(_payload(caller="A"), None)
+    assert pool.members[0].unhealthy_until == 0.0
+
+
+@pytest.mark.asyncio
+async def test_settle_exception_counts_as_signer_failure():
+    pool = _pool("A", failure_threshold=1)
+    mechanism = PooledFacilitatorMechanism(pool, lambda s: FakeMechanism(s, RuntimeError("rpc down")))
+
+    with pytest.raises(RuntimeError):
+        await mechanism.settle(_payload(), None)
+    assert pool.members[0].unhealthy_until > 0
+    assert pool.members[0].in_flight == 0
@@ -0,0 +1,72 @@
+import pytest
+from bankofai.x402.types import PaymentRequirements
+
+from verification import VerificationTickets, honor_verification_tickets, verified_payload
+
+REQUIREMENTS = PaymentRequirements(scheme="exact", network="tron:nile", amount="100", asset="TToken", payTo="TPayTo")
+
+
+class _Payload:
+    def __init__(self, signature):
+        self.payload = type("Inner", (), {"signature": signature})()
+
+    def model_dump(self, **kwargs):
+        return {"signature": self.payload.signature}
+
+
+def _tickets(ttl=60):
+    tickets = VerificationTickets()
+    tickets.configure(ttl=ttl, secret="s3cret")
+    return tickets
+
+
+def test_ticket_is_bound_to_payload_and_requirements():
+    tickets = _tickets()
+    payload = _Payload("0xaa")
+    ticket = tickets.issue(payload, REQUIREMENTS)
+
+    assert tickets.check(ticket, payload, REQUIREMENTS)
+    assert not tickets.check(ticket, _Payload("0xbb"), REQUIREMENTS)
+    assert not tickets.check(ticket, payload, REQUIREMENTS.model_copy(update={"amount": "1"}))
+    assert not tickets.check(ticket.replace(".", "0.", 1), payload, REQUIREMENTS)
+    assert not tickets.check("garbage", payload, REQUIREMENTS)
+
+    other_secret = VerificationTickets()
+    other_secret.configure(ttl=60, secret="other")
+    assert not other_secret.check(ticket, payload, REQUIREMENTS)
+
+
+def test_ticket_expires(mocker):
+    clock = mocker.patch("verification.time.time", return_value=1000.0)
+    tickets = _tickets(ttl=30)
+    payload = _Payload("0xaa")
+    ticket = tickets.issue(payload, REQUIREMENTS)
+
+    clock.return_value = 1030.0
+    assert tickets.check(ticket, payload, REQUIREMENTS)
+    clock.return_value = 1031.0
+    assert not tickets.check(ticket, payload, REQUIREMENTS)
+
+
+def test_disabled_tickets_are_not_issued_or_accepted():
+    tickets = _tickets(ttl=0)
+    assert tickets.issue(_Payload("0xaa"), REQUIREMENTS) is None
+    assert not tickets.check("1.abc", _Payload("0xaa"), REQUIREMENTS)
+
+
+@pytest.mark.asyncio
+async def test_signature_check_skipped_only_for_verified_payload():
+    calls = []
+
+    class Mechanism:
+        async def _verify_signature(self, permit, signature, network):
+            calls.append(signature)
+            return False
+
+    mechanism = honor_verification_tickets(Mechanism())
+
+    with verified_payload(_Payload("0xaa")):
+        assert await mechanism._verify_signature(None, "0xaa", "tron:nile") is True
+        assert await mechanism._verify_signature(None, "0xbb", "tron:nile") is False
+    assert await mechanism._verify_signature(None, "0xaa", "tron:nile") is False
+    assert calls == ["0xbb", "0xaa"]